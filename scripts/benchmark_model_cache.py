@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare cold and warm model loads of the configured data bundles.
+
+For each bundle, measures DataBundle.load_model() when the model has to be
+fetched and parsed (cold start: empty memory and disk caches), when it is
+read from the on-disk cache (warm restart: empty memory cache), and when it
+is already in memory (another session loaded it).
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
+
+from graphly.schema import Prefix, Prefixes
+from yaml import safe_load
+
+from lib.config_paths import get_config_path
+from lib.model_cache import get_model_cache
+from schema.data_bundle import DataBundle
+from schema.sparql_technologies import get_sparql
+
+
+def load_bundles(config_path: Path, names: list[str]) -> list[DataBundle]:
+    config = safe_load(config_path.read_text(encoding="utf-8")) or {}
+    endpoints = [get_sparql(endpoint) for endpoint in config.get("endpoints", [])]
+    prefixes = Prefixes(
+        [Prefix(prefix["short"], prefix["long"]) for prefix in config.get("prefixes", [])]
+    )
+    bundles = []
+    for obj in config.get("data_bundles", []):
+        if names and obj.get("name") not in names:
+            continue
+        bundles.append(DataBundle.from_dict(obj, prefixes, endpoints))
+    return bundles
+
+
+def measure(bundle_factory, prepare) -> float:
+    prepare()
+    bundle = bundle_factory()
+    start = time.perf_counter()
+    bundle.load_model()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--config", type=Path, default=get_config_path(), help="Logre configuration file"
+    )
+    parser.add_argument("--bundle", action="append", default=[], help="Bundle name (repeatable)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    cache = get_model_cache()
+    # Measure in a scratch directory, not to touch the real cached models
+    with tempfile.TemporaryDirectory() as directory:
+        cache.directory = Path(directory)
+
+        def empty_all() -> None:
+            cache.clear()
+            for path in Path(directory).glob("*.pickle"):
+                path.unlink()
+
+        print(f"{'bundle':<30} {'cold':>10} {'disk':>10} {'memory':>10}")
+        for bundle in load_bundles(args.config, args.bundle):
+            timings = {"cold": [], "disk": [], "memory": []}
+            for _ in range(args.runs):
+                factory = lambda bundle=bundle: DataBundle.from_dict(
+                    bundle.to_dict(), bundle.prefixes, [bundle.endpoint]
+                )
+                timings["cold"].append(measure(factory, empty_all))
+                timings["disk"].append(measure(factory, cache.clear))
+                timings["memory"].append(measure(factory, lambda: None))
+            print(
+                f"{bundle.name:<30}"
+                + "".join(f" {min(values):>9.3f}s" for values in timings.values())
+            )
+
+
+if __name__ == "__main__":
+    main()
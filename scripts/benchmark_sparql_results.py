@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Compare the SPARQL JSON result decoders on synthetic SELECT results.
+
+Measures, for each size: the row mode (list of dicts, then pd.DataFrame),
+the columnar mode from a decoded JSON tree, the columnar mode read from
+the raw body chunk by chunk (what Sparql.run(..., as_dataframe=True) does),
+and the TSV format (what Sparql.run(..., result_format="tsv") does).
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+import io
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
+
+import pandas as pd
+from graphly.schema import Prefix, Prefixes
+
+from lib.sparql_results import (
+    parse_sparql_json_dataframe,
+    parse_sparql_json_response,
+    read_sparql_json_dataframe,
+    read_sparql_tsv_dataframe,
+)
+
+
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+
+def make_body(rows: int) -> bytes:
+    bindings = []
+    for i in range(rows):
+        binding = {
+            "uri": {"type": "uri", "value": f"http://example.org/resource/i{i}"},
+            "class": {
+                "type": "uri",
+                "value": f"http://example.org/ontology/C{i % 20}",
+            },
+            "label": {"type": "literal", "value": f"Instance {i}"},
+            "count": {"type": "literal", "datatype": XSD_INTEGER, "value": str(i)},
+        }
+        if i % 3:
+            binding["comment"] = {"type": "literal", "value": "Some comment"}
+        bindings.append(binding)
+    response = {
+        "head": {"vars": ["uri", "class", "label", "count", "comment"]},
+        "results": {"bindings": bindings},
+    }
+    return json.dumps(response).encode()
+
+
+def make_tsv_body(rows: int) -> bytes:
+    lines = ["?uri\t?class\t?label\t?count\t?comment"]
+    for i in range(rows):
+        comment = '"Some comment"' if i % 3 else ""
+        lines.append(
+            f"<http://example.org/resource/i{i}>\t<http://example.org/ontology/C{i % 20}>"
+            f'\t"Instance {i}"\t{i}\t{comment}'
+        )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def measure(label: str, function) -> pd.DataFrame:
+    start = time.perf_counter()
+    df = function()
+    elapsed = time.perf_counter() - start
+    del df
+
+    # Second run for memory only: tracing slows allocations down a lot
+    tracemalloc.start()
+    df = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {elapsed:8.2f} s   peak {peak / 1024 / 1024:8.1f} MiB")
+    return df
+
+
+def parse_args() -> ArgumentParser:
+    parser = ArgumentParser(description="Benchmark SPARQL JSON result decoding.")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[100_000, 1_000_000],
+        help="Result sizes to benchmark.",
+    )
+    return parser
+
+
+def main() -> int:
+    args = parse_args().parse_args()
+    prefixes = Prefixes(
+        [
+            Prefix("ex", "http://example.org/resource/"),
+            Prefix("onto", "http://example.org/ontology/"),
+        ]
+    )
+
+    for rows in args.rows:
+        body = make_body(rows)
+        print(f"{rows} rows ({len(body) / 1024 / 1024:.1f} MiB of JSON)")
+
+        row_df = measure(
+            "rows + DataFrame",
+            lambda: pd.DataFrame(
+                parse_sparql_json_response(json.loads(body), prefixes)
+            ),
+        )
+        columnar_df = measure(
+            "columnar (decoded JSON)",
+            lambda: parse_sparql_json_dataframe(json.loads(body), prefixes),
+        )
+        measure(
+            "columnar (streamed body)",
+            lambda: read_sparql_json_dataframe(
+                (body[i : i + 65536] for i in range(0, len(body), 65536)),
+                prefixes,
+            ),
+        )
+
+        tsv_body = make_tsv_body(rows)
+        print(f"  (TSV body: {len(tsv_body) / 1024 / 1024:.1f} MiB)")
+        tsv_df = measure(
+            "TSV",
+            lambda: read_sparql_tsv_dataframe(io.BytesIO(tsv_body), prefixes),
+        )
+
+        assert row_df["uri"].tolist() == columnar_df["uri"].tolist()
+        assert row_df["uri"].tolist() == tsv_df["uri"].tolist()
+        assert row_df["count"].tolist() == tsv_df["count"].tolist()
+        assert row_df["count"].tolist() == columnar_df["count"].tolist()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
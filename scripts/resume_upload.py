@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Upload an N-Quads file to a configured endpoint, resuming a previous attempt.
+
+The upload starts from the checkpoint journaled by the last failed or
+interrupted upload of the same file to the same endpoint (from the app or
+from this script), if any.
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from datetime import datetime
+from pathlib import Path
+import os
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.append(str(SRC_PATH))
+
+from lib.config_cache import load_yaml
+from lib.config_paths import get_config_path
+from lib.upload_journal import list_journals
+
+
+def parse_args() -> ArgumentParser:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("file", nargs="?", type=Path, help="N-Quads file to upload.")
+    parser.add_argument(
+        "--endpoint", help="Name of the endpoint, as in the configuration file."
+    )
+    parser.add_argument(
+        "--config", type=Path, default=get_config_path(), help="Logre configuration file."
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Upload the whole file, ignoring the checkpoint."
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="List the unfinished uploads and exit."
+    )
+    return parser
+
+
+def print_journals() -> None:
+    journals = list_journals()
+    if not journals:
+        print("No unfinished upload")
+    for entry in journals:
+        done = entry["offset"] - entry["start"]
+        percent_done = round(done / entry["size"] * 100) if entry["size"] else 0
+        updated_at = datetime.fromtimestamp(entry["updated_at"]).isoformat(timespec="seconds")
+        print(
+            f"{entry.get('name') or '?'} -> {entry['endpoint']} ({entry['technology']}): "
+            f"{entry['status']} at {percent_done} % ({entry['triples']} triples), {updated_at}"
+        )
+        if entry.get("error"):
+            print(f"    {entry['error']}")
+
+
+def main() -> int:
+    parser = parse_args()
+    args = parser.parse_args()
+    if args.list:
+        print_journals()
+        return 0
+    if args.file is None or args.endpoint is None:
+        parser.error("a file and --endpoint are required, unless --list is given")
+
+    # Imported here: the graphly patches (chunking, journal) come with it
+    from schema.sparql_technologies import get_sparql
+
+    config = load_yaml(args.config) or {}
+    endpoints = [
+        endpoint
+        for endpoint in config.get("endpoints", [])
+        if isinstance(endpoint, dict) and endpoint.get("name") == args.endpoint
+    ]
+    if not endpoints:
+        parser.error(f"no endpoint named {args.endpoint!r} in {args.config}")
+    endpoint = dict(endpoints[0])
+    for key in ("username", "password", "url"):
+        if isinstance(endpoint.get(key), str):
+            endpoint[key] = os.path.expandvars(endpoint[key])
+
+    sparql = get_sparql(endpoint)
+    with open(args.file, "rb") as file:
+        sparql.upload_nquads(file, resume=not args.restart, name=args.file.name)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -46,7 +46,7 @@ def dialog_confirmation(
 
             # Only rerun when there was no errors in the callback execution
             if rerun:
-                state.invalidate_caches("confirmation_action")
+                state.invalidate_caches("confirmation_action", state.get_data_bundle())
                 st.rerun()
 
         # Forward the error upwards
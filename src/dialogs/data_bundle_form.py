@@ -1,9 +1,12 @@
 import streamlit as st
 import os
+import hashlib
 from urllib.parse import urlparse
 from requests.exceptions import HTTPError, ConnectionError, Timeout
 from components.doc_links import decorate_doc_links
 from lib import state
+from lib.background import RefreshCache
+from lib.query_cache import get_endpoint_identity
 from schema.data_bundle import DataBundle
 from schema.model_framework import ModelFramework
 from schema.sparql_technologies import (
@@ -79,13 +82,14 @@ def dialog_data_bundle_form(db: DataBundle = None) -> None:
         "List existing graphs on selected endpoint", disabled=not new_endpoint
     ):
         try:
-            graphs = __get_graph_list(
-                new_endpoint.technology_name,
-                new_endpoint.url,
-                new_endpoint.username,
-                new_endpoint.password,
-                new_base_uri.strip(),
-            )
+            with st.spinner("Fetching existing named graph"):
+                graphs = __get_graph_list(
+                    new_endpoint.technology_name,
+                    new_endpoint.url,
+                    new_endpoint.username,
+                    new_endpoint.password,
+                    new_base_uri.strip(),
+                )
         except HTTPError as err:
             status_code = err.response.status_code
             reason = err.response.reason
@@ -240,13 +244,36 @@ def dialog_data_bundle_form(db: DataBundle = None) -> None:
             st.rerun()
 
 
-@st.cache_data(ttl=120, show_spinner=False)
+# Graph lists are served at once and refreshed in the background
+_GRAPH_LISTS = RefreshCache("graph list", 120)
+
+
 def __get_graph_list(
     technology: str | None,
     url: str | None,
     username: str | None,
     password: str | None,
     base_uri: str | None,
+) -> list[str]:
+    # Graph lists belong to the whole endpoint (no bundle key)
+    key = (
+        get_endpoint_identity((url or "").strip(), (username or "").strip()),
+        None,
+        technology,
+        hashlib.sha256((password or "").encode("utf-8")).hexdigest(),
+        base_uri,
+    )
+    return _GRAPH_LISTS.get(
+        key, lambda: _fetch_graph_list(technology, url, username, password, base_uri)
+    )
+
+
+def _fetch_graph_list(
+    technology: str | None,
+    url: str | None,
+    username: str | None,
+    password: str | None,
+    base_uri: str | None,
 ) -> list[str]:
     technology_clean = (technology or "").strip()
     url_clean = (url or "").strip()
@@ -271,8 +298,7 @@ def __get_graph_list(
         )
 
         # Make the query
-        with st.spinner("Fetching existing named graph"):
-            graphs = endpoint.run("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
+        graphs = endpoint.run("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
 
         return [g["g"] for g in graphs]
     else:
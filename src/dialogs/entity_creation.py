@@ -186,6 +186,10 @@ def dialog_entity_creation() -> None:
             if validated:
                 # And create the entity
                 data_bundle.data.insert(triples)
+                # Neighborhoods of the linked entities are now stale
+                state.invalidate_entity_snapshots(
+                    [uri for triple in triples for uri in (triple[0], triple[2])]
+                )
                 state.set_toast('Entity created', ':material/save:')
                 # And then, open it
                 state.set_entity_uri(entity_uri)
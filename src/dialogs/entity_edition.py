@@ -231,6 +231,10 @@ def dialog_entity_edition(entity: Resource = None) -> None:
             data_bundle.data.delete(triples_to_remove)
             # Add new triples
             data_bundle.data.insert(triples_to_add)
+            # Neighborhoods showing the entity or the linked entities are now stale
+            state.invalidate_entity_snapshots(
+                [uri for triple in triples_to_remove + triples_to_add for uri in (triple[0], triple[2])]
+            )
             state.set_toast('Entity edited', ':material/save:')
             # And then, open it
             state.set_entity_uri(entity.uri)
@@ -8,6 +8,9 @@ import requests
 from requests.auth import HTTPBasicAuth
 from yaml import safe_dump, safe_load
 
+from lib.http_pool import get_session
+from lib.prefix_index import get_map_index
+
 
 CONTEXTS_QUERY = """
 SELECT ?g (COUNT(*) AS ?triples)
@@ -64,11 +67,7 @@ def expand_uri(value: Optional[str], prefix_map: Dict[str, str]) -> Optional[str
 
 
 def shorten_uri(value: str, prefix_map: Dict[str, str]) -> str:
-    cleaned = value.strip()
-    for short, long in prefix_map.items():
-        if cleaned.startswith(long):
-            return f"{short}:{cleaned[len(long) :]}"
-    return cleaned
+    return get_map_index(prefix_map).shorten(value.strip())
 
 
 def query(
@@ -80,7 +79,7 @@ def query(
     }
     auth = HTTPBasicAuth(username, password) if username else None
     try:
-        response = requests.post(
+        response = get_session(endpoint_url, username).post(
             endpoint_url,
             data={"query": query_text},
             headers=headers,
@@ -96,10 +95,11 @@ def query(
 
 def list_contexts(
     endpoint_url: str, username: str, password: str
-) -> List[Tuple[str, int]]:
+) -> Optional[List[Tuple[str, int]]]:
+    # None when the endpoint did not answer
     payload = query(endpoint_url, CONTEXTS_QUERY, username, password)
-    if not payload:
-        return []
+    if payload is None:
+        return None
 
     contexts: List[Tuple[str, int]] = []
     for row in payload.get("results", {}).get("bindings", []):
@@ -137,7 +137,8 @@ def choose_data_graph(
     return None
 
 
-def ensure_data_graph(bundle: dict, prefixes: Dict[str, str]) -> bool:
+def ensure_data_graph(bundle: dict, prefixes: Dict[str, str]) -> Optional[bool]:
+    # True if the data graph was set, None if the endpoint did not answer
     endpoint_url = bundle.get("endpoint_url")
     if not endpoint_url:
         return False
@@ -146,6 +147,8 @@ def ensure_data_graph(bundle: dict, prefixes: Dict[str, str]) -> bool:
     password = bundle.get("password") or ""
 
     contexts = list_contexts(endpoint_url, username, password)
+    if contexts is None:
+        return None
     context_map = {ctx: count for ctx, count in contexts}
 
     current_data_graph = expand_uri(bundle.get("graph_data_uri"), prefixes)
@@ -173,7 +176,9 @@ def ensure_data_graph(bundle: dict, prefixes: Dict[str, str]) -> bool:
     return False
 
 
-def autoconfigure_config(path: Path) -> bool:
+def autoconfigure_config(path: Path) -> Optional[bool]:
+    # True if the configuration changed, None if an endpoint did not answer
+    # (e.g. still starting), so that it is tried again
     try:
         config = load_config(path)
     except FileNotFoundError as exc:
@@ -182,10 +187,14 @@ def autoconfigure_config(path: Path) -> bool:
 
     prefixes = build_prefix_map(config.get("prefixes", []))
     changed = False
+    answered = True
     for bundle in config.get("data_bundles", []):
-        if ensure_data_graph(bundle, prefixes):
+        result = ensure_data_graph(bundle, prefixes)
+        if result is None:
+            answered = False
+        elif result:
             changed = True
 
     if changed:
         save_config(path, config)
-    return changed
+    return changed if answered else None
@@ -0,0 +1,239 @@
+"""Serve cached results at once, and refresh them in background threads."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+def _get_refresh_ahead() -> float:
+    raw_value = os.getenv("LOGRE_REFRESH_AHEAD", "0.8")
+    try:
+        parsed = float(raw_value)
+    except (TypeError, ValueError):
+        return 0.8
+    return parsed if 0 <= parsed <= 1 else 0.8
+
+
+def _get_background_workers() -> int:
+    raw_value = os.getenv("LOGRE_BACKGROUND_WORKERS", "2")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 2
+    return parsed if parsed > 0 else 2
+
+
+def _get_max_entries() -> int:
+    raw_value = os.getenv("LOGRE_REFRESH_CACHE_ENTRIES", "256")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 256
+    return parsed if parsed > 0 else 256
+
+
+# All the refresh caches of the process, for scoped invalidations
+_CACHES: List["RefreshCache"] = []
+_CACHES_LOCK = threading.Lock()
+
+_POOL: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_background_pool() -> ThreadPoolExecutor:
+    """Return the process-wide pool running the background refreshes, created on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(
+                max_workers=_get_background_workers(),
+                thread_name_prefix="logre-refresh",
+            )
+        return _POOL
+
+
+def get_refresh_caches() -> List["RefreshCache"]:
+    """Return all the refresh caches created in the process."""
+    with _CACHES_LOCK:
+        return list(_CACHES)
+
+
+class RefreshCache:
+    """
+    Process-wide cache of expensive results, refreshed before they expire.
+
+    Only the first load of a key is waited for (once, even if several sessions
+    ask for it at the same time). Afterwards, the last good value is always
+    returned at once: when it is older than `LOGRE_REFRESH_AHEAD` of its time to
+    live (or when its version changed, e.g. after a write), a load is started in
+    the background pool, and its result is served from the next call (i.e. the
+    next rerun). A failing refresh keeps the last good value.
+
+    At most `LOGRE_REFRESH_CACHE_ENTRIES` values are kept, the least recently
+    used ones being forgotten first.
+
+    Keys are tuples starting with the endpoint identity and the bundle key (None
+    for values of the whole endpoint), so that `invalidate` can drop one scope.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float | Callable[[], float],
+        refresh_ahead: float | None = None,
+        pool: ThreadPoolExecutor | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.name = name
+        self._ttl = ttl_seconds
+        self.refresh_ahead = (
+            refresh_ahead if refresh_ahead is not None else _get_refresh_ahead()
+        )
+        self.max_entries = max_entries or _get_max_entries()
+        self._pool = pool
+        self._lock = threading.Lock()
+        # key -> (value, version, load time), least recently used first
+        self._entries: OrderedDict[Hashable, Tuple[Any, Hashable, float]] = OrderedDict()
+        self._pending: Dict[Hashable, Future] = {}
+        # One lock per key being loaded for the first time
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        # Bumped by `clear` and `invalidate`, so that refreshes started before are thrown away
+        self._epoch = 0
+        with _CACHES_LOCK:
+            _CACHES.append(self)
+
+    def ttl(self) -> float:
+        """Return the time to live of the values, in seconds."""
+        return self._ttl() if callable(self._ttl) else self._ttl
+
+    def get(self, key: Hashable, load: Callable[[], Any], version: Hashable = None) -> Any:
+        """
+        Return the value of a key, loading it only if it was never loaded.
+
+        Args:
+            key (Hashable): The cache key.
+            load (Callable[[], Any]): Computes the value; it must not use the Streamlit
+                session, as it may run in a background thread.
+            version (Hashable): The current version of what the value is computed
+                from; a value loaded for another version is refreshed.
+
+        Returns:
+            Any: The cached value, possibly stale (a refresh is then under way).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            return self._load_once(key, load, version)
+
+        value, entry_version, loaded_at = entry
+        if (
+            entry_version != version
+            or time.time() - loaded_at >= self.ttl() * self.refresh_ahead
+        ):
+            self._schedule(key, load, version)
+        return value
+
+    def load(self, key: Hashable, load: Callable[[], Any], version: Hashable = None) -> Any:
+        """Load the value of a key now, store it and return it."""
+        value = load()
+        self.put(key, value, version)
+        return value
+
+    def _load_once(self, key: Hashable, load: Callable[[], Any], version: Hashable) -> Any:
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        try:
+            with loading:
+                # Another session may have loaded it meanwhile
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is not None:
+                    return entry[0]
+                return self.load(key, load, version)
+        finally:
+            with self._lock:
+                if self._loading.get(key) is loading and not loading.locked():
+                    del self._loading[key]
+
+    def put(self, key: Hashable, value: Any, version: Hashable = None) -> None:
+        """Store the value of a key."""
+        with self._lock:
+            self._store(key, (value, version, time.time()))
+
+    def _store(self, key: Hashable, entry: Tuple[Any, Hashable, float]) -> None:
+        # Called with the lock held
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def is_refreshing(self, key: Hashable) -> bool:
+        """Tell whether a background refresh of a key is under way."""
+        with self._lock:
+            return key in self._pending
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Wait for the background refreshes under way to finish."""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+    def clear(self) -> None:
+        """Forget all the values (refreshes under way are not stored)."""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def invalidate(self, endpoint: str, bundle_key: str | None = None) -> int:
+        """
+        Forget the values of an endpoint, or of one of its bundles.
+
+        Args:
+            endpoint (str): The endpoint identity (see `query_cache.get_endpoint_identity`).
+            bundle_key (str | None): The bundle key; None for all the endpoint values.
+
+        Returns:
+            int: The number of forgotten values.
+        """
+        with self._lock:
+            stale_keys = [
+                key
+                for key in self._entries
+                if isinstance(key, tuple)
+                and key[:1] == (endpoint,)
+                and (bundle_key is None or key[1:2] == (bundle_key,))
+            ]
+            for key in stale_keys:
+                del self._entries[key]
+            if stale_keys:
+                self._epoch += 1
+        return len(stale_keys)
+
+    def _schedule(self, key: Hashable, load: Callable[[], Any], version: Hashable) -> None:
+        with self._lock:
+            if key in self._pending:
+                return
+            pool = self._pool or get_background_pool()
+            # The refresh removes itself from pending under the lock, so after this block
+            self._pending[key] = pool.submit(self._refresh, key, load, version, self._epoch)
+
+    def _refresh(
+        self, key: Hashable, load: Callable[[], Any], version: Hashable, epoch: int
+    ) -> None:
+        try:
+            value = load()
+            with self._lock:
+                if epoch == self._epoch:
+                    self._store(key, (value, version, time.time()))
+        except Exception as err:
+            print(f"[{self.name}] background refresh failed: {err}")
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
@@ -0,0 +1,71 @@
+"""Invalidate the process-wide caches one endpoint, bundle or graph at a time."""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable
+
+from lib.background import get_refresh_caches
+from lib.model_cache import get_model_cache
+from lib.query_cache import get_query_cache
+
+
+# reason -> {"calls": ..., "dropped": ...}
+_COUNTERS: Dict[str, Dict[str, int]] = {}
+_COUNTERS_LOCK = threading.Lock()
+
+
+def invalidate_scope(
+    reason: str,
+    endpoint: str | None = None,
+    bundle_key: str | None = None,
+    results: bool = False,
+    graphs: Iterable[str] | None = None,
+) -> int:
+    """
+    Drop the cached entries of one scope, and count the invalidation reason.
+
+    The caches are shared by all the sessions: only what the change may have made
+    stale is dropped, so that other users keep their warm entries.
+
+    Args:
+        reason (str): Why the entries are dropped (e.g. "append_model").
+        endpoint (str | None): The endpoint identity (see `query_cache.get_endpoint_identity`).
+            None when the change only concerned the session (e.g. a bundle switch):
+            nothing is dropped, the reason is only counted.
+        bundle_key (str | None): The bundle whose computed values (statistics, ...)
+            are dropped; None for those of the whole endpoint.
+        results (bool): Whether query results and parsed models are dropped too
+            (writes sent through Logre already drop the query results).
+        graphs (Iterable[str] | None): Full IRIs of the graphs whose query results
+            (and models) are dropped; None for all the endpoint graphs.
+
+    Returns:
+        int: The number of dropped entries.
+    """
+    dropped = 0
+    if endpoint is not None:
+        if results:
+            graphs = list(graphs) if graphs is not None else None
+            dropped += get_query_cache().invalidate(endpoint, graphs)
+            dropped += get_model_cache().invalidate(endpoint, graphs)
+        for cache in get_refresh_caches():
+            dropped += cache.invalidate(endpoint, bundle_key)
+
+    with _COUNTERS_LOCK:
+        counter = _COUNTERS.setdefault(reason, {"calls": 0, "dropped": 0})
+        counter["calls"] += 1
+        counter["dropped"] += dropped
+    return dropped
+
+
+def get_invalidation_counters() -> Dict[str, Dict[str, int]]:
+    """Return, per reason, the number of invalidations and of entries they dropped."""
+    with _COUNTERS_LOCK:
+        return {reason: dict(counter) for reason, counter in _COUNTERS.items()}
+
+
+def reset_invalidation_counters() -> None:
+    """Forget the invalidation counters."""
+    with _COUNTERS_LOCK:
+        _COUNTERS.clear()
@@ -0,0 +1,114 @@
+"""Process-wide cache of parsed YAML files, keyed by path and modification stamp."""
+
+from __future__ import annotations
+
+import copy
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from yaml import safe_load
+
+
+# File modification stamp: (mtime in ns, size)
+Stamp = Tuple[int, int]
+
+# path -> (stamp, raw text, parsed content)
+_FILES: Dict[str, Tuple[Stamp, str, Any]] = {}
+# (step name, path) -> stamp of the file after the step last ran
+_STEPS: Dict[Tuple[str, str], Stamp | None] = {}
+# (step name, path) -> lock held while the step runs on the file
+_STEP_LOCKS: Dict[Tuple[str, str], threading.Lock] = {}
+_LOCK = threading.Lock()
+_STEPS_LOCK = threading.Lock()
+
+
+def _get_stamp(path: Path) -> Stamp | None:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_yaml(path: Path) -> Tuple[str, Any]:
+    """
+    Read and parse a YAML file, once per file change for the whole process.
+
+    Callers get their own copy of the parsed content, which they may modify.
+
+    Args:
+        path (Path): The YAML file.
+
+    Returns:
+        Tuple[str, Any]: The raw text and the parsed content.
+
+    Raises:
+        OSError: If the file cannot be read.
+        yaml.YAMLError: If the file is not valid YAML (nothing is cached).
+    """
+    key = str(path)
+    stamp = _get_stamp(path)
+    with _LOCK:
+        entry = _FILES.get(key)
+    if entry is None or stamp is None or entry[0] != stamp:
+        raw = Path(path).read_text(encoding="utf-8")
+        entry = (stamp, raw, safe_load(raw))
+        if stamp is not None:
+            with _LOCK:
+                _FILES[key] = entry
+    return entry[1], copy.deepcopy(entry[2])
+
+
+def load_yaml(path: Path) -> Any:
+    """Parse a YAML file (see `read_yaml`), returning a copy of its content."""
+    return read_yaml(path)[1]
+
+
+def run_once_per_change(
+    name: str,
+    path: Path,
+    step: Callable[[Path], Any],
+    done: Callable[[Any], bool] | None = None,
+) -> Any:
+    """
+    Run a step over a file (e.g. a migration), unless it already ran on its current version.
+
+    The stamp of the file is recorded after the step, so that a step rewriting the
+    file does not run again on its own output. A failing step is run again next
+    time, as is a step whose result `done` rejects (e.g. an unreachable endpoint).
+    Concurrent calls for the same step and file wait for each other; other steps
+    and files are not held up.
+
+    Args:
+        name (str): The step name.
+        path (Path): The file the step works on.
+        step (Callable[[Path], Any]): The step, called with `path`.
+        done (Callable[[Any], bool] | None): Tells from the step result whether it
+            completed; None if it always does.
+
+    Returns:
+        Any: The step result, or None if it was skipped.
+    """
+    key = (name, str(path))
+    with _STEPS_LOCK:
+        step_lock = _STEP_LOCKS.setdefault(key, threading.Lock())
+    with step_lock:
+        with _STEPS_LOCK:
+            up_to_date = key in _STEPS and _STEPS[key] == _get_stamp(path)
+        if up_to_date:
+            return None
+        result = step(path)
+        if done is None or done(result):
+            with _STEPS_LOCK:
+                _STEPS[key] = _get_stamp(path)
+    return result
+
+
+def clear_config_cache() -> None:
+    """Forget the parsed files and the steps that ran."""
+    with _LOCK:
+        _FILES.clear()
+    with _STEPS_LOCK:
+        _STEPS.clear()
+        _STEP_LOCKS.clear()
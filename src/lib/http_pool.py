@@ -0,0 +1,338 @@
+"""Process-wide pool of keep-alive HTTP sessions shared by every SPARQL call."""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+import weakref
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+def _get_pool_maxsize() -> int:
+    raw_value = os.getenv("LOGRE_HTTP_POOL_SIZE", "10")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 10
+    return parsed if parsed > 0 else 10
+
+
+def _get_pool_idle_seconds() -> float:
+    raw_value = os.getenv("LOGRE_HTTP_POOL_IDLE_SECONDS", "300")
+    try:
+        parsed = float(raw_value)
+    except (TypeError, ValueError):
+        return 300.0
+    return parsed if parsed > 0 else 300.0
+
+
+def _is_tcp_keepalive_enabled() -> bool:
+    return os.getenv("LOGRE_HTTP_KEEPALIVE", "1") != "0"
+
+
+def get_endpoint_key(url: str | None, username: str | None = None) -> str:
+    """
+    Build the pool key of an endpoint: scheme, host, port and user.
+
+    Two SPARQL clients pointing to the same server with the same credentials
+    share one session, and therefore its open connections.
+
+    Args:
+        url (str | None): Any URL of the endpoint (query, update, statements...).
+        username (str | None): The user the requests are authenticated with.
+
+    Returns:
+        str: The endpoint identity used to key the pool.
+    """
+    parts = urlsplit(url or "")
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is None:
+        port = 443 if scheme == "https" else 80
+    user = f"{username}@" if username else ""
+    return f"{scheme}://{user}{host}:{port}"
+
+
+class _CountingAdapter(HTTPAdapter):
+    """
+    HTTP adapter that keeps track of opened connections and sent requests.
+
+    It also counts the requests in progress, streamed responses included until
+    they are closed, so that the pool never closes a session in use.
+    """
+
+    def __init__(self, pool_maxsize: int, keepalive: bool) -> None:
+        self._keepalive = keepalive
+        self._retired_connections = 0
+        self._retired_requests = 0
+        self._in_use = 0
+        self._in_use_lock = threading.Lock()
+        # When a request last ended (monotonic clock)
+        self.last_released = 0.0
+        super().__init__(pool_connections=4, pool_maxsize=pool_maxsize)
+
+    @property
+    def in_use(self) -> int:
+        """Return the number of requests in progress (or responses being streamed)."""
+        with self._in_use_lock:
+            return self._in_use
+
+    def _acquire(self) -> None:
+        with self._in_use_lock:
+            self._in_use += 1
+
+    def _release(self) -> None:
+        with self._in_use_lock:
+            self._in_use -= 1
+            self.last_released = time.monotonic()
+
+    def send(self, request, stream=False, **kwargs):
+        self._acquire()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        if not stream:
+            self._release()
+            return response
+
+        # The body of a streamed response is read after `send` returns: the
+        # session is in use until the response is closed (or collected)
+        released = threading.Event()
+
+        def release() -> None:
+            with self._in_use_lock:
+                if released.is_set():
+                    return
+                released.set()
+            self._release()
+
+        close = response.close
+
+        def close_and_release() -> None:
+            try:
+                close()
+            finally:
+                release()
+
+        response.close = close_and_release
+        weakref.finalize(response, release)
+        return response
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._keepalive:
+            socket_options = list(HTTPConnection.default_socket_options)
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            pool_kwargs["socket_options"] = socket_options
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        # Keep the counters of host pools dropped by urllib3's own LRU
+        self.poolmanager.pools.dispose_func = self._retire_pool
+
+    def _retire_pool(self, pool) -> None:
+        self._retired_connections += getattr(pool, "num_connections", 0)
+        self._retired_requests += getattr(pool, "num_requests", 0)
+        pool.close()
+
+    def counters(self) -> Dict[str, int]:
+        connections = self._retired_connections
+        sent = self._retired_requests
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            sent += pool.num_requests
+        return {"requests": sent, "connections": connections}
+
+
+class SessionPool:
+    """
+    Thread-safe registry of `requests.Session`, one per endpoint identity.
+
+    Sessions keep their TCP/TLS connections open between queries (keep-alive).
+    A session that has not been used for `idle_seconds` is closed and dropped
+    the next time the pool is accessed; a session with a request in progress
+    (e.g. a long upload or a streamed download) is never closed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        idle_seconds: float | None = None,
+        keepalive: bool | None = None,
+    ) -> None:
+        self.maxsize = maxsize if maxsize is not None else _get_pool_maxsize()
+        self.idle_seconds = (
+            idle_seconds if idle_seconds is not None else _get_pool_idle_seconds()
+        )
+        self.keepalive = (
+            keepalive if keepalive is not None else _is_tcp_keepalive_enabled()
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._evicted: Dict[str, Dict[str, int]] = {}
+
+    def get(self, key: str) -> requests.Session:
+        """
+        Return the session of the given endpoint, creating it if needed.
+
+        Args:
+            key (str): The endpoint identity (see `get_endpoint_key`).
+
+        Returns:
+            requests.Session: The pooled session.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                adapter = _CountingAdapter(self.maxsize, self.keepalive)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Connection"] = "keep-alive"
+                entry = {"session": session, "adapter": adapter, "sessions": 1}
+                previous = self._evicted.get(key)
+                if previous:
+                    entry["sessions"] += previous["sessions"]
+                self._entries[key] = entry
+            entry["last_used"] = now
+            return entry["session"]
+
+    def evict_idle(self) -> None:
+        """Close sessions that have been idle for longer than `idle_seconds`."""
+        with self._lock:
+            self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now: float) -> None:
+        for key in list(self._entries.keys()):
+            entry = self._entries[key]
+            adapter = entry["adapter"]
+            # Idle since it was last handed out or since its last request ended
+            last_used = max(entry["last_used"], adapter.last_released)
+            if adapter.in_use == 0 and now - last_used > self.idle_seconds:
+                self._close_entry(key, entry)
+
+    def _close_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        counters = entry["adapter"].counters()
+        evicted = self._evicted.setdefault(
+            key, {"requests": 0, "connections": 0, "sessions": 0}
+        )
+        evicted["requests"] += counters["requests"]
+        evicted["connections"] += counters["connections"]
+        evicted["sessions"] = entry["sessions"]
+        entry["session"].close()
+        del self._entries[key]
+
+    def close(self) -> None:
+        """Close every pooled session."""
+        with self._lock:
+            for key in list(self._entries.keys()):
+                self._close_entry(key, self._entries[key])
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connection-reuse counters, per endpoint identity.
+
+        Returns:
+            Dict[str, Dict[str, int]]: For each endpoint: number of `requests`
+            sent, `connections` opened, `reused` connections (requests that did
+            not need a new connection), `sessions` created and whether the
+            session is currently `open`.
+        """
+        with self._lock:
+            keys = set(self._entries.keys()) | set(self._evicted.keys())
+            stats: Dict[str, Dict[str, int]] = {}
+            for key in sorted(keys):
+                evicted = self._evicted.get(
+                    key, {"requests": 0, "connections": 0, "sessions": 0}
+                )
+                entry = self._entries.get(key)
+                counters = (
+                    entry["adapter"].counters()
+                    if entry
+                    else {"requests": 0, "connections": 0}
+                )
+                sent = evicted["requests"] + counters["requests"]
+                connections = evicted["connections"] + counters["connections"]
+                stats[key] = {
+                    "requests": sent,
+                    "connections": connections,
+                    "reused": max(0, sent - connections),
+                    "sessions": entry["sessions"] if entry else evicted["sessions"],
+                    "open": 1 if entry else 0,
+                }
+            return stats
+
+
+_POOL = SessionPool()
+
+
+def get_session(url: str | None, username: str | None = None) -> requests.Session:
+    """
+    Return the process-wide keep-alive session for the endpoint behind `url`.
+
+    Args:
+        url (str | None): Any URL of the endpoint.
+        username (str | None): The user the requests are authenticated with.
+
+    Returns:
+        requests.Session: The pooled session.
+    """
+    return _POOL.get(get_endpoint_key(url, username))
+
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Return the connection-reuse counters of the process-wide pool."""
+    return _POOL.stats()
+
+
+def close_sessions() -> None:
+    """Close every session of the process-wide pool."""
+    _POOL.close()
+
+
+class PooledRequests:
+    """
+    Stand-in for the `requests` module whose HTTP verbs use the session pool.
+
+    It is injected in place of `requests` into the graphly modules, so that
+    methods we do not override (e.g. `upload_nquads_chunk`) reuse connections
+    too. Every other attribute is forwarded to the real `requests` module.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(requests, name)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        username = getattr(kwargs.get("auth"), "username", None)
+        return get_session(url, username).request(method, url, **kwargs)
+
+    def get(self, url: str, params=None, **kwargs) -> requests.Response:
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, data=None, json=None, **kwargs) -> requests.Response:
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def put(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request("PUT", url, data=data, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+
+pooled_requests = PooledRequests()
@@ -0,0 +1,260 @@
+"""Process-wide cache of parsed models, shared read-only by all the sessions."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+from lib.config_paths import get_config_home
+
+
+# The parsed content of a model: its classes and its properties
+ModelContent = Tuple[List[Any], List[Any]]
+
+# Version of the on-disk format: files of another version are ignored
+DISK_CACHE_VERSION = 2
+
+
+def _get_disk_cache_dir() -> Path | None:
+    if os.getenv("LOGRE_MODEL_DISK_CACHE", "1").strip().lower() in ("0", "false", "no"):
+        return None
+    return get_config_home() / "cache" / "models"
+
+
+def _get_graphly_version() -> str:
+    try:
+        return metadata.version("graphly")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+# Hex digits of each triple hash summed into the fingerprint
+FINGERPRINT_HEX_DIGITS = 8
+
+
+def get_model_fingerprint_query(data_bundle) -> str:
+    """
+    Build the query fingerprinting the content of a bundle model graph.
+
+    Each triple is hashed (MD5 of its terms, with the language and datatype of
+    literals), and the leading hex digits of the hashes are summed: any edit of
+    a term changes the sum, even one keeping its length, and the order in which
+    the endpoint returns the triples does not matter. Blank nodes have no stable
+    label across queries, so they are hashed as empty terms. Only the number of
+    triples and the sum are sent back.
+    """
+    digits = " + ".join(
+        f'STRLEN(STRBEFORE("0123456789abcdef", SUBSTR(?hash, {index + 1}, 1)))'
+        f" * {16 ** (FINGERPRINT_HEX_DIGITS - index - 1)}"
+        for index in range(FINGERPRINT_HEX_DIGITS)
+    )
+    return f"""
+        # lib.model_cache: model fingerprint
+        SELECT (COUNT(*) AS ?count) (SUM({digits}) AS ?checksum)
+        WHERE {{
+            {data_bundle.model.sparql_begin}
+                ?s ?p ?o .
+            {data_bundle.model.sparql_end}
+            BIND(MD5(CONCAT(
+                IF(isBlank(?s), "", STR(?s)), " ", STR(?p), " ",
+                IF(isBlank(?o), "", STR(?o)), " ",
+                IF(isLiteral(?o), CONCAT(STR(DATATYPE(?o)), "@", LANG(?o)), "")
+            )) AS ?hash)
+        }}
+    """
+
+
+def get_model_fingerprint(data_bundle) -> str:
+    """Fingerprint the content of a bundle model graph (see `get_model_fingerprint_query`)."""
+    response = data_bundle.run(get_model_fingerprint_query(data_bundle))
+    row = response[0] if response else {}
+    return f"{row.get('count', 0)}:{row.get('checksum', 0)}"
+
+
+class ModelCache:
+    """
+    Parsed models, keyed by endpoint, model graph and content fingerprint.
+
+    Each session keeps its own `Model` instance (bound to its own endpoint), whose
+    classes and properties are the shared, read-only lists. A model is parsed
+    once even if several sessions ask for it at the same time, and only the
+    latest fingerprint of each model graph is kept.
+
+    Parsed models are also written to `directory` (one pickle file per model
+    graph), so that after a restart they are read from disk instead of being
+    fetched, as long as the fingerprint of the graph did not change.
+    """
+
+    def __init__(self, directory: Path | None = None) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        # (endpoint, graph, settings) -> (fingerprint, content)
+        self._entries: Dict[Hashable, Tuple[str, ModelContent]] = {}
+        self._loading: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Tuple[str, str, Hashable], fingerprint: str) -> ModelContent | None:
+        """
+        Return the parsed content of a model, if cached for this fingerprint.
+
+        Args:
+            key (Tuple[str, str, Hashable]): The endpoint identity, the model graph
+                URI and the parsing settings (framework, prefixes, properties).
+            fingerprint (str): The current fingerprint of the model graph.
+
+        Returns:
+            ModelContent | None: The classes and properties, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[1]
+
+    def get_or_load(
+        self,
+        key: Tuple[str, str, Hashable],
+        fingerprint: str,
+        load: Callable[[], ModelContent],
+    ) -> Tuple[ModelContent, str]:
+        """
+        Return the parsed content of a model, parsing it (once) if not cached.
+
+        Args:
+            key (Tuple[str, str, Hashable]): See `get`.
+            fingerprint (str): The current fingerprint of the model graph.
+            load (Callable[[], ModelContent]): Fetches and parses the model.
+
+        Returns:
+            Tuple[ModelContent, str]: The shared classes and properties, and where
+            they come from: "memory", "disk" or "endpoint".
+        """
+        content = self.get(key, fingerprint)
+        if content is not None:
+            return content, "memory"
+
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            # Another session may have parsed it meanwhile
+            content = self.get(key, fingerprint)
+            source = "memory"
+            if content is None:
+                content = self.read_disk(key, fingerprint)
+                source = "disk"
+            if content is None:
+                content = load()
+                source = "endpoint"
+                self.write_disk(key, fingerprint, content)
+            with self._lock:
+                self._entries[key] = (fingerprint, content)
+        return content, source
+
+    def disk_path(self, key: Tuple[str, str, Hashable]) -> Path | None:
+        """Return the file a model is written to, None if the disk cache is disabled."""
+        if self.directory is None:
+            return None
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.pickle"
+
+    def read_disk(
+        self, key: Tuple[str, str, Hashable], fingerprint: str
+    ) -> ModelContent | None:
+        """
+        Read a parsed model from disk, if written for this fingerprint.
+
+        Files of another format version, graphly version or fingerprint, and
+        unreadable files, are ignored.
+        """
+        path = self.disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+        except Exception as err:
+            print(f"[model] Ignoring unreadable cached model {path.name}: {err}")
+            return None
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != DISK_CACHE_VERSION
+            or entry.get("graphly") != _get_graphly_version()
+            or entry.get("key") != key
+            or entry.get("fingerprint") != fingerprint
+        ):
+            return None
+        return entry["classes"], entry["properties"]
+
+    def write_disk(
+        self, key: Tuple[str, str, Hashable], fingerprint: str, content: ModelContent
+    ) -> None:
+        """Write a parsed model to disk (atomically); failures are only logged."""
+        path = self.disk_path(key)
+        if path is None:
+            return
+        entry = {
+            "version": DISK_CACHE_VERSION,
+            "graphly": _get_graphly_version(),
+            "key": key,
+            "fingerprint": fingerprint,
+            "classes": content[0],
+            "properties": content[1],
+        }
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except Exception as err:
+            print(f"[model] Unable to write cached model {path.name}: {err}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+    def invalidate(self, endpoint: str, graphs: Iterable[str] | None = None) -> int:
+        """
+        Drop the models of an endpoint.
+
+        Args:
+            endpoint (str): The endpoint identity.
+            graphs (Iterable[str] | None): The model graph URIs; None for all of them.
+
+        Returns:
+            int: The number of dropped models.
+        """
+        graphs = set(graphs) if graphs is not None else None
+        with self._lock:
+            stale_keys = [
+                key
+                for key in self._entries
+                if key[0] == endpoint and (graphs is None or key[1] in graphs)
+            ]
+            for key in stale_keys:
+                del self._entries[key]
+        for key in stale_keys:
+            path = self.disk_path(key)
+            if path is not None:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        """Drop every model kept in memory (files are kept, and checked before use)."""
+        with self._lock:
+            self._entries.clear()
+
+
+_MODEL_CACHE = ModelCache(_get_disk_cache_dir())
+
+
+def get_model_cache() -> ModelCache:
+    """Return the process-wide model cache."""
+    return _MODEL_CACHE
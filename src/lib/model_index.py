@@ -0,0 +1,102 @@
+"""Dict lookups over the classes and properties of a loaded model."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+
+class ModelIndex:
+    """
+    Classes and properties of a model, indexed by URI and by `card_of` class.
+
+    The model `find_class`/`find_properties` methods scan all the classes or
+    properties at each call, which adds up when called for each result row. The
+    index is built once per model load: classes are looked up by URI, card
+    properties are grouped (and sorted by order) per class, and property lookups
+    by (URI, domain class, range class) are answered once by the model, then
+    remembered, so that results stay the ones the model gives.
+    """
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+        self._classes = model.classes
+        self._properties = model.properties
+        self._sizes = (len(model.classes), len(model.properties))
+
+        self.classes_by_uri: Dict[str, Any] = {}
+        for cls in model.classes:
+            self.classes_by_uri.setdefault(cls.uri, cls)
+
+        self.properties_by_uri: Dict[str, List[Any]] = {}
+        self.card_properties: Dict[str, List[Any]] = {}
+        for prop in model.properties:
+            self.properties_by_uri.setdefault(prop.uri, []).append(prop)
+            if prop.card_of is not None:
+                self.card_properties.setdefault(prop.card_of.uri, []).append(prop)
+        for properties in self.card_properties.values():
+            properties.sort(key=lambda p: p.order or 10**18)
+
+        self._class_misses: Dict[str, Any] = {}
+        self._found_properties: Dict[Tuple[str, str | None, str | None], List[Any]] = {}
+
+    def is_current(self, model: Any) -> bool:
+        """Tell whether the index was built from the current content of a model."""
+        return (
+            self.model is model
+            and self._classes is model.classes
+            and self._properties is model.properties
+            and self._sizes == (len(model.classes), len(model.properties))
+        )
+
+    def find_class(self, uri: str | None) -> Any | None:
+        """
+        Find a class of the model by URI, as `Model.find_class` does.
+
+        Args:
+            uri (str | None): The class URI.
+
+        Returns:
+            Resource | None: The class, or what the model answers for unknown URIs.
+        """
+        cls = self.classes_by_uri.get(uri)
+        if cls is not None:
+            return cls
+        if uri not in self._class_misses:
+            self._class_misses[uri] = self.model.find_class(uri)
+        return self._class_misses[uri]
+
+    def find_properties(
+        self,
+        uri: str,
+        domain_class_uri: str | None = None,
+        range_class_uri: str | None = None,
+    ) -> List[Any]:
+        """
+        Find the properties of the model with a URI (and domain and range), as `Model.find_properties` does.
+
+        Args:
+            uri (str): The property URI.
+            domain_class_uri (str | None): The domain class URI, if known.
+            range_class_uri (str | None): The range class URI, if known.
+
+        Returns:
+            List[Property]: The matching properties.
+        """
+        key = (uri, domain_class_uri, range_class_uri)
+        if key not in self._found_properties:
+            self._found_properties[key] = self.model.find_properties(
+                uri, domain_class_uri=domain_class_uri, range_class_uri=range_class_uri
+            )
+        return list(self._found_properties[key])
+
+    def card_properties_of(self, class_uri: str | None) -> List[Any]:
+        """
+        List the card properties of a class, sorted by order.
+
+        Args:
+            class_uri (str | None): The class URI.
+
+        Returns:
+            List[Property]: The properties whose `card_of` is the class.
+        """
+        return list(self.card_properties.get(class_uri, []))
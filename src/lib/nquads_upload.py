@@ -0,0 +1,368 @@
+"""Read N-Quads files a block at a time, and cut them into upload chunks."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Deque, Iterable, Iterator, List, NamedTuple, Tuple
+
+from lib.config_paths import get_config_home
+
+
+# Size of the blocks read from the uploaded file
+READ_BLOCK_BYTES = 1 << 20
+
+# Literals and IRIs (kept as they are), or a blank node label (group 1)
+_BLANK_NODE_RE = re.compile(
+    rb'"(?:[^"\\]|\\.)*"|<[^>]*>|_:([A-Za-z0-9_](?:[A-Za-z0-9_.\-]*[A-Za-z0-9_\-])?)'
+)
+
+
+def _get_decision_log_path() -> Path | None:
+    # Opt-in: the log grows with every uploaded chunk
+    raw_value = os.getenv("LOGRE_UPLOAD_DECISION_LOG", "").strip()
+    if raw_value.lower() in ("", "0", "false", "no"):
+        return None
+    if raw_value.lower() in ("1", "true", "yes"):
+        return get_config_home() / "logs" / "upload-decisions.jsonl"
+    return Path(raw_value)
+
+
+class Chunk(NamedTuple):
+    """
+    Consecutive N-Quads lines of a file.
+
+    `start` is the byte offset of the chunk in the file, and `ends` the offset
+    right after the newline of each of its lines.
+    """
+
+    lines: List[bytes]
+    start: int
+    ends: List[int]
+
+    @property
+    def end(self) -> int:
+        """Return the offset right after the chunk."""
+        return self.ends[-1] if self.ends else self.start
+
+    @property
+    def size(self) -> int:
+        """Return the number of bytes of the chunk in the file."""
+        return self.end - self.start
+
+    @property
+    def text(self) -> str:
+        """Return the chunk as an N-Quads document."""
+        return b"\n".join(self.lines).decode("utf-8")
+
+    def skolemized_text(self, skolem_base: str) -> str:
+        """Return the chunk as an N-Quads document, with its blank nodes skolemized."""
+        lines = (skolemize_nquads_line(line, skolem_base) for line in self.lines)
+        return b"\n".join(lines).decode("utf-8")
+
+    def split(self, max_lines: int) -> Tuple["Chunk", "Chunk"]:
+        """Cut the chunk after its first `max_lines` lines (at least one)."""
+        cut = max(1, max_lines)
+        head_end = self.ends[cut - 1] if cut <= len(self.ends) else self.end
+        return (
+            Chunk(self.lines[:cut], self.start, self.ends[:cut]),
+            Chunk(self.lines[cut:], head_end, self.ends[cut:]),
+        )
+
+
+def as_binary_file(source: str | bytes | BinaryIO) -> BinaryIO:
+    """Return N-Quads content as a binary file (files are returned as they are)."""
+    if isinstance(source, str):
+        return io.BytesIO(source.encode("utf-8"))
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def skolemize_nquads_line(line: bytes, skolem_base: str) -> bytes:
+    """
+    Replace the blank nodes of an N-Quads line with skolem IRIs (see `lib.turtle.get_skolem_base`).
+
+    Each upload chunk is a separate request, in which a blank node label stands for
+    a new node: with skolem IRIs, a label shared by several chunks stays one node,
+    and a line sent again (after a retry or a resume) is not inserted twice.
+    """
+    if b"_:" not in line:
+        return line
+    base = skolem_base.encode("utf-8")
+    return _BLANK_NODE_RE.sub(
+        lambda match: b"<" + base + match.group(1) + b">" if match.group(1) else match.group(0),
+        line,
+    )
+
+
+class LineStream(io.RawIOBase):
+    """
+    Read-only binary file over generated lines (e.g. Turtle converted to N-Quads).
+
+    The lines are generated as the file is read; the file cannot be sought.
+    """
+
+    def __init__(self, lines: Iterable[bytes]) -> None:
+        super().__init__()
+        self._lines = iter(lines)
+        self._rest = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        size = 0
+        while size < len(view):
+            if not self._rest:
+                line = next(self._lines, None)
+                if line is None:
+                    break
+                self._rest = line
+                continue
+            count = min(len(view) - size, len(self._rest))
+            view[size : size + count] = self._rest[:count]
+            self._rest = self._rest[count:]
+            size += count
+        return size
+
+
+class NQuadsReader:
+    """
+    N-Quads lines of a file, read a block at a time.
+
+    Only one block and the lines of the chunk being built are held in memory,
+    whatever the size of the file. Blank lines are skipped.
+
+    Args:
+        source (str | bytes | BinaryIO): The N-Quads content, or a binary file
+            read from its current position.
+        block_bytes (int): The size of the blocks read from the file.
+    """
+
+    def __init__(
+        self, source: str | bytes | BinaryIO, block_bytes: int = READ_BLOCK_BYTES
+    ) -> None:
+        self.file = as_binary_file(source)
+        self.block_bytes = block_bytes
+        self.start = self._tell()
+        self.total_bytes = self._get_total_bytes()
+        # Offset, in the file, of the first byte not handed out yet
+        self.offset = self.start
+        self._lines = self._iter_lines()
+        self._pushed_back: Deque[Chunk] = deque()
+
+    def _tell(self) -> int:
+        try:
+            return self.file.tell()
+        except (AttributeError, OSError, ValueError):
+            return 0
+
+    def _get_total_bytes(self) -> int | None:
+        try:
+            position = self.file.tell()
+            end = self.file.seek(0, io.SEEK_END)
+            self.file.seek(position)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return end
+
+    def _iter_lines(self) -> Iterator[Tuple[bytes, int]]:
+        # Yields (line without its newline, offset right after the line)
+        position = self.start
+        rest = b""
+        while True:
+            block = self.file.read(self.block_bytes)
+            if not block:
+                break
+            lines = (rest + block).split(b"\n")
+            rest = lines.pop()
+            for line in lines:
+                position += len(line) + 1
+                yield line.rstrip(b"\r"), position
+        if rest:
+            yield rest.rstrip(b"\r"), position + len(rest)
+
+    def take(self, max_lines: int, max_bytes: int) -> Chunk | None:
+        """
+        Return the next chunk, None at the end of the file.
+
+        A chunk holds at most `max_lines` lines, and stops at the line that
+        reaches `max_bytes` bytes (a single line may be bigger).
+        """
+        if self._pushed_back:
+            chunk = self._pushed_back.popleft()
+            if len(chunk.lines) > max_lines:
+                chunk, rest = chunk.split(max_lines)
+                self._pushed_back.appendleft(rest)
+            return chunk
+
+        lines: List[bytes] = []
+        ends: List[int] = []
+        # Blank lines are skipped, but stay inside the chunk byte range, so that
+        # consecutive chunks cover the file without gaps
+        start = self.offset
+        for line, line_end in self._lines:
+            self.offset = line_end
+            if not line.strip():
+                continue
+            lines.append(line)
+            ends.append(line_end)
+            if len(lines) >= max_lines or line_end - start >= max_bytes:
+                break
+        if not lines:
+            return None
+        return Chunk(lines, start, ends)
+
+    def push_back(self, chunk: Chunk) -> None:
+        """Put a chunk back, to be returned by the next `take` calls (in order)."""
+        if chunk.lines:
+            self._pushed_back.appendleft(chunk)
+
+    @property
+    def percent_done(self) -> int | None:
+        """Return the share of the file read so far, None if its size is unknown."""
+        if not self.total_bytes or self.total_bytes <= self.start:
+            return None
+        done = self.offset - self.start
+        return round(done / (self.total_bytes - self.start) * 100)
+
+
+class UploadProgress:
+    """Triples and bytes uploaded so far, and the resulting throughput."""
+
+    def __init__(self) -> None:
+        self.triples = 0
+        self.bytes = 0
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, chunk: Chunk) -> None:
+        """Count an uploaded chunk."""
+        with self._lock:
+            self.triples += len(chunk.lines)
+            self.bytes += chunk.size
+
+    @property
+    def rate(self) -> str:
+        """Return the throughput since the upload started, e.g. "1200 triples/s, 0.35 MB/s"."""
+        elapsed = max(time.perf_counter() - self.started_at, 1e-6)
+        with self._lock:
+            triples, size = self.triples, self.bytes
+        return f"{triples / elapsed:.0f} triples/s, {size / elapsed / 1e6:.2f} MB/s"
+
+
+class ChunkSizeController:
+    """
+    AIMD sizing of the upload chunks, in lines.
+
+    After each uploaded chunk, its throughput (bytes per second) is compared to
+    the moving average of the previous ones: while it does not drop, chunks grow
+    by a fixed number of lines (at most doubling at once); when it falls below
+    `slowdown` times the average, chunks are halved. They are halved too when
+    the endpoint answers HTTP 413 or times out.
+
+    When enabled (see `LOGRE_UPLOAD_DECISION_LOG`), every decision is appended to a JSON Lines log,
+    to tune the default sizes of each endpoint technology.
+
+    Args:
+        lines (int): The initial chunk size.
+        technology (str): The endpoint technology (e.g. "GraphDB"), for the log.
+        endpoint (str): The endpoint URL, for the log.
+        max_lines (int | None): The largest chunk size; 16 times the initial one by default.
+        slowdown (float): The share of the average throughput below which chunks shrink.
+        smoothing (float): The weight of the last chunk in the moving average.
+        log_path (Path | None): The decision log; None not to log.
+    """
+
+    def __init__(
+        self,
+        lines: int,
+        technology: str = "",
+        endpoint: str = "",
+        max_lines: int | None = None,
+        slowdown: float = 0.5,
+        smoothing: float = 0.3,
+        log_path: Path | None = None,
+    ) -> None:
+        self.lines = max(1, lines)
+        self.increase = max(1, self.lines // 8)
+        self.max_lines = max_lines or self.lines * 16
+        self.slowdown = slowdown
+        self.smoothing = smoothing
+        self.technology = technology
+        self.endpoint = endpoint
+        self.log_path = log_path
+        # Moving average of the chunk throughputs, in bytes per second
+        self.average: float | None = None
+        self._lock = threading.Lock()
+
+    def on_success(self, chunk: Chunk, seconds: float) -> None:
+        """Adapt the chunk size to the throughput of an uploaded chunk."""
+        throughput = chunk.size / max(seconds, 1e-6)
+        with self._lock:
+            before = self.lines
+            average = self.average
+            if average is not None and throughput < average * self.slowdown:
+                decision, reason = "shrink", "slowdown"
+                self.lines = max(1, self.lines // 2)
+            elif len(chunk.lines) < self.lines:
+                # The chunk was cut by bytes (or the file ended): more lines would not help
+                decision, reason = "hold", "not full"
+            elif average is None or throughput >= average:
+                decision, reason = "grow", "throughput"
+                self.lines = min(self.max_lines, self.lines + min(self.increase, self.lines))
+            else:
+                decision, reason = "hold", "throughput"
+            self.average = (
+                throughput
+                if average is None
+                else self.smoothing * throughput + (1 - self.smoothing) * average
+            )
+        self._log(decision, reason, before, chunk, seconds, throughput)
+
+    def on_failure(self, chunk: Chunk, reason: str) -> None:
+        """Halve the chunk size after a chunk was rejected (e.g. reason "413" or "timeout")."""
+        with self._lock:
+            before = self.lines
+            self.lines = max(1, min(self.lines, len(chunk.lines) // 2))
+        self._log("shrink", reason, before, chunk)
+
+    def _log(
+        self,
+        decision: str,
+        reason: str,
+        before: int,
+        chunk: Chunk,
+        seconds: float | None = None,
+        throughput: float | None = None,
+    ) -> None:
+        if self.log_path is None:
+            return
+        entry = {
+            "time": time.time(),
+            "technology": self.technology,
+            "endpoint": self.endpoint,
+            "decision": decision,
+            "reason": reason,
+            "lines_before": before,
+            "lines_after": self.lines,
+            "chunk_lines": len(chunk.lines),
+            "chunk_bytes": chunk.size,
+            "seconds": seconds,
+            "bytes_per_second": throughput,
+        }
+        try:
+            with self._lock:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+        except OSError as err:
+            print(f"> Unable to write the upload decision log: {err}")
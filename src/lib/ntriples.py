@@ -0,0 +1,156 @@
+"""Line-by-line N-Triples parser and writer, for CONSTRUCT results and uploads."""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, NamedTuple, Tuple
+
+
+class Term(NamedTuple):
+    """
+    An RDF term.
+
+    `value` is the IRI, the blank node label (with its `_:` prefix) or the
+    literal lexical form. Literals carry either a `datatype` IRI or a `lang` tag.
+    """
+
+    value: str
+    kind: str  # "iri", "blank" or "literal"
+    datatype: str | None = None
+    lang: str | None = None
+
+
+Triple = Tuple[Term, Term, Term]
+
+XSD_STRING = "http://www.w3.org/2001/XMLSchema#string"
+
+IRI_RE = re.compile(r"<([^>]*)>")
+BLANK_RE = re.compile(r"_:([^\s<\"]+)")
+LITERAL_RE = re.compile(
+    r'"((?:[^"\\]|\\.)*)"(?:@([A-Za-z]+(?:-[A-Za-z0-9]+)*)|\^\^<([^>]*)>)?'
+)
+IRI_ESCAPE_RE = re.compile(r'[<>"{}|^`\\\x00-\x20]')
+ESCAPE_RE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+ECHAR_ESCAPES = {
+    "t": "\t",
+    "b": "\b",
+    "n": "\n",
+    "r": "\r",
+    "f": "\f",
+    '"': '"',
+    "'": "'",
+    "\\": "\\",
+}
+
+
+def unescape(value: str) -> str:
+    """Resolve the escape sequences (ECHAR and UCHAR) of a term."""
+    if "\\" not in value:
+        return value
+
+    def replace(match: re.Match) -> str:
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        return ECHAR_ESCAPES.get(match.group(3), match.group(0))
+
+    return ESCAPE_RE.sub(replace, value)
+
+
+def _read_term(line: str, position: int) -> Tuple[Term, int]:
+    while position < len(line) and line[position] in " \t":
+        position += 1
+    match = IRI_RE.match(line, position)
+    if match:
+        return Term(unescape(match.group(1)), "iri"), match.end()
+    match = BLANK_RE.match(line, position)
+    if match:
+        return Term(f"_:{match.group(1)}", "blank"), match.end()
+    match = LITERAL_RE.match(line, position)
+    if match:
+        datatype = unescape(match.group(3)) if match.group(3) else None
+        return (
+            Term(unescape(match.group(1)), "literal", datatype, match.group(2)),
+            match.end(),
+        )
+    raise ValueError(f"Invalid N-Triples term at column {position}: {line!r}")
+
+
+def parse_ntriples_line(line: str) -> Triple | None:
+    """
+    Parse one N-Triples line.
+
+    Args:
+        line (str): The line, with or without its line break.
+
+    Returns:
+        Triple | None: The (subject, predicate, object) terms, or None for an
+        empty or comment line.
+
+    Raises:
+        ValueError: If the line is not a valid triple.
+    """
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#"):
+        return None
+    subject, position = _read_term(stripped, 0)
+    predicate, position = _read_term(stripped, position)
+    obj, position = _read_term(stripped, position)
+    if stripped[position:].strip() != ".":
+        raise ValueError(f"Invalid N-Triples line end: {line!r}")
+    return subject, predicate, obj
+
+
+def iter_ntriples(lines: Iterable[str | bytes]) -> Iterator[Triple]:
+    """
+    Parse N-Triples lines one at a time.
+
+    Args:
+        lines (Iterable[str | bytes]): The document lines (bytes are read as UTF-8).
+
+    Yields:
+        Triple: The (subject, predicate, object) terms of each triple.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        triple = parse_ntriples_line(line)
+        if triple is not None:
+            yield triple
+
+
+def _escape_literal(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _escape_iri(value: str) -> str:
+    # Characters not allowed in an IRIREF are written as UCHAR
+    return IRI_ESCAPE_RE.sub(lambda match: f"\\u{ord(match.group(0)):04X}", value)
+
+
+def format_term(term: Term) -> str:
+    """
+    Write a term in N-Triples syntax.
+
+    Args:
+        term (Term): The term.
+
+    Returns:
+        str: The IRI between angle brackets, the blank node label, or the quoted
+        literal with its language tag or datatype.
+    """
+    if term.kind == "iri":
+        return f"<{_escape_iri(term.value)}>"
+    if term.kind == "blank":
+        return term.value
+    literal = f'"{_escape_literal(term.value)}"'
+    if term.lang:
+        return f"{literal}@{term.lang}"
+    if term.datatype and term.datatype != XSD_STRING:
+        return f"{literal}^^<{_escape_iri(term.datatype)}>"
+    return literal
@@ -0,0 +1,297 @@
+"""Compiled prefix index: fast URI shortening and expansion for large results."""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Remainders made of these characters are shortened by every implementation
+SAFE_LOCAL_NAME_RE = re.compile(r"[A-Za-z0-9_.-]+$")
+PROBE_LOCAL_NAME = "x"
+PROBE_UNSAFE_LOCAL_NAME = "x/y#z"
+PROBE_UNMATCHED_URI = "urn:logre:prefix-index:probe"
+
+
+class PrefixIndex:
+    """
+    Longest-namespace lookup over a set of prefixes, with a bounded memo.
+
+    Namespaces are kept sorted: the namespaces a URI starts with are found with
+    one bisection, then by walking up the "parent" chain (the longest other
+    namespace each namespace starts with), instead of testing every prefix.
+
+    Which prefix wins when several namespaces match (or when several prefixes
+    share a namespace) is decided once per namespace, when the index is built:
+    either by asking a reference implementation (``from_prefixes``, so results
+    stay identical to ``Prefixes.shorten``), or first-declared-wins
+    (``from_map``). URIs the index cannot answer for sure are delegated to the
+    reference implementation.
+    """
+
+    def __init__(
+        self,
+        entries: Sequence[Tuple[str, str]],
+        winners: Dict[str, Optional[Tuple[str, str]]],
+        reference_shorten: Callable[[str], str] | None = None,
+        reference_lengthen: Callable[[str], str] | None = None,
+        unsafe_local_names: bool = True,
+        lengthen_map: Dict[str, str] | None = None,
+        shorts: Any = None,
+        memo_size: int = 65536,
+    ) -> None:
+        self.entries = tuple(entries)
+        self._winners = winners
+        self._namespaces: List[str] = sorted(winners)
+        self._parents: List[int] = self._compute_parents(self._namespaces)
+        self._reference_shorten = reference_shorten
+        self._reference_lengthen = reference_lengthen
+        self._unsafe_local_names = unsafe_local_names
+        # Set when the reference implementation alters unmatched URIs
+        self._reference_only = False
+        self._lengthen_map = (
+            lengthen_map
+            if lengthen_map is not None
+            else {short: long for short, long in reversed(self.entries)}
+        )
+        self._shorts = (
+            shorts
+            if shorts is not None
+            else list(dict.fromkeys(short for short, _ in entries))
+        )
+        self.shorten = lru_cache(maxsize=memo_size)(self._shorten)
+
+    @staticmethod
+    def _compute_parents(namespaces: List[str]) -> List[int]:
+        parents: List[int] = []
+        for index, namespace in enumerate(namespaces):
+            parent = index - 1
+            # Every namespace that prefixes this one sorts before it, on the
+            # parent chain of its predecessor
+            while parent >= 0 and not namespace.startswith(namespaces[parent]):
+                parent = parents[parent]
+            parents.append(parent)
+        return parents
+
+    @classmethod
+    def from_map(
+        cls, prefix_map: Dict[str, str], memo_size: int = 4096
+    ) -> "PrefixIndex":
+        """
+        Build an index where the first declared matching prefix wins.
+
+        Args:
+            prefix_map (Dict[str, str]): Prefixes, short -> long, in declaration order.
+            memo_size (int): Number of recent URIs remembered.
+
+        Returns:
+            PrefixIndex: The compiled index.
+        """
+        entries = [
+            (short, long) for short, long in prefix_map.items() if short and long
+        ]
+        order = {}
+        for position, (short, long) in enumerate(entries):
+            order.setdefault(long, (position, short, long))
+
+        index = cls(entries, {long: None for long in order}, memo_size=memo_size)
+        for position, namespace in enumerate(index._namespaces):
+            candidates = []
+            current = position
+            while current >= 0:
+                candidates.append(order[index._namespaces[current]])
+                current = index._parents[current]
+            _, short, long = min(candidates)
+            index._winners[namespace] = (short, long)
+        return index
+
+    @classmethod
+    def from_prefixes(cls, prefixes: Any, memo_size: int = 65536) -> "PrefixIndex":
+        """
+        Build an index reproducing the results of a `Prefixes` object.
+
+        Args:
+            prefixes (Prefixes): The prefixes; iterating gives items with `short`
+                and `long`, and `shorten`/`lengthen`/`shorts` are used as reference.
+            memo_size (int): Number of recent URIs remembered.
+
+        Returns:
+            PrefixIndex: The compiled index.
+        """
+        entries = prefix_signature(prefixes)
+        declared = set(entries)
+        winners: Dict[str, Optional[Tuple[str, str]]] = {}
+        unsafe_local_names = True
+        for _, long in entries:
+            if long in winners:
+                continue
+            winners[long] = _probe_winner(
+                prefixes.shorten, long, PROBE_LOCAL_NAME, declared
+            )
+            if winners[long] is not None and unsafe_local_names:
+                unsafe_local_names = (
+                    _probe_winner(
+                        prefixes.shorten, long, PROBE_UNSAFE_LOCAL_NAME, declared
+                    )
+                    == winners[long]
+                )
+
+        lengthen_map: Dict[str, str] = {}
+        for short, long in entries:
+            if short in lengthen_map:
+                continue
+            probe = f"{short}:{PROBE_LOCAL_NAME}"
+            expanded = prefixes.lengthen(probe)
+            for _, candidate in entries:
+                if expanded == candidate + PROBE_LOCAL_NAME:
+                    lengthen_map[short] = candidate
+                    break
+
+        index = cls(
+            entries,
+            winners,
+            reference_shorten=prefixes.shorten,
+            reference_lengthen=prefixes.lengthen,
+            unsafe_local_names=unsafe_local_names,
+            lengthen_map=lengthen_map,
+            shorts=prefixes.shorts(),
+            memo_size=memo_size,
+        )
+        if prefixes.shorten(PROBE_UNMATCHED_URI) != PROBE_UNMATCHED_URI:
+            index._reference_only = True
+        return index
+
+    def _longest_namespace(self, uri: str) -> Optional[str]:
+        position = bisect_right(self._namespaces, uri) - 1
+        while position >= 0:
+            namespace = self._namespaces[position]
+            if uri.startswith(namespace):
+                return namespace
+            position = self._parents[position]
+        return None
+
+    def _shorten(self, uri: str) -> str:
+        if self._reference_only or not isinstance(uri, str) or uri.startswith("<"):
+            return self._delegate_shorten(uri)
+        namespace = self._longest_namespace(uri)
+        if namespace is None:
+            return uri
+        winner = self._winners[namespace]
+        if winner is None or (
+            len(uri) == len(namespace) and self._reference_shorten is not None
+        ):
+            return self._delegate_shorten(uri)
+        short, winner_namespace = winner
+        local_name = uri[len(winner_namespace) :]
+        if not self._unsafe_local_names and not SAFE_LOCAL_NAME_RE.match(local_name):
+            return self._delegate_shorten(uri)
+        return f"{short}:{local_name}"
+
+    def _delegate_shorten(self, uri: str) -> str:
+        if self._reference_shorten is None:
+            return uri
+        return self._reference_shorten(uri)
+
+    def lengthen(self, uri: str) -> str:
+        """
+        Expand a shortened URI (``short:local``) to its full form.
+
+        Args:
+            uri (str): The URI to expand.
+
+        Returns:
+            str: The full URI, or `uri` itself if it is not a known short form.
+        """
+        if isinstance(uri, str) and ":" in uri and "://" not in uri:
+            short, local_name = uri.split(":", 1)
+            long = self._lengthen_map.get(short)
+            if long is not None:
+                return long + local_name
+        if self._reference_lengthen is None:
+            return uri
+        return self._reference_lengthen(uri)
+
+    def shorts(self) -> Any:
+        """Return the prefix shorts, computed once (as `Prefixes.shorts()` would)."""
+        return self._shorts
+
+
+def _probe_winner(
+    shorten: Callable[[str], str],
+    namespace: str,
+    local_name: str,
+    declared: set,
+) -> Optional[Tuple[str, str]]:
+    # Ask the reference implementation which prefix (and so which namespace)
+    # it uses for URIs whose longest declared namespace is `namespace`
+    uri = namespace + local_name
+    result = shorten(uri)
+    if not isinstance(result, str) or result == uri:
+        return None
+    short, separator, tail = result.partition(":")
+    if not separator or not uri.endswith(tail):
+        return None
+    winner_namespace = uri[: len(uri) - len(tail)]
+    if (short, winner_namespace) not in declared:
+        return None
+    return short, winner_namespace
+
+
+def prefix_signature(prefixes: Iterable[Any]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Describe a set of prefixes as (short, long) pairs in declaration order.
+
+    Args:
+        prefixes (Iterable[Prefix]): Items with `short` and `long` attributes.
+
+    Returns:
+        Tuple[Tuple[str, str], ...]: The pairs, skipping incomplete prefixes.
+    """
+    return tuple(
+        (prefix.short, prefix.long)
+        for prefix in prefixes
+        if getattr(prefix, "short", None) and getattr(prefix, "long", None)
+    )
+
+
+def get_prefix_index(prefixes: Any) -> PrefixIndex:
+    """
+    Return the index of a `Prefixes` object, built on first use.
+
+    The index is kept on the object: after editing the prefixes in place (as
+    `state.update_prefix` does), call `invalidate_prefix_index` to rebuild it.
+
+    Args:
+        prefixes (Prefixes): The prefixes to index.
+
+    Returns:
+        PrefixIndex: The compiled index.
+    """
+    index = getattr(prefixes, "_logre_prefix_index", None)
+    if index is None:
+        index = PrefixIndex.from_prefixes(prefixes)
+        try:
+            prefixes._logre_prefix_index = index
+        except AttributeError:
+            pass
+    return index
+
+
+def invalidate_prefix_index(prefixes: Any) -> None:
+    """Drop the index kept on a `Prefixes` object, after the prefixes were edited."""
+    try:
+        del prefixes._logre_prefix_index
+    except AttributeError:
+        pass
+
+
+@lru_cache(maxsize=8)
+def _get_map_index(items: Tuple[Tuple[str, str], ...]) -> PrefixIndex:
+    return PrefixIndex.from_map(dict(items))
+
+
+def get_map_index(prefix_map: Dict[str, str]) -> PrefixIndex:
+    """Return a first-declared-wins index for a plain short -> long mapping."""
+    return _get_map_index(tuple(prefix_map.items()))
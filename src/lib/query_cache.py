@@ -0,0 +1,350 @@
+"""Process-wide cache of SPARQL read-query results, invalidated per named graph."""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Tuple
+
+
+UPDATE_KEYWORD_RE = re.compile(
+    r"^(INSERT|DELETE|LOAD|CLEAR|DROP|CREATE|ADD|MOVE|COPY|WITH)\b", re.IGNORECASE
+)
+SELECT_KEYWORD_RE = re.compile(r"^SELECT\b", re.IGNORECASE)
+PROLOGUE_LINE_RE = re.compile(
+    r"^\s*(PREFIX|BASE)\b[^\n]*$|^\s*#[^\n]*$", re.IGNORECASE | re.MULTILINE
+)
+GRAPH_REFERENCE_RE = re.compile(
+    r"\b(?:GRAPH|FROM\s+NAMED|FROM|USING\s+NAMED|USING|INTO|WITH)\s+"
+    r"(<[^>]*>|[?$]\w+|[A-Za-z][\w.-]*:[^\s{}()]*)",
+    re.IGNORECASE,
+)
+# Clauses setting the default graph of a query or an update to named graphs
+DEFAULT_GRAPH_CLAUSE_RE = re.compile(r"\b(?:(?:FROM|USING)\s+(?!NAMED\b)|WITH\s+)", re.IGNORECASE)
+STRING_RE = re.compile(r""""(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'""")
+IRI_RE = re.compile(r"<[^<>\s]*>")
+GRAPH_BLOCK_START_RE = re.compile(
+    r"\bGRAPH\s+(?:<>|[?$]\w+|[A-Za-z][\w.-]*:[^\s{}()]*)\s*\{", re.IGNORECASE
+)
+# Parts of a query body that are not triple patterns
+NON_PATTERN_RES = [
+    re.compile(r"\b(?:SELECT|CONSTRUCT\s+WHERE|DESCRIBE)\b[^{]*", re.IGNORECASE),
+    re.compile(r"\bCONSTRUCT\s*\{[^{}]*\}", re.IGNORECASE),
+    re.compile(r"\bVALUES\s+(?:[?$]\w+|\([^)]*\))\s*\{[^{}]*\}", re.IGNORECASE),
+    re.compile(r"\b(?:GROUP|ORDER)\s+BY\b[^{}]*", re.IGNORECASE),
+]
+NESTED_PARENTHESES_RE = re.compile(r"\([^()]*\)")
+PATTERN_TERM_RE = re.compile(r"[?$]\w+|<>|_:\w+|\[|\b[A-Za-z][\w.-]*:[^\s{}()]*|:\w+")
+
+
+def _get_cache_max_bytes() -> int:
+    raw_value = os.getenv("LOGRE_QUERY_CACHE_MB", "64")
+    try:
+        parsed = float(raw_value)
+    except (TypeError, ValueError):
+        return 64 * 1024 * 1024
+    return int(parsed * 1024 * 1024) if parsed >= 0 else 64 * 1024 * 1024
+
+
+def _get_cache_ttl_seconds() -> float:
+    raw_value = os.getenv("LOGRE_QUERY_CACHE_TTL", "300")
+    try:
+        parsed = float(raw_value)
+    except (TypeError, ValueError):
+        return 300.0
+    return parsed if parsed >= 0 else 300.0
+
+
+def is_update_query(text: str) -> bool:
+    """
+    Tell whether a SPARQL text is an update (INSERT, DELETE, CLEAR, ...).
+
+    Args:
+        text (str): The SPARQL text, possibly starting with PREFIX/BASE declarations.
+
+    Returns:
+        bool: True if the first keyword after the prologue is an update keyword.
+    """
+    body = PROLOGUE_LINE_RE.sub("", text).strip()
+    return bool(UPDATE_KEYWORD_RE.match(body))
+
+
+def is_select_query(text: str) -> bool:
+    """
+    Tell whether a SPARQL text is a SELECT query (so its results are a table).
+
+    Args:
+        text (str): The SPARQL text, possibly starting with PREFIX/BASE declarations.
+
+    Returns:
+        bool: True if the first keyword after the prologue is SELECT.
+    """
+    body = PROLOGUE_LINE_RE.sub("", text).strip()
+    return bool(SELECT_KEYWORD_RE.match(body))
+
+
+def normalize_graph_uri(uri: str | None, prefix_map: Dict[str, str] | None = None) -> str:
+    """
+    Bring a graph reference to its full IRI form (no angle brackets).
+
+    Args:
+        uri (str | None): Graph reference: `<iri>`, `iri` or `short:local`.
+        prefix_map (Dict[str, str] | None): Known prefixes (short -> long).
+
+    Returns:
+        str: The full IRI, or an empty string for the default graph.
+    """
+    value = (uri or "").strip()
+    if value.startswith("<") and value.endswith(">"):
+        return value[1:-1]
+    if prefix_map and ":" in value and "://" not in value:
+        short, local = value.split(":", 1)
+        if short in prefix_map:
+            return prefix_map[short] + local
+    return value
+
+
+def _has_default_graph_patterns(text: str) -> bool:
+    """Tell whether a SPARQL text has triple patterns (or templates) outside GRAPH blocks."""
+    body = PROLOGUE_LINE_RE.sub("", text)
+    body = STRING_RE.sub('""', body)
+    body = IRI_RE.sub("<>", body)
+
+    # Cut the GRAPH blocks, with their nested braces
+    while True:
+        match = GRAPH_BLOCK_START_RE.search(body)
+        if match is None:
+            break
+        depth, end = 1, match.end()
+        while end < len(body) and depth:
+            depth += {"{": 1, "}": -1}.get(body[end], 0)
+            end += 1
+        body = body[: match.start()] + " " + body[end:]
+
+    for regex in NON_PATTERN_RES:
+        body = regex.sub(" ", body)
+    # Expressions (FILTER, BIND, projections...) are not patterns
+    previous = None
+    while previous != body:
+        previous, body = body, NESTED_PARENTHESES_RE.sub(" ", body)
+    return bool(PATTERN_TERM_RE.search(body))
+
+
+def referenced_graphs(
+    text: str, prefix_map: Dict[str, str] | None = None
+) -> FrozenSet[str] | None:
+    """
+    List the named graphs a SPARQL text reads from or writes to.
+
+    Patterns outside GRAPH blocks read (or write) the default graph, which is the
+    union of all the graphs on some stores (e.g. GraphDB, RDF4J): unless FROM,
+    USING or WITH set it, the text may then touch any graph.
+
+    Args:
+        text (str): The SPARQL text.
+        prefix_map (Dict[str, str] | None): Known prefixes (short -> long).
+
+    Returns:
+        FrozenSet[str] | None: The full IRIs of the referenced graphs, or None when
+        the text may touch any graph (graph variable, or default graph patterns).
+    """
+    graphs = set()
+    for match in GRAPH_REFERENCE_RE.finditer(text):
+        reference = match.group(1)
+        if reference[0] in "?$":
+            return None
+        graphs.add(normalize_graph_uri(reference, prefix_map))
+    if not graphs:
+        return None
+    if not DEFAULT_GRAPH_CLAUSE_RE.search(text) and _has_default_graph_patterns(text):
+        return None
+    return frozenset(graphs)
+
+
+def _estimate_size(value: Any) -> int:
+    if hasattr(value, "memory_usage"):  # DataFrame results
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(k) + _estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _copy_result(value: Any) -> Any:
+    # Rows hold immutable scalars: copying rows is enough to protect the cache
+    # from callers mutating the returned bindings
+    if isinstance(value, list):
+        return [dict(row) if isinstance(row, dict) else row for row in value]
+    if hasattr(value, "memory_usage"):  # DataFrame results
+        return value.copy()
+    return value
+
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache with time-to-live and a memory budget.
+
+    Every entry belongs to an endpoint and is tagged with the named graphs its
+    query reads. A write to a graph only drops the entries tagged with that graph,
+    along with untagged entries (which may read any graph).
+    """
+
+    def __init__(
+        self, max_bytes: int | None = None, ttl_seconds: float | None = None
+    ) -> None:
+        self.max_bytes = max_bytes if max_bytes is not None else _get_cache_max_bytes()
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else _get_cache_ttl_seconds()
+        )
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._generations: Dict[str, int] = {}
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def generation(self, endpoint: str) -> int:
+        """Return the number of invalidations an endpoint went through so far."""
+        with self._lock:
+            return self._generations.get(endpoint, 0)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and a copy of the result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return False, None
+            if time.monotonic() - entry["stored_at"] > self.ttl_seconds:
+                self._remove(key)
+                self._counters["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            value = entry["value"]
+        return True, _copy_result(value)
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        endpoint: str,
+        graphs: Iterable[str] | None = None,
+        generation: int | None = None,
+    ) -> None:
+        """
+        Store a result, evicting the least recently used entries if over budget.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The parsed query result.
+            endpoint (str): The endpoint identity the query was sent to.
+            graphs (Iterable[str] | None): Named graphs read by the query, None for any.
+            generation (int | None): The endpoint generation read before sending the
+                query. If a write happened meanwhile, the result is not stored.
+        """
+        if not self.enabled:
+            return
+        size = _estimate_size(value)
+        if size > self.max_bytes // 4:
+            return
+        entry = {
+            "value": _copy_result(value),
+            "endpoint": endpoint,
+            "graphs": frozenset(graphs) if graphs is not None else None,
+            "size": size,
+            "stored_at": time.monotonic(),
+        }
+        with self._lock:
+            if (
+                generation is not None
+                and self._generations.get(endpoint, 0) != generation
+            ):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, endpoint: str, graphs: Iterable[str] | None = None) -> int:
+        """
+        Drop the entries an endpoint write may have made stale.
+
+        Args:
+            endpoint (str): The endpoint identity that was written to.
+            graphs (Iterable[str] | None): Written named graphs, None if unknown.
+
+        Returns:
+            int: The number of dropped entries.
+        """
+        written = frozenset(graphs) if graphs is not None else None
+        with self._lock:
+            self._generations[endpoint] = self._generations.get(endpoint, 0) + 1
+            stale_keys = [
+                key
+                for key, entry in self._entries.items()
+                if entry["endpoint"] == endpoint
+                and (
+                    written is None
+                    or entry["graphs"] is None
+                    or not entry["graphs"].isdisjoint(written)
+                )
+            ]
+            for key in stale_keys:
+                self._remove(key)
+            self._counters["invalidations"] += len(stale_keys)
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction/invalidation counters and the current footprint."""
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+
+_CACHE = QueryResultCache()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Return the process-wide query result cache."""
+    return _CACHE
+
+
+def get_endpoint_identity(url: str | None, username: str | None = None) -> str:
+    """Identify an endpoint (repository URL and user) for cache scoping."""
+    return f"{username or ''}@{(url or '').rstrip('/')}"
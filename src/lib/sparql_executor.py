@@ -0,0 +1,111 @@
+"""Run independent SPARQL queries concurrently, with a cap per endpoint."""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence
+
+
+def _get_max_concurrency() -> int:
+    raw_value = os.getenv("LOGRE_SPARQL_MAX_CONCURRENCY", "4")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 4
+    return parsed if parsed > 0 else 4
+
+
+class QueryExecutor:
+    """
+    Shared thread pool sending batches of queries at the same time.
+
+    Calls are grouped per endpoint key: at most `max_concurrency` calls of the
+    same endpoint are in flight at once, whatever the number of pages (and so
+    of batches) using it. A batch started from inside a worker (a call that
+    itself gathers) runs inline, so workers never wait on each other.
+    """
+
+    def __init__(self, max_concurrency: int | None = None, max_workers: int = 16) -> None:
+        self.max_concurrency = (
+            max_concurrency if max_concurrency is not None else _get_max_concurrency()
+        )
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(max_workers, self.max_concurrency),
+            thread_name_prefix="logre-sparql",
+        )
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._local = threading.local()
+
+    def _semaphore(self, endpoint_key: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(endpoint_key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrency)
+                self._semaphores[endpoint_key] = semaphore
+            return semaphore
+
+    def _call(self, semaphore: threading.BoundedSemaphore, call: Callable[[], Any]) -> Any:
+        self._local.in_worker = True
+        try:
+            with semaphore:
+                return call()
+        finally:
+            self._local.in_worker = False
+
+    def run(self, endpoint_key: str, calls: Sequence[Callable[[], Any]]) -> List[Any]:
+        """
+        Run calls concurrently and return their results.
+
+        Args:
+            endpoint_key (str): The endpoint the calls query (see `http_pool.get_endpoint_key`).
+            calls (Sequence[Callable[[], Any]]): Independent calls, without arguments.
+
+        Returns:
+            List[Any]: The call results, in the order of `calls`.
+
+        Raises:
+            Exception: The exception raised by the first failing call (in the order
+                of `calls`), unchanged: an `HTTPError` keeps its response, as
+                `get_HTTP_ERROR_message` expects.
+        """
+        if len(calls) <= 1 or getattr(self._local, "in_worker", False):
+            return [call() for call in calls]
+
+        semaphore = self._semaphore(endpoint_key)
+        futures: List[Future] = [
+            self._pool.submit(self._call, semaphore, call) for call in calls
+        ]
+        results: List[Any] = []
+        error: BaseException | None = None
+        for future in futures:
+            if error is not None:
+                # Do not send queries whose results would be thrown away
+                future.cancel()
+                continue
+            try:
+                results.append(future.result())
+            except BaseException as err:
+                error = err
+        if error is not None:
+            raise error
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (pending calls are still run)."""
+        self._pool.shutdown(wait=True)
+
+
+_EXECUTOR: QueryExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_query_executor() -> QueryExecutor:
+    """Return the process-wide query executor, created on first use."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = QueryExecutor()
+        return _EXECUTOR
@@ -1,19 +1,42 @@
-from typing import Any, Dict, List
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+import re
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List
 
 from graphly.schema import Prefixes
 
+from lib.prefix_index import get_prefix_index
+
+if TYPE_CHECKING:
+    # pandas is only imported when a table is built, not to slow down startup
+    import pandas as pd
+
+
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+TSV_INTEGER_SUFFIX = f"^^<{XSD_INTEGER}>"
+TSV_INTEGER_RE = re.compile(r"[+-]?[0-9]+$")
+TSV_ESCAPE_RE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+TSV_ESCAPES = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f"}
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = " \t\n\r"
+
 
-def _parse_binding_value(binding: dict[str, Any], prefixes: Prefixes) -> Any:
+def _parse_binding_value(
+    binding: dict[str, Any], shorten: Callable[[str], str]
+) -> Any:
     value_type = binding.get("type")
     datatype = binding.get("datatype")
     value = binding.get("value")
 
     if value_type == "uri":
-        return prefixes.shorten(value)
-    if (
-        value_type == "literal"
-        and datatype == "http://www.w3.org/2001/XMLSchema#integer"
-    ):
+        return shorten(value)
+    if value_type == "literal" and datatype == XSD_INTEGER:
         if value is None:
             return None
         try:
@@ -52,30 +75,473 @@ def parse_sparql_json_response(
         if isinstance(vars_, list):
             columns = [str(column) for column in vars_]
 
-    rows: List[Dict[str, Any]] = []
-    for binding_row in bindings:
-        if not isinstance(binding_row, dict):
-            continue
-
-        row: Dict[str, Any] = {}
-        for key, value_obj in binding_row.items():
-            if isinstance(value_obj, dict):
-                row[key] = _parse_binding_value(value_obj, prefixes)
-            else:
-                row[key] = value_obj
-
-        rows.append(row)
+    shorten = get_prefix_index(prefixes).shorten
+    rows: List[Dict[str, Any]] = [
+        _parse_binding_row(binding_row, shorten)
+        for binding_row in bindings
+        if isinstance(binding_row, dict)
+    ]
 
     # Preserve SELECT projection columns without forcing every row to carry
     # explicit None values (which floods table cells with blanks).
     if rows and columns:
-        first_row = rows[0]
-        ordered_first_row: Dict[str, Any] = {
-            column: first_row.get(column) for column in columns
-        }
-        for key, value in first_row.items():
-            if key not in ordered_first_row:
-                ordered_first_row[key] = value
-        rows[0] = ordered_first_row
+        rows[0] = _order_first_row(rows[0], columns)
 
     return rows
+
+
+def _parse_binding_row(
+    binding_row: dict[str, Any], shorten: Callable[[str], str]
+) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for key, value_obj in binding_row.items():
+        if isinstance(value_obj, dict):
+            row[key] = _parse_binding_value(value_obj, shorten)
+        else:
+            row[key] = value_obj
+    return row
+
+
+def _order_first_row(first_row: Dict[str, Any], columns: List[str]) -> Dict[str, Any]:
+    ordered_first_row: Dict[str, Any] = {
+        column: first_row.get(column) for column in columns
+    }
+    for key, value in first_row.items():
+        if key not in ordered_first_row:
+            ordered_first_row[key] = value
+    return ordered_first_row
+
+
+class _JsonStream:
+    """
+    Pull-based reader over a JSON document split in byte chunks.
+
+    Only the structure leading to ``results.bindings`` is walked by hand; every
+    other value (``head``, each binding row...) is decoded at once with
+    ``json.JSONDecoder.raw_decode``, as soon as it is complete in the buffer.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+
+    def _fill(self) -> bool:
+        if self._exhausted:
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            text = chunk if isinstance(chunk, str) else self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._exhausted = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in _JSON_WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer):
+                return buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                f"Invalid SPARQL JSON results: expected {char!r}, found {found!r}"
+            )
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._exhausted:
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Iterate over the keys of the object starting here, leaving values unread."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError("Invalid SPARQL JSON results: malformed object")
+
+    def items(self) -> Iterator[Any]:
+        """Iterate over the values of the array starting here."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError("Invalid SPARQL JSON results: malformed array")
+
+
+def _iter_raw_bindings(
+    chunks: Iterable[bytes],
+    on_head: Callable[[List[str]], None],
+) -> Iterator[dict]:
+    stream = _JsonStream(chunks)
+    if stream.peek() != "{":
+        return
+
+    for key in stream.members():
+        if key == "results" and stream.peek() == "{":
+            for results_key in stream.members():
+                if results_key == "bindings" and stream.peek() == "[":
+                    for binding_row in stream.items():
+                        if isinstance(binding_row, dict):
+                            yield binding_row
+                else:
+                    stream.value()
+        elif key == "head":
+            head = stream.value()
+            vars_ = head.get("vars") if isinstance(head, dict) else None
+            if isinstance(vars_, list):
+                on_head([str(column) for column in vars_])
+        else:
+            stream.value()
+
+
+def iter_sparql_json_rows(
+    chunks: Iterable[bytes],
+    prefixes: Prefixes,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse SPARQL JSON results, yielding one row at a time.
+
+    Rows are parsed exactly like ``parse_sparql_json_response`` does, but the
+    response body is consumed chunk by chunk: neither the raw body nor the whole
+    JSON tree is ever held in memory. Stopping the iteration early stops reading.
+
+    Args:
+        chunks (Iterable[bytes]): The response body, e.g. ``response.iter_content()``.
+        prefixes (Prefixes): Prefixes used to shorten URIs.
+
+    Yields:
+        Dict[str, Any]: One parsed row per binding.
+    """
+    shorten = get_prefix_index(prefixes).shorten
+    columns: List[str] = []
+    first = True
+    for binding_row in _iter_raw_bindings(chunks, columns.extend):
+        row = _parse_binding_row(binding_row, shorten)
+        if first and columns:
+            row = _order_first_row(row, columns)
+        first = False
+        yield row
+
+
+def _to_integer_column(values: List[Any], rows: List[int]) -> Any:
+    """Convert the ``xsd:integer`` cells (at `rows`) of a column, in one pass."""
+    if not rows:
+        return values
+    import numpy as np
+    import pandas as pd
+
+    raw = pd.Series([values[index] for index in rows], dtype=object)
+    converted = pd.to_numeric(raw, errors="coerce")
+    if converted.dtype.kind in "iu":
+        if len(rows) == len(values):
+            return converted.to_numpy()
+        column = np.array(values, dtype=object)
+        column[rows] = converted.tolist()
+        return column
+    # Some values are not valid integers (or overflow): same fallback as row mode
+    column = list(values)
+    for index in rows:
+        try:
+            column[index] = int(str(column[index]))
+        except (TypeError, ValueError):
+            pass
+    return column
+
+
+class _ColumnarBuilder:
+    """
+    Accumulate SPARQL bindings as one list per variable, then build a DataFrame.
+
+    URIs are shortened once per distinct value, and ``xsd:integer`` literals are
+    converted per column, in one vectorized pass.
+    """
+
+    def __init__(self, shorten: Callable[[str], str]) -> None:
+        self.shorten = shorten
+        self.head: List[str] = []
+        self.columns: Dict[str, List[Any]] = {}
+        self.integer_rows: Dict[str, List[int]] = {}
+        self.size = 0
+        self._shortened: Dict[str, str] = {}
+
+    def set_head(self, columns: List[str]) -> None:
+        self.head = columns
+        for column in columns:
+            if column not in self.columns:
+                self._add_column(column)
+
+    def _add_column(self, name: str) -> List[Any]:
+        values: List[Any] = [None] * self.size
+        self.columns[name] = values
+        self.integer_rows[name] = []
+        return values
+
+    def _decode(self, name: str, value_obj: Any) -> Any:
+        if not isinstance(value_obj, dict):
+            return value_obj
+        value_type = value_obj.get("type")
+        value = value_obj.get("value")
+        if value_type == "uri":
+            shortened = self._shortened.get(value)
+            if shortened is None:
+                shortened = self.shorten(value)
+                self._shortened[value] = shortened
+            return shortened
+        if value_type == "literal" and value_obj.get("datatype") == XSD_INTEGER:
+            self.integer_rows[name].append(self.size)
+        return value
+
+    def add(self, binding_row: dict) -> None:
+        matched = 0
+        for name, values in self.columns.items():
+            value_obj = binding_row.get(name)
+            if value_obj is None:
+                values.append(None)
+                continue
+            matched += 1
+            values.append(self._decode(name, value_obj))
+        if matched < len(binding_row):
+            for key, value_obj in binding_row.items():
+                if key not in self.columns:
+                    self._add_column(key).append(self._decode(key, value_obj))
+        self.size += 1
+
+    def to_dataframe(self) -> pd.DataFrame:
+        import pandas as pd
+
+        head = set(self.head)
+        order = list(self.head) + [name for name in self.columns if name not in head]
+        if not self.size:
+            return pd.DataFrame(columns=order)
+        return pd.DataFrame(
+            {
+                name: _to_integer_column(self.columns[name], self.integer_rows[name])
+                for name in order
+            },
+            columns=order,
+        )
+
+
+def parse_sparql_json_dataframe(
+    response_json: object,
+    prefixes: Prefixes,
+) -> pd.DataFrame:
+    """
+    Decode SPARQL JSON results straight into a DataFrame, column by column.
+
+    Values are the same as in ``parse_sparql_json_response`` (shortened URIs,
+    ``xsd:integer`` as integers, unbound as None), columns follow ``head.vars``.
+    Fully bound integer columns get a NumPy integer dtype.
+
+    Args:
+        response_json (object): The decoded SPARQL JSON results.
+        prefixes (Prefixes): Prefixes used to shorten URIs.
+
+    Returns:
+        pd.DataFrame: One row per binding.
+    """
+    builder = _ColumnarBuilder(get_prefix_index(prefixes).shorten)
+    if not isinstance(response_json, dict):
+        return builder.to_dataframe()
+
+    head = response_json.get("head")
+    if isinstance(head, dict) and isinstance(head.get("vars"), list):
+        builder.set_head([str(column) for column in head["vars"]])
+
+    results = response_json.get("results")
+    bindings = results.get("bindings") if isinstance(results, dict) else None
+    if isinstance(bindings, list):
+        for binding_row in bindings:
+            if isinstance(binding_row, dict):
+                builder.add(binding_row)
+    return builder.to_dataframe()
+
+
+def read_sparql_json_dataframe(
+    chunks: Iterable[bytes],
+    prefixes: Prefixes,
+) -> pd.DataFrame:
+    """
+    Same as ``parse_sparql_json_dataframe``, reading the body chunk by chunk.
+
+    Args:
+        chunks (Iterable[bytes]): The response body, e.g. ``response.iter_content()``.
+        prefixes (Prefixes): Prefixes used to shorten URIs.
+
+    Returns:
+        pd.DataFrame: One row per binding.
+    """
+    builder = _ColumnarBuilder(get_prefix_index(prefixes).shorten)
+    for binding_row in _iter_raw_bindings(chunks, builder.set_head):
+        builder.add(binding_row)
+    return builder.to_dataframe()
+
+
+def batch_rows(
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Group parsed rows in lists of at most `batch_size` rows.
+
+    Args:
+        rows (Iterable[Dict[str, Any]]): Rows, e.g. from ``iter_sparql_json_rows``.
+        batch_size (int): Maximum number of rows per batch.
+
+    Yields:
+        List[Dict[str, Any]]: Consecutive batches of rows.
+    """
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _unescape_tsv_literal(value: str) -> str:
+    def replace(match: re.Match) -> str:
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        char = match.group(3)
+        return TSV_ESCAPES.get(char, char)
+
+    return TSV_ESCAPE_RE.sub(replace, value)
+
+
+def _decode_tsv_column(
+    cells: List[str],
+    shorten: Callable[[str], str],
+    shortened: Dict[str, str],
+) -> Any:
+    # One pass per column, dispatching on the first character of each term:
+    # cheaper than several pandas string passes over Python string objects
+    values: List[Any] = [None] * len(cells)
+    integer_rows: List[int] = []
+    for index, cell in enumerate(cells):
+        if not cell:
+            continue
+        first = cell[0]
+        if first == "<":
+            # IRIs: shortened once per distinct value
+            value = shortened.get(cell)
+            if value is None:
+                value = shorten(cell[1:-1])
+                shortened[cell] = value
+        elif first == '"':
+            # Literals: "lexical", "lexical"@lang, "lexical"^^<datatype>
+            end = cell.rfind('"')
+            value = cell[1:end]
+            if "\\" in value:
+                value = _unescape_tsv_literal(value)
+            if cell.endswith(TSV_INTEGER_SUFFIX, end + 1):
+                integer_rows.append(index)
+        elif first == "_" and cell.startswith("_:"):
+            # Blank nodes keep their label only, as in the JSON format
+            value = cell[2:]
+        else:
+            # Abbreviated numbers and booleans: integers are cast, others kept as text
+            value = cell
+            if TSV_INTEGER_RE.match(cell):
+                integer_rows.append(index)
+        values[index] = value
+    return _to_integer_column(values, integer_rows)
+
+
+def read_sparql_tsv_dataframe(
+    body: IO[bytes] | bytes,
+    prefixes: Prefixes,
+) -> pd.DataFrame:
+    """
+    Decode SPARQL TSV results (``text/tab-separated-values``) into a DataFrame.
+
+    The table is split by the pandas C parser, then each column is decoded from
+    its RDF term syntax in a single pass. Values are the same
+    as with ``parse_sparql_json_dataframe`` (shortened URIs, ``xsd:integer`` as
+    integers, unbound as None), columns follow the header order.
+
+    Args:
+        body (IO[bytes] | bytes): The response body, or a binary stream of it.
+        prefixes (Prefixes): Prefixes used to shorten URIs.
+
+    Returns:
+        pd.DataFrame: One row per result.
+    """
+    import pandas as pd
+
+    if isinstance(body, (bytes, bytearray)):
+        body = io.BytesIO(body)
+    try:
+        cells = pd.read_csv(
+            body,
+            sep="\t",
+            quoting=csv.QUOTE_NONE,
+            dtype=object,
+            keep_default_na=False,
+            na_filter=False,
+            skip_blank_lines=False,
+            encoding="utf-8",
+        )
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+    columns = [str(column).lstrip("?$") for column in cells.columns]
+    if cells.empty:
+        return pd.DataFrame(columns=columns)
+
+    shorten = get_prefix_index(prefixes).shorten
+    shortened: Dict[str, str] = {}
+    return pd.DataFrame(
+        {
+            column: _decode_tsv_column(cells[name].tolist(), shorten, shortened)
+            for column, name in zip(columns, cells.columns)
+        },
+        columns=columns,
+    )
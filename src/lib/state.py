@@ -1,20 +1,24 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from datetime import datetime
 import os
 import re
 import shutil
 from os.path import exists as path_exists
 from pathlib import Path
-from yaml import safe_load, dump
-from requests.exceptions import ConnectionError, Timeout
+from yaml import dump
+from requests.exceptions import ConnectionError, RequestException, Timeout
 from graphly.schema import Prefixes, Prefix, Resource, Property, Sparql
-import streamlit as st
 from streamlit import session_state as state, query_params
 from schema.data_bundle import DataBundle
 from schema.sparql_technologies import get_sparql
+from lib.config_cache import load_yaml, read_yaml, run_once_per_change
 from lib.config_paths import get_config_path, get_default_config_path, ensure_parent_dir
 from lib.config_migrations import migrate_config_if_needed
 from lib.autoconfigure_data_graph import autoconfigure_config
+from lib.cache_scope import invalidate_scope
+from lib.prefix_index import invalidate_prefix_index
+from lib.query_cache import get_endpoint_identity, get_query_cache
+from lib.triple_snapshot import TripleSnapshot
 
 
 ##### PATHS #####
@@ -30,6 +34,8 @@ DEFAULTS_SPARQL_QUERIES = BASE_DIR / "defaults" / "sparql-queries.yaml"
 
 ENV_PATTERN = re.compile(r"\$\{([A-Z0-9_]+)\}")
 UNREACHABLE_ENDPOINT_KEYS = "unreachable_endpoint_keys"
+ENTITY_SNAPSHOTS_KEY = "entity_snapshots"
+MAX_ENTITY_SNAPSHOTS = 20
 
 
 def _resolve_config_path() -> Path:
@@ -120,17 +126,46 @@ def clear_toast() -> None:
         del state["toast-icon"]
 
 
-def invalidate_caches(reason: str | None = None) -> None:
-    try:
-        st.cache_data.clear()
-    except Exception as err:
-        print(f"[cache] cache_data clear failed: {err}")
-    try:
-        st.cache_resource.clear()
-    except Exception as err:
-        print(f"[cache] cache_resource clear failed: {err}")
-    if reason:
-        print(f"[cache] cleared: {reason}")
+def invalidate_caches(
+    reason: str | None = None,
+    data_bundle: DataBundle | List[DataBundle] | None = None,
+    graphs: List[str] | None = None,
+) -> None:
+    """
+    Drop the shared cached entries a change made stale, for the affected bundle(s) only.
+
+    Caches are shared by all the sessions of the server: a change that only
+    concerns the session (switching bundle or endpoint) drops nothing.
+
+    Args:
+        reason (str | None): Why the caches are invalidated, counted (see `cache_scope`).
+        data_bundle (DataBundle | List[DataBundle] | None): The changed bundle(s).
+        graphs (List[str] | None): The written graphs; the bundle graphs if None.
+    """
+    reason = reason or "unspecified"
+    if data_bundle is None:
+        invalidate_scope(reason)
+        return
+
+    bundles = data_bundle if isinstance(data_bundle, list) else [data_bundle]
+    for bundle in bundles:
+        bundle_graphs = graphs
+        if bundle_graphs is None:
+            bundle_graphs = [bundle.data.uri, bundle.model.uri, bundle.metadata.uri]
+        dropped = invalidate_scope(
+            reason,
+            get_endpoint_identity(
+                getattr(bundle.endpoint, "url", None),
+                getattr(bundle.endpoint, "username", None),
+            ),
+            bundle.key,
+            results=True,
+            # A bundle on the default graph may have results in any graph
+            graphs=[bundle.prefix_index.lengthen(uri) for uri in bundle_graphs]
+            if all(bundle_graphs)
+            else None,
+        )
+        print(f"[cache] {reason}: {dropped} entries dropped for bundle {bundle.key}")
 
 
 ##### QUERY PARAMS #####
@@ -360,7 +395,10 @@ def load_config() -> None:
         print(f"[config] path={config_path}")
         ensure_parent_dir(config_path)
 
-        migrated = migrate_config_if_needed(config_path)
+        # Migration and auto-configuration only run once per change of the file
+        migrated = run_once_per_change(
+            "migrate", config_path, migrate_config_if_needed
+        )
         if migrated:
             set_toast(
                 "Configuration migrated to the latest format.",
@@ -387,7 +425,13 @@ def load_config() -> None:
 
         if os.getenv("LOGRE_AUTOCONFIGURE_GRAPH") == "1" and config_exists:
             try:
-                autoconfigure_config(config_path)
+                # Tried again while an endpoint does not answer (e.g. still starting)
+                run_once_per_change(
+                    "autoconfigure",
+                    config_path,
+                    autoconfigure_config,
+                    done=lambda changed: changed is not None,
+                )
             except Exception:
                 set_toast(
                     "Failed to auto-configure data graph.",
@@ -396,8 +440,8 @@ def load_config() -> None:
 
         if config_exists:
             try:
-                config_raw = config_path.read_text(encoding="utf-8")
-                obj = safe_load(config_raw) or {}
+                config_raw, obj = read_yaml(config_path)
+                obj = obj or {}
             except Exception:
                 config_load_issue = True
                 obj = {}
@@ -412,8 +456,7 @@ def load_config() -> None:
             and path_exists(default_path)
         ):
             try:
-                default_raw = default_path.read_text(encoding="utf-8")
-                default_obj = safe_load(default_raw) or {}
+                default_obj = load_yaml(default_path) or {}
                 if isinstance(default_obj, dict):
                     obj = default_obj
                     if config_exists:
@@ -491,18 +534,17 @@ def load_config() -> None:
                 repaired = True
 
         # Add all prefixes from defaults before creating Data Bundles
-        with open(DEFAULTS_PREFIXES, "r", encoding="utf-8") as file:
-            default_prefixes_raw = safe_load(file.read())
-            if isinstance(default_prefixes_raw, list):
-                for default_prefix in default_prefixes_raw:
-                    if not isinstance(default_prefix, dict):
-                        continue
-                    short = default_prefix.get("short")
-                    long_uri = default_prefix.get("long")
-                    if short and short not in seen_prefixes:
-                        loaded_prefixes.add(Prefix(short, long_uri))
-                        seen_prefixes.add(short)
-                        need_save = True
+        default_prefixes_raw = load_yaml(DEFAULTS_PREFIXES)
+        if isinstance(default_prefixes_raw, list):
+            for default_prefix in default_prefixes_raw:
+                if not isinstance(default_prefix, dict):
+                    continue
+                short = default_prefix.get("short")
+                long_uri = default_prefix.get("long")
+                if short and short not in seen_prefixes:
+                    loaded_prefixes.add(Prefix(short, long_uri))
+                    seen_prefixes.add(short)
+                    need_save = True
 
         set_prefixes(loaded_prefixes)
 
@@ -582,60 +624,57 @@ def load_config() -> None:
                 file.write(config_raw)
 
         # Add all sparql queries that are in the default, but not in (loaded or not) configuration
-        with open(DEFAULTS_SPARQL_QUERIES, "r", encoding="utf-8") as file:
-            # Use YAML to parse the file content
-            default_sparql_queries = safe_load(file.read())
-
-            # Here, there is no need to parse: For the model a SPARQL query is just an array with 2 elements: name, query
-
-            # Check if all from default are in state
-            loaded_queries = get_sparql_queries()
-            have_queries = set([o[0] for o in loaded_queries])
-            for query in default_sparql_queries:
-                if query[0] not in have_queries:
-                    loaded_queries.append(query)
-                    set_sparql_queries(loaded_queries)
-                    need_save = True
+        # Parsed once per file change for the whole process
+        default_sparql_queries = load_yaml(DEFAULTS_SPARQL_QUERIES)
+
+        # Here, there is no need to parse: For the model a SPARQL query is just an array with 2 elements: name, query
+
+        # Check if all from default are in state
+        loaded_queries = get_sparql_queries()
+        have_queries = set([o[0] for o in loaded_queries])
+        for query in default_sparql_queries:
+            if query[0] not in have_queries:
+                loaded_queries.append(query)
+                set_sparql_queries(loaded_queries)
+                need_save = True
 
         # Add all Data Bundles that are in the default, but not in (loaded or not) configuration
-        with open(DEFAULTS_DATA_BUNDLES, "r", encoding="utf-8") as file:
-            # Use YAML to parse the file content
-            default_db_raw = safe_load(file.read())
-
-            # Parse
-            default_db = [
-                DataBundle.from_dict(obj, state["prefixes"], state["endpoints"])
-                for obj in default_db_raw
-            ]
-
-            # Check if all from default are in state
-            loaded_dbs = get_data_bundles()
-            have_dbs = set([o.endpoint for o in loaded_dbs])
-            for db in default_db:
-                if db.endpoint not in have_dbs:
-                    loaded_dbs.append(db)
-                    set_data_bundles(loaded_dbs)
-                    need_save = True
+        # Parsed once per file change for the whole process
+        default_db_raw = load_yaml(DEFAULTS_DATA_BUNDLES)
+
+        # Parse
+        default_db = [
+            DataBundle.from_dict(obj, state["prefixes"], state["endpoints"])
+            for obj in default_db_raw
+        ]
+
+        # Check if all from default are in state
+        loaded_dbs = get_data_bundles()
+        have_dbs = set([o.endpoint for o in loaded_dbs])
+        for db in default_db:
+            if db.endpoint not in have_dbs:
+                loaded_dbs.append(db)
+                set_data_bundles(loaded_dbs)
+                need_save = True
 
         # Add the default Data Bundle from the default, if not set in the configuration
-        with open(DEFAULTS_DATA_BUNDLE_DEFAULT, "r", encoding="utf-8") as file:
-            # Use YAML to parse the file content
-            default_db_default = safe_load(file.read())
-
-            # If a defaut Data Bundle is set
-            if default_db_default:
-                # Find the DataBundle with the right key
-                default_db = next(
-                    (
-                        db
-                        for _, db in enumerate(get_data_bundles())
-                        if db.key == default_db_default
-                    ),
-                    None,
-                )
-                if default_db:
-                    set_default_data_bundle(default_db)
-                    need_save = True
+        # Parsed once per file change for the whole process
+        default_db_default = load_yaml(DEFAULTS_DATA_BUNDLE_DEFAULT)
+
+        # If a defaut Data Bundle is set
+        if default_db_default:
+            # Find the DataBundle with the right key
+            default_db = next(
+                (
+                    db
+                    for _, db in enumerate(get_data_bundles())
+                    if db.key == default_db_default
+                ),
+                None,
+            )
+            if default_db:
+                set_default_data_bundle(default_db)
+                need_save = True
 
         # If the default configuration changed the state, then save the configuration
         save_required = need_save or repaired or config_load_issue or not config_exists
@@ -683,7 +722,7 @@ def save_config() -> None:
 
         if path_exists(config_path):
             try:
-                disk_obj = safe_load(config_path.read_text(encoding="utf-8")) or {}
+                disk_obj = load_yaml(config_path) or {}
                 if isinstance(disk_obj, dict):
                     for query_name, query_text in normalize_sparql_queries(
                         disk_obj.get("sparql_queries", [])
@@ -786,6 +825,9 @@ def update_prefix(old_prefix: Prefix | None, new_prefix: Prefix | None) -> None:
                 prefix.short = new_prefix.short
                 prefix.long = new_prefix.long
 
+    # The prefixes were edited in place: their shortening index is stale
+    invalidate_prefix_index(state["prefixes"])
+
     # Rebuild data bundles so graph/model/metadata prefixes stay in sync.
     current_prefixes = get_prefixes()
     current_endpoints = get_endpoints()
@@ -831,7 +873,7 @@ def update_prefix(old_prefix: Prefix | None, new_prefix: Prefix | None) -> None:
         )
         state["default_data_bundle"] = default_bundle
 
-    invalidate_caches("prefix_change")
+    invalidate_caches("prefix_change", rebuilt_bundles)
 
     # Write to disk
     save_config()
@@ -1408,6 +1450,68 @@ def set_entity_uri(uri: str | None) -> None:
     state["entity_uri"] = uri
 
 
+##### ENTITY NEIGHBORHOOD #####
+
+
+def get_entity_snapshot(data_bundle: DataBundle, uri: str) -> TripleSnapshot | None:
+    """
+    Retrieve the neighborhood snapshot of an entity, loading it on first use.
+
+    Snapshots are kept in the session (the most recent ones only), and reloaded
+    once anything was written to the endpoint since they were loaded. When the
+    endpoint fails (error, timeout) or does not answer with triples, None is
+    returned (and nothing kept), so that callers send their own queries.
+
+    Args:
+        data_bundle (DataBundle): The data bundle the entity belongs to.
+        uri (str): The URI of the entity.
+
+    Returns:
+        TripleSnapshot | None: The entity neighborhood (see `DataBundle.load_neighborhood`).
+    """
+    endpoint = data_bundle.endpoint
+    generation = get_query_cache().generation(
+        get_endpoint_identity(
+            getattr(endpoint, "url", None), getattr(endpoint, "username", None)
+        )
+    )
+    if ENTITY_SNAPSHOTS_KEY not in state:
+        state[ENTITY_SNAPSHOTS_KEY] = {}
+    snapshots = state[ENTITY_SNAPSHOTS_KEY]
+
+    key = (data_bundle.key, uri)
+    entry = snapshots.pop(key, None)
+    if entry is None or entry[1] != generation:
+        try:
+            entry = (data_bundle.load_neighborhood(uri), generation)
+        except (ValueError, RequestException) as err:
+            # e.g. the endpoint timed out or rejected the query: callers send their own
+            print(f"[snapshot] neighborhood not loaded: {err}")
+            return None
+    snapshots[key] = entry  # Most recently used last
+    while len(snapshots) > MAX_ENTITY_SNAPSHOTS:
+        snapshots.pop(next(iter(snapshots)))
+    return entry[0]
+
+
+def invalidate_entity_snapshots(uris: List[str] | None = None) -> None:
+    """
+    Drop the neighborhood snapshots that an edit may have made stale.
+
+    Args:
+        uris (List[str] | None): The edited entities (subjects and objects of the written
+            triples). Snapshots where any of them appears are dropped; all snapshots if None.
+    """
+    if ENTITY_SNAPSHOTS_KEY not in state:
+        return
+    snapshots = state[ENTITY_SNAPSHOTS_KEY]
+    for key, (snapshot, _) in list(snapshots.items()):
+        if uris is None or any(
+            isinstance(uri, str) and snapshot.mentions(uri) for uri in uris
+        ):
+            del snapshots[key]
+
+
 ##### FIELDS #####
 
 
@@ -1441,6 +1545,43 @@ def set_offset(entity_uri: str, property_key: str, value: int) -> None:
     state[f"offset_{entity_uri}_{property_key}"] = value
 
 
+def get_cursor(entity_uri: str, property_key: str, offset: int) -> str | None:
+    """
+    Retrieve the keyset cursor of a page of an entity property, if the previous page was seen.
+
+    Args:
+        entity_uri (str): The URI of the entity.
+        property_key (str): The property key associated with the page.
+        offset (int): The offset of the page.
+
+    Returns:
+        str | None: The cursor to fetch the page with, or None (the page is then fetched by offset).
+    """
+    if offset == 0:
+        return None
+    return state.get(f"cursors_{entity_uri}_{property_key}", {}).get(offset)
+
+
+def set_cursor(
+    entity_uri: str, property_key: str, offset: int, cursor: str | None
+) -> None:
+    """
+    Remember the keyset cursor of the page starting at an offset, i.e. the cursor after the previous page.
+
+    Args:
+        entity_uri (str): The URI of the entity.
+        property_key (str): The property key associated with the page.
+        offset (int): The offset of the page the cursor leads to.
+        cursor (str | None): The cursor (see `DataBundle.get_keyset_cursor`).
+    """
+    if cursor is None:
+        return
+    key = f"cursors_{entity_uri}_{property_key}"
+    if key not in state:
+        state[key] = {}
+    state[key][offset] = cursor
+
+
 ##### ENTITY CHART INCOMING #####
 
 
@@ -1646,15 +1787,53 @@ def entity_chart_get_out_initialized() -> Resource | None:
 ##### DATA TABLES #####
 
 
-def data_table_set_page(class_uri: str, page_nb: int) -> None:
+def data_table_set_page(
+    class_uri: str,
+    page_nb: int,
+    last_key: Tuple[object, str] | None = None,
+    view: Tuple | None = None,
+) -> None:
     """
     Set the current page number for a data table associated with a specific class URI.
 
+    Also remembers the key of the last row of the page (see `DataBundle.get_data_table`),
+    so that the page after it is fetched by keyset. Keys are only valid for a given view
+    (limit, sorting and filtering): keys of another view are forgotten.
+
     Args:
         class_uri (str): The URI of the class for which the page number is being set.
         page_nb (int): The page number to set.
+        last_key (Tuple[object, str], optional): The key of the last row of the page, if known.
+        view (Tuple, optional): The limit, sorting and filtering the key was fetched with.
     """
     state[f"data_table_page_{class_uri}"] = page_nb
+    if last_key is None:
+        return
+    key = f"data_table_keys_{class_uri}"
+    if key not in state or state[key]["view"] != view:
+        state[key] = {"view": view, "keys": {}}
+    state[key]["keys"][page_nb] = last_key
+
+
+def data_table_get_after(
+    class_uri: str, page_nb: int, view: Tuple | None = None
+) -> Tuple[object, str] | None:
+    """
+    Retrieve the keyset cursor of a data table page: the key of the last row of the previous page.
+
+    Args:
+        class_uri (str): The URI of the class of the data table.
+        page_nb (int): The page number to fetch.
+        view (Tuple, optional): The limit, sorting and filtering the page is fetched with.
+
+    Returns:
+        Tuple[object, str] | None: The key, or None if the previous page was not seen
+        with this view (the page is then fetched by offset).
+    """
+    keys = state.get(f"data_table_keys_{class_uri}")
+    if not keys or keys["view"] != view:
+        return None
+    return keys["keys"].get(page_nb - 1)
 
 
 def data_table_get_page(class_uri: str) -> int:
@@ -2,70 +2,693 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import hashlib
+import math
+import os
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
 
+from requests.exceptions import HTTPError, Timeout
 
-def summarize_classes(data_bundle, limit: int = 5) -> Dict[str, Any]:
-    """Return class distribution, total count and Plotly-friendly data."""
-    query = f"""
-        SELECT ?class (COUNT(?instance) AS ?count)
+from lib.background import RefreshCache
+from lib.query_cache import get_endpoint_identity, get_query_cache
+
+
+VOID = "http://rdfs.org/ns/void#"
+SD = "http://www.w3.org/ns/sparql-service-description#"
+DCTERMS_MODIFIED = "http://purl.org/dc/terms/modified"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+XSD_DATE_TIME = "http://www.w3.org/2001/XMLSchema#dateTime"
+
+# Normal quantile of the 95% confidence bounds of estimates
+CONFIDENCE_Z = 1.96
+
+
+def _get_stats_ttl_seconds() -> float:
+    raw_value = os.getenv("LOGRE_STATS_TTL", "60")
+    try:
+        parsed = float(raw_value)
+    except (TypeError, ValueError):
+        return 60.0
+    return parsed if parsed >= 0 else 60.0
+
+
+def _get_sample_size() -> int:
+    raw_value = os.getenv("LOGRE_STATS_SAMPLE_SIZE", "2000")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 2000
+    return parsed if parsed > 0 else 2000
+
+
+def _get_approx_threshold() -> int:
+    raw_value = os.getenv("LOGRE_STATS_APPROX_TRIPLES", "0")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 0
+    return parsed if parsed >= 0 else 0
+
+
+# One statistics snapshot per bundle, versioned by the endpoint write generation
+_SNAPSHOTS = RefreshCache("stats", _get_stats_ttl_seconds)
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_stats_queries(data_bundle) -> Dict[str, str]:
+    """
+    Build the two aggregate queries all the statistics are derived from.
+
+    The class distribution gives the entity and class totals (the sum and the
+    number of its rows), and the property distribution the triple and property totals.
+    """
+    return {
+        "classes": f"""
+            # lib.stats: class distribution
+            SELECT ?class (COUNT(?instance) AS ?count)
+            WHERE {{
+                {data_bundle.data.sparql_begin}
+                    ?instance {data_bundle.model.type_property} ?class .
+                {data_bundle.data.sparql_end}
+            }}
+            GROUP BY ?class
+        """,
+        "properties": f"""
+            # lib.stats: property distribution
+            SELECT ?property (COUNT(*) AS ?count)
+            WHERE {{
+                {data_bundle.data.sparql_begin}
+                    ?subject ?property ?object .
+                {data_bundle.data.sparql_end}
+            }}
+            GROUP BY ?property
+        """,
+    }
+
+
+def build_stats(
+    data_bundle, class_response: List[Dict] | None, property_response: List[Dict] | None
+) -> Dict[str, Any]:
+    """
+    Turn the distribution query responses into a statistics snapshot.
+
+    Returns:
+        Dict[str, Any]: The snapshot: `counts` (entities, classes, properties, triples),
+        `classes` and `properties` rows (uri, label, count, share, sorted by count),
+        `computed_at` (epoch seconds), `approximate` (False, or why they were
+        estimated, see `estimate_stats`) and
+        `stored` (whether they are kept in the metadata graph, see `get_stats`).
+    """
+    classes = []
+    for row in class_response or []:
+        cls = data_bundle.model_index.find_class(row["class"])
+        label = cls.get_text() if cls else data_bundle.prefix_index.shorten(row["class"])
+        classes.append({"uri": row["class"], "label": label, "count": _to_int(row["count"])})
+
+    properties = []
+    for row in property_response or []:
+        props = data_bundle.model_index.find_properties(row["property"])
+        label = (
+            props[0].label
+            if props and props[0].label
+            else data_bundle.prefix_index.shorten(row["property"])
+        )
+        properties.append(
+            {"uri": row["property"], "label": label, "count": _to_int(row["count"])}
+        )
+
+    counts = {
+        "entities": sum(row["count"] for row in classes),
+        "classes": len(classes),
+        "properties": len(properties),
+        "triples": sum(row["count"] for row in properties),
+    }
+    for rows, total in ((classes, counts["entities"]), (properties, counts["triples"])):
+        rows.sort(key=lambda r: r["count"], reverse=True)
+        for row in rows:
+            row["share"] = (row["count"] / total * 100) if total else 0
+
+    return {
+        "counts": counts,
+        "classes": classes,
+        "properties": properties,
+        "computed_at": time.time(),
+        "approximate": False,
+        "stored": True,
+    }
+
+
+def get_totals_queries(data_bundle) -> Dict[str, str]:
+    """
+    Build the queries counting the typing and all the triples of the data graph.
+
+    They are not grouped, so endpoints usually answer them from their indexes,
+    even when the distribution queries take too long.
+    """
+    return {
+        "entities": f"""
+            # lib.stats: typing total
+            SELECT (COUNT(*) AS ?count)
+            WHERE {{
+                {data_bundle.data.sparql_begin}
+                    ?instance {data_bundle.model.type_property} ?class .
+                {data_bundle.data.sparql_end}
+            }}
+        """,
+        "triples": f"""
+            # lib.stats: triple total
+            SELECT (COUNT(*) AS ?count)
+            WHERE {{
+                {data_bundle.data.sparql_begin}
+                    ?subject ?property ?object .
+                {data_bundle.data.sparql_end}
+            }}
+        """,
+    }
+
+
+def get_sample_query(data_bundle, size: int, entities: int | None = None) -> str:
+    """
+    Build the query sampling about `size` typed subject IRIs of the data graph at random.
+
+    Typing triples are kept with a probability fitted to the number of typing
+    triples (`entities`), so that the sample is spread over the whole graph, and
+    the endpoint stops at `size` of them: there is no global sort nor DISTINCT,
+    whose cost would be that of the distribution queries. When the number of
+    typing triples is unknown, every one is kept, so the sample is the first
+    `size` subjects found, in storage order. A subject with several types may be
+    drawn several times.
+    """
+    # Oversample a little, so that the limit is reached near the end of the scan
+    rate = min(1.0, 1.5 * size / entities) if entities else 1.0
+    keep = f"&& RAND() < {rate:.6g}" if rate < 1 else ""
+    return f"""
+        # lib.stats: subject sample
+        SELECT (STR(?subject) AS ?iri)
         WHERE {{
             {data_bundle.data.sparql_begin}
-                ?instance {data_bundle.model.type_property} ?class .
+                ?subject {data_bundle.model.type_property} ?class .
             {data_bundle.data.sparql_end}
+            FILTER(isIRI(?subject) {keep})
         }}
-        GROUP BY ?class
-        ORDER BY DESC(?count)
+        LIMIT {size}
     """
-    response = data_bundle.data.run(query)
-    if not response:
-        return {"total": 0, "rows": [], "top": []}
 
-    rows = []
-    total = 0
-    for row in response:
-        total += int(row["count"])
-        cls = data_bundle.model.find_class(row["class"])
-        label = cls.get_text() if cls else data_bundle.prefixes.shorten(row["class"])
-        rows.append({"uri": row["class"], "label": label, "count": int(row["count"])})
 
-    top = rows[:limit]
-    return {"total": total, "rows": rows, "top": top}
+def get_sampled_stats_queries(data_bundle, subjects: List[str]) -> Dict[str, str]:
+    """
+    Build the distribution queries of `get_stats_queries`, restricted to sampled subjects
+    (full IRIs), and counted per subject.
+    """
+    values = " ".join(f"<{iri}>" for iri in subjects)
+    return {
+        "classes": f"""
+            # lib.stats: sampled class distribution
+            SELECT ?instance ?class (COUNT(*) AS ?count)
+            WHERE {{
+                VALUES ?instance {{ {values} }}
+                {data_bundle.data.sparql_begin}
+                    ?instance {data_bundle.model.type_property} ?class .
+                {data_bundle.data.sparql_end}
+            }}
+            GROUP BY ?instance ?class
+        """,
+        "properties": f"""
+            # lib.stats: sampled property distribution
+            SELECT ?subject ?property (COUNT(*) AS ?count)
+            WHERE {{
+                VALUES ?subject {{ {values} }}
+                {data_bundle.data.sparql_begin}
+                    ?subject ?property ?object .
+                {data_bundle.data.sparql_end}
+            }}
+            GROUP BY ?subject ?property
+        """,
+    }
+
 
+def get_totals(data_bundle) -> Dict[str, int]:
+    """Count the typing and all the triples of the data graph (see `get_totals_queries`)."""
+    queries = get_totals_queries(data_bundle)
+    responses = data_bundle.run_many(list(queries.values()))
+    return {
+        name: _to_int(response[0]["count"]) if response else 0
+        for name, response in zip(queries, responses)
+    }
 
-def summarize_properties(data_bundle, limit: int = 5) -> Dict[str, Any]:
-    """Return property distribution (excluding type/label/comment)."""
-    query = f"""
-        SELECT ?property (COUNT(*) AS ?count)
+
+def _try_get_totals(data_bundle) -> Dict[str, int | None]:
+    """Same as `get_totals`, with None totals if they time out."""
+    try:
+        return get_totals(data_bundle)
+    except Timeout:
+        print("[stats] Totals timed out, they are left unknown")
+        return {"entities": None, "triples": None}
+
+
+def ratio_bounds(numerators: List[float], denominators: List[float]) -> Tuple[float, float]:
+    """
+    Compute the 95% confidence bounds of a ratio of sums measured on sampled subjects.
+
+    The ratio (e.g. the share of the triples of a property) is the sum of the
+    numerators over the sum of the denominators, one of each per sampled subject:
+    as the subjects, not the triples, are sampled, its variance is estimated from
+    the spread of the subjects around it (linearization of the ratio estimator).
+
+    Args:
+        numerators (List[float]): The value of each sampled subject (e.g. its triples
+            of the property).
+        denominators (List[float]): The total of each sampled subject (e.g. all its triples).
+
+    Returns:
+        Tuple[float, float]: The lower and upper bounds of the ratio, within [0, 1].
+    """
+    size = len(denominators)
+    total = sum(denominators)
+    if size < 2 or total <= 0:
+        return (0.0, 1.0)
+    ratio = sum(numerators) / total
+    variance = sum(
+        (numerator - ratio * denominator) ** 2
+        for numerator, denominator in zip(numerators, denominators)
+    ) / (size - 1)
+    margin = CONFIDENCE_Z * math.sqrt(variance / size) / (total / size)
+    return (max(0.0, ratio - margin), min(1.0, ratio + margin))
+
+
+def estimate_stats(
+    data_bundle, totals: Dict[str, int | None] | None = None, reason: str = "timeout"
+) -> Dict[str, Any]:
+    """
+    Estimate the statistics snapshot from a random sample of subjects.
+
+    The class and property shares are measured on the subjects sampled by
+    `get_sample_query`, and scaled to the exact totals (see `get_totals`). Each
+    row gets the `low` and `high` 95% confidence bounds of its count (see
+    `ratio_bounds`); the class and property numbers are the ones seen in the
+    sample, so lower bounds. When the totals time out too, they are None, and
+    the counts and bounds are those of the sample. When the sample times out as
+    well, the distributions are left empty (`sample_size` is 0).
+
+    Args:
+        data_bundle (DataBundle): The bundle whose data graph is described.
+        totals (Dict[str, int | None] | None): The totals, if already counted.
+        reason (str): Why the statistics are estimated: "timeout" (the distribution
+            queries timed out) or "size" (see `LOGRE_STATS_APPROX_TRIPLES`).
+
+    Returns:
+        Dict[str, Any]: The snapshot (see `build_stats`), with `approximate` set to
+        `reason`, and the `sample_size` it was estimated from.
+    """
+    totals = totals if totals is not None else _try_get_totals(data_bundle)
+    sample_query = get_sample_query(data_bundle, _get_sample_size(), totals["entities"])
+    subjects: List[str] = []
+    class_response, property_response = [], []
+    try:
+        response = data_bundle.run(sample_query)
+        subjects = list(dict.fromkeys(row["iri"] for row in response or []))
+        if subjects:
+            queries = get_sampled_stats_queries(data_bundle, subjects)
+            class_response, property_response = data_bundle.run_many(list(queries.values()))
+    except Timeout:
+        print("[stats] Sample timed out, the distributions are left unknown")
+        subjects, class_response, property_response = [], [], []
+
+    # Counts per item and per sampled subject, and totals per sampled subject
+    per_subject: Dict[str, Dict[str, Dict[str, int]]] = {"class": {}, "property": {}}
+    subject_totals: Dict[str, Dict[str, int]] = {"class": {}, "property": {}}
+    for kind, subject_key, rows in (
+        ("class", "instance", class_response or []),
+        ("property", "subject", property_response or []),
+    ):
+        for row in rows:
+            subject, count = str(row[subject_key]), _to_int(row["count"])
+            counts = per_subject[kind].setdefault(row[kind], {})
+            counts[subject] = counts.get(subject, 0) + count
+            subject_totals[kind][subject] = subject_totals[kind].get(subject, 0) + count
+
+    snapshot = build_stats(
+        data_bundle,
+        [{"class": uri, "count": sum(c.values())} for uri, c in per_subject["class"].items()],
+        [
+            {"property": uri, "count": sum(c.values())}
+            for uri, c in per_subject["property"].items()
+        ],
+    )
+
+    for kind, rows, total in (
+        ("class", snapshot["classes"], totals["entities"]),
+        ("property", snapshot["properties"], totals["triples"]),
+    ):
+        # Unknown totals: the counts are those of the sample
+        scale = total if total is not None else sum(subject_totals[kind].values())
+        denominators = [subject_totals[kind].get(subject, 0) for subject in subjects]
+        for row in rows:
+            counts = per_subject[kind][row["uri"]]
+            low, high = ratio_bounds(
+                [counts.get(subject, 0) for subject in subjects], denominators
+            )
+            share = row["share"] / 100
+            row["count"] = round(share * scale)
+            row["low"] = math.floor(low * scale)
+            row["high"] = math.ceil(high * scale)
+    snapshot["counts"]["entities"] = totals["entities"]
+    snapshot["counts"]["triples"] = totals["triples"]
+    snapshot["approximate"] = reason
+    snapshot["stored"] = False
+    snapshot["sample_size"] = len(subjects)
+    return snapshot
+
+
+def compute_stats(data_bundle) -> Dict[str, Any]:
+    """
+    Run the distribution queries (together) and build a fresh statistics snapshot.
+
+    On data graphs over `LOGRE_STATS_APPROX_TRIPLES` triples (when set, and when
+    counting them times out), or when the distribution queries time out, the
+    statistics are estimated from a sample instead (see `estimate_stats`).
+    """
+    totals = None
+    threshold = _get_approx_threshold()
+    if threshold:
+        totals = _try_get_totals(data_bundle)
+        if totals["triples"] is None:
+            return estimate_stats(data_bundle, totals)
+        if totals["triples"] > threshold:
+            return estimate_stats(data_bundle, totals, reason="size")
+
+    queries = get_stats_queries(data_bundle)
+    try:
+        class_response, property_response = data_bundle.run_many(list(queries.values()))
+    except Timeout:
+        print("[stats] Distribution queries timed out, estimating them from a sample")
+        return estimate_stats(data_bundle, totals)
+    return build_stats(data_bundle, class_response, property_response)
+
+
+def get_void_dataset_uri(data_bundle) -> str:
+    """
+    Get the IRI the data graph statistics are described with (as a `void:Dataset`) in the metadata graph.
+    """
+    if data_bundle.data.uri:
+        return data_bundle.prefix_index.lengthen(data_bundle.data.uri)
+    return f"{data_bundle.base_uri}default-graph"
+
+
+def _partition_uri(dataset_uri: str, kind: str, uri: str) -> str:
+    digest = hashlib.sha1(uri.encode("utf-8")).hexdigest()[:16]
+    return f"{dataset_uri}/{kind}/{digest}"
+
+
+def void_turtle(data_bundle, snapshot: Dict[str, Any]) -> str:
+    """
+    Serialize a statistics snapshot as VoID (and SPARQL service description) Turtle.
+
+    The data graph is described as a `void:Dataset` with its totals, and a class
+    (resp. property) partition per class (resp. property) with its count.
+    """
+    lengthen = data_bundle.prefix_index.lengthen
+    dataset = get_void_dataset_uri(data_bundle)
+    counts = snapshot["counts"]
+    modified = datetime.fromtimestamp(snapshot["computed_at"], timezone.utc)
+
+    def integer(value: int) -> str:
+        return f'"{int(value)}"^^<{XSD_INTEGER}>'
+
+    lines = [
+        f"<{dataset}> a <{VOID}Dataset>, <{SD}Graph> ;",
+        f"    <{DCTERMS_MODIFIED}> \"{modified.isoformat()}\"^^<{XSD_DATE_TIME}> ;",
+        f"    <{VOID}triples> {integer(counts['triples'])} ;",
+        f"    <{VOID}entities> {integer(counts['entities'])} ;",
+        f"    <{VOID}classes> {integer(counts['classes'])} ;",
+        f"    <{VOID}properties> {integer(counts['properties'])} .",
+    ]
+    if data_bundle.data.uri:
+        lines.append(
+            f"<{dataset}/named-graph> a <{SD}NamedGraph> ; <{SD}name> <{dataset}> ; <{SD}graph> <{dataset}> ."
+        )
+    for kind, rows, member, count_property in (
+        ("classPartition", snapshot["classes"], "class", "entities"),
+        ("propertyPartition", snapshot["properties"], "property", "triples"),
+    ):
+        for row in rows:
+            uri = lengthen(row["uri"])
+            partition = _partition_uri(dataset, kind, uri)
+            lines.append(f"<{dataset}> <{VOID}{kind}> <{partition}> .")
+            lines.append(
+                f"<{partition}> <{VOID}{member}> <{uri}> ; <{VOID}{count_property}> {integer(row['count'])} ."
+            )
+    return "\n".join(lines) + "\n"
+
+
+def can_materialize_stats(data_bundle) -> bool:
+    """
+    Tell whether statistics can be written to the bundle metadata graph.
+
+    They are not when the metadata graph is not set (it would be the default
+    graph) or is the data graph itself: the description would be counted in the
+    statistics it describes.
+    """
+    metadata_uri = getattr(data_bundle.metadata, "uri", None)
+    if not metadata_uri:
+        return False
+    lengthen = data_bundle.prefix_index.lengthen
+    return lengthen(metadata_uri) != lengthen(data_bundle.data.uri or "")
+
+
+def materialize_stats(data_bundle, snapshot: Dict[str, Any]) -> None:
+    """
+    Write a statistics snapshot into the bundle metadata graph, replacing the previous one.
+
+    The previous description is deleted and the new one inserted by the operations
+    of a single SPARQL update request, so that concurrent writers leave one
+    description or the other, never both. The partitions and the named graph
+    node are minted by `void_turtle` and deleted whole; the dataset IRI is the data
+    graph IRI, which other descriptions may use too, so only its VoID triples
+    (and modification date and types) are deleted.
+
+    Args:
+        data_bundle (DataBundle): The bundle whose data graph is described.
+        snapshot (Dict[str, Any]): The statistics (see `build_stats`).
+    """
+    dataset = get_void_dataset_uri(data_bundle)
+    metadata = data_bundle.metadata
+    begin, end = metadata.sparql_begin, metadata.sparql_end
+
+    data_bundle.run(
+        f"""
+        # lib.stats: VoID statistics update
+        DELETE {{ {begin} ?partition ?p ?o . {end} }}
         WHERE {{
-            {data_bundle.data.sparql_begin}
-                ?subject ?property ?object .
-            {data_bundle.data.sparql_end}
+            {begin}
+                <{dataset}> <{VOID}classPartition>|<{VOID}propertyPartition> ?partition .
+                ?partition ?p ?o .
+            {end}
+        }} ;
+        DELETE {{ {begin} <{dataset}/named-graph> ?p ?o . {end} }}
+        WHERE {{ {begin} <{dataset}/named-graph> ?p ?o . {end} }} ;
+        DELETE {{ {begin} <{dataset}> ?p ?o . {end} }}
+        WHERE {{
+            {begin}
+                <{dataset}> ?p ?o .
+                FILTER(
+                    STRSTARTS(STR(?p), "{VOID}")
+                    || ?p = <{DCTERMS_MODIFIED}>
+                    || (?p = <{RDF_TYPE}> && ?o IN (<{VOID}Dataset>, <{SD}Graph>))
+                )
+            {end}
+        }} ;
+        INSERT DATA {{
+            {begin}
+                {void_turtle(data_bundle, snapshot)}
+            {end}
+        }}
+    """
+    )
+
+
+def read_materialized_stats(data_bundle) -> Dict[str, Any] | None:
+    """
+    Read the statistics written in the bundle metadata graph by `materialize_stats`.
+
+    Should several descriptions be found (e.g. written by an older version), the
+    latest modification date is kept, and one count per class and property.
+
+    Returns:
+        Dict[str, Any] | None: The snapshot (see `build_stats`), with `computed_at` set to
+        when they were computed, or None if there are none.
+    """
+    dataset = get_void_dataset_uri(data_bundle)
+    metadata = data_bundle.metadata
+    response = data_bundle.run(
+        f"""
+        # lib.stats: VoID statistics
+        SELECT ?modified ?kind ?item ?count
+        WHERE {{
+            {{
+                SELECT (MAX(?modified_) AS ?modified)
+                WHERE {{
+                    {metadata.sparql_begin}
+                        <{dataset}> <{DCTERMS_MODIFIED}> ?modified_ .
+                    {metadata.sparql_end}
+                }}
+            }}
+            FILTER(BOUND(?modified))
+            OPTIONAL {{
+                SELECT ?kind ?item (MAX(?count_) AS ?count)
+                WHERE {{
+                    {metadata.sparql_begin}
+                        {{
+                            <{dataset}> <{VOID}classPartition> ?partition .
+                            ?partition <{VOID}class> ?item ; <{VOID}entities> ?count_ .
+                            BIND("class" AS ?kind)
+                        }} UNION {{
+                            <{dataset}> <{VOID}propertyPartition> ?partition .
+                            ?partition <{VOID}property> ?item ; <{VOID}triples> ?count_ .
+                            BIND("property" AS ?kind)
+                        }}
+                    {metadata.sparql_end}
+                }}
+                GROUP BY ?kind ?item
+            }}
         }}
-        GROUP BY ?property
-        ORDER BY DESC(?count)
     """
-    response = data_bundle.data.run(query)
+    )
     if not response:
-        return {"total": 0, "rows": [], "top": []}
+        return None
+
+    class_rows = [
+        {"class": row["item"], "count": row["count"]}
+        for row in response
+        if row.get("kind") == "class"
+    ]
+    property_rows = [
+        {"property": row["item"], "count": row["count"]}
+        for row in response
+        if row.get("kind") == "property"
+    ]
+    snapshot = build_stats(data_bundle, class_rows, property_rows)
+    try:
+        modified = datetime.fromisoformat(str(response[0]["modified"]))
+        snapshot["computed_at"] = modified.timestamp()
+    except ValueError:
+        pass
+    return snapshot
+
+
+def _snapshot_key(data_bundle) -> Tuple[str, str, str]:
+    endpoint = data_bundle.endpoint
+    return (
+        get_endpoint_identity(
+            getattr(endpoint, "url", None), getattr(endpoint, "username", None)
+        ),
+        data_bundle.key,
+        data_bundle.data.uri or "",
+    )
 
+
+def _load_stats(data_bundle, refresh: bool = False) -> Dict[str, Any]:
+    if not can_materialize_stats(data_bundle):
+        snapshot = compute_stats(data_bundle)
+        snapshot["stored"] = False
+        return snapshot
+
+    snapshot = None if refresh else read_materialized_stats(data_bundle)
+    if snapshot is None:
+        snapshot = compute_stats(data_bundle)
+        if snapshot.get("approximate"):
+            # Estimates are not written as the dataset description
+            return snapshot
+        try:
+            materialize_stats(data_bundle, snapshot)
+        except HTTPError as err:
+            print(f"[stats] Unable to write statistics to the metadata graph: {err}")
+    return snapshot
+
+
+def get_stats(data_bundle, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Get the statistics snapshot of a bundle, shared by all the dashboard and statistics widgets.
+
+    Statistics are read from the bundle metadata graph, where they are written
+    (as VoID) the first time they are computed: the data graph is only scanned
+    again when a refresh is asked. Bundles without a metadata graph of their
+    own (see `can_materialize_stats`) get snapshots with `stored` set to False,
+    computed from the data graph each time they are read. What was read is kept for all sessions: once
+    it gets close to `LOGRE_STATS_TTL` seconds old, or once anything was written
+    to the endpoint since, it is read again in the background while the last
+    snapshot keeps being served.
+
+    Args:
+        data_bundle (DataBundle): The bundle whose data graph is described.
+        refresh (bool): Compute the statistics again from the data graph, now.
+
+    Returns:
+        Dict[str, Any]: The snapshot (see `build_stats`); `computed_at` tells when
+        the statistics were computed.
+    """
+    key = _snapshot_key(data_bundle)
+    generation = get_query_cache().generation(key[0])
+    if refresh:
+        return _SNAPSHOTS.load(key, lambda: _load_stats(data_bundle, True), generation)
+    return _SNAPSHOTS.get(key, lambda: _load_stats(data_bundle), generation)
+
+
+def is_refreshing_stats(data_bundle) -> bool:
+    """Tell whether the statistics of a bundle are being read again in the background."""
+    return _SNAPSHOTS.is_refreshing(_snapshot_key(data_bundle))
+
+
+def wait_stats_refresh(timeout: float | None = None) -> None:
+    """Wait for the background statistics refreshes under way."""
+    _SNAPSHOTS.wait(timeout)
+
+
+def clear_stats() -> None:
+    """Forget all the statistics snapshots."""
+    _SNAPSHOTS.clear()
+
+
+def summarize_classes(data_bundle, limit: int = 5) -> Dict[str, Any]:
+    """Return class distribution, total count and Plotly-friendly data."""
+    snapshot = get_stats(data_bundle)
+    rows = snapshot["classes"]
+    return {
+        "total": snapshot["counts"]["entities"],
+        "rows": rows,
+        "top": rows[:limit],
+        "approximate": snapshot.get("approximate", False),
+    }
+
+
+def summarize_properties(data_bundle, limit: int = 5) -> Dict[str, Any]:
+    """Return property distribution (excluding type/label/comment)."""
+    snapshot = get_stats(data_bundle)
     ignored = {
         data_bundle.model.type_property,
         data_bundle.model.label_property,
         data_bundle.model.comment_property,
     }
-
-    rows: List[Dict[str, Any]] = []
-    total = 0
-    for row in response:
-        if row["property"] in ignored:
-            continue
-        props = data_bundle.model.find_properties(row["property"])
-        label = props[0].label if props and props[0].label else data_bundle.prefixes.shorten(row["property"])
-        count = int(row["count"])
-        total += count
-        rows.append({"uri": row["property"], "label": label, "count": count})
-
-    rows.sort(key=lambda r: r["count"], reverse=True)
-    top = rows[:limit]
-    return {"total": total, "rows": rows, "top": top}
+    rows = [row for row in snapshot["properties"] if row["uri"] not in ignored]
+    # Unknown when counting the triples timed out (counts are then those of a sample)
+    total = (
+        sum(row["count"] for row in rows)
+        if snapshot["counts"]["triples"] is not None
+        else None
+    )
+    return {
+        "total": total,
+        "rows": rows,
+        "top": rows[:limit],
+        "approximate": snapshot.get("approximate", False),
+    }
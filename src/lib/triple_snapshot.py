@@ -0,0 +1,166 @@
+"""In-memory indexed copy of the triples around an entity."""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from lib.ntriples import Term, Triple
+
+
+XSD_STRING = "http://www.w3.org/2001/XMLSchema#string"
+RDF_LANG_STRING = "http://www.w3.org/1999/02/22-rdf-syntax-ns#langString"
+
+
+class TripleSnapshot:
+    """
+    Triples indexed three ways: subject -> predicate -> objects (SPO),
+    predicate -> object -> subjects (POS) and object -> subject -> predicates (OSP).
+
+    IRIs are stored shortened, as query results are, so that terms compare
+    equal to the URIs held by `Resource` instances. A snapshot is built around a
+    root entity: `complete_outgoing` and `complete_incoming` tell whether all the
+    root triples of each direction were fetched (the fetch is capped).
+    """
+
+    def __init__(
+        self,
+        root: str,
+        normalize: Callable[[str], str] | None = None,
+        complete_outgoing: bool = True,
+        complete_incoming: bool = True,
+    ) -> None:
+        self._normalize = normalize or (lambda uri: uri)
+        self.root = self.normalize(root)
+        self.complete_outgoing = complete_outgoing
+        self.complete_incoming = complete_incoming
+        self.spo: Dict[Term, Dict[Term, List[Term]]] = {}
+        self.pos: Dict[Term, Dict[Term, List[Term]]] = {}
+        self.osp: Dict[Term, Dict[Term, List[Term]]] = {}
+        self._triples: Set[Triple] = set()
+
+    @classmethod
+    def from_triples(
+        cls,
+        root: str,
+        triples: Iterable[Triple],
+        shorten: Callable[[str], str] | None = None,
+        lengthen: Callable[[str], str] | None = None,
+        caps: Dict[str, int] | None = None,
+    ) -> "TripleSnapshot":
+        """
+        Index triples (e.g. the result of a CONSTRUCT query) around a root entity.
+
+        Args:
+            root (str): The root entity URI, full or shortened.
+            triples (Iterable[Triple]): The triples, with full IRIs.
+            shorten (Callable[[str], str] | None): Shortens full IRIs.
+            lengthen (Callable[[str], str] | None): Expands shortened IRIs.
+            caps (Dict[str, int] | None): The "outgoing" and "incoming" caps the root
+                triples were fetched with. Reaching a cap marks that direction incomplete.
+
+        Returns:
+            TripleSnapshot: The indexed snapshot.
+        """
+        shorten = shorten or (lambda uri: uri)
+        lengthen = lengthen or (lambda uri: uri)
+        snapshot = cls(root, lambda uri: shorten(lengthen(uri.strip("<>"))))
+
+        def short(term: Term) -> Term:
+            if term.kind == "iri":
+                return Term(shorten(term.value), "iri")
+            if term.kind == "literal":
+                if term.datatype:
+                    datatype = term.datatype
+                else:
+                    datatype = RDF_LANG_STRING if term.lang else XSD_STRING
+                return Term(term.value, "literal", shorten(datatype), term.lang)
+            return term
+
+        for subject, predicate, obj in triples:
+            snapshot.add(short(subject), short(predicate), short(obj))
+
+        caps = caps or {}
+        root_term = snapshot.iri(snapshot.root)
+        # The root triples of a direction were all fetched if fewer than the cap came
+        if caps.get("outgoing"):
+            snapshot.complete_outgoing = (
+                len(snapshot.outgoing(root_term)) < caps["outgoing"]
+            )
+        if caps.get("incoming"):
+            snapshot.complete_incoming = (
+                len(snapshot.incoming(root_term)) < caps["incoming"]
+            )
+        return snapshot
+
+    def normalize(self, uri: str) -> str:
+        """Bring a URI to the (shortened) form the snapshot stores."""
+        return self._normalize(uri)
+
+    def iri(self, uri: str) -> Term:
+        """Build the term of a URI, full or shortened."""
+        return Term(self.normalize(uri), "iri")
+
+    def add(self, subject: Term, predicate: Term, obj: Term) -> None:
+        """Add a triple (already shortened); duplicates are ignored."""
+        triple = (subject, predicate, obj)
+        if triple in self._triples:
+            return
+        self._triples.add(triple)
+        self.spo.setdefault(subject, {}).setdefault(predicate, []).append(obj)
+        self.pos.setdefault(predicate, {}).setdefault(obj, []).append(subject)
+        self.osp.setdefault(obj, {}).setdefault(subject, []).append(predicate)
+
+    def __len__(self) -> int:
+        return len(self._triples)
+
+    def covers(self, uri: str, outgoing: bool = False, incoming: bool = False) -> bool:
+        """
+        Tell whether the snapshot can answer for the triples of an entity.
+
+        Args:
+            uri (str): The entity URI.
+            outgoing (bool): Whether all its outgoing triples are needed.
+            incoming (bool): Whether all its incoming triples are needed.
+
+        Returns:
+            bool: True if the entity is the snapshot root and the needed directions are complete.
+        """
+        return (
+            self.normalize(uri) == self.root
+            and (not outgoing or self.complete_outgoing)
+            and (not incoming or self.complete_incoming)
+        )
+
+    def mentions(self, uri: str) -> bool:
+        """Tell whether an entity appears in the snapshot (as subject or object)."""
+        term = self.iri(uri)
+        return term in self.spo or term in self.osp
+
+    def objects(self, subject: Term, predicate: Term) -> List[Term]:
+        """List the objects of a subject for a predicate, in fetch order."""
+        return list(self.spo.get(subject, {}).get(predicate, []))
+
+    def subjects(self, predicate: Term, obj: Term) -> List[Term]:
+        """List the subjects pointing to an object with a predicate, in fetch order."""
+        return list(self.pos.get(predicate, {}).get(obj, []))
+
+    def value(self, subject: Term, predicate: Term) -> Term | None:
+        """Return the first object of a subject for a predicate, if any."""
+        objects = self.spo.get(subject, {}).get(predicate)
+        return objects[0] if objects else None
+
+    def outgoing(self, subject: Term) -> List[Tuple[Term, Term]]:
+        """List the (predicate, object) pairs of a subject."""
+        return [
+            (predicate, obj)
+            for predicate, objects in self.spo.get(subject, {}).items()
+            for obj in objects
+        ]
+
+    def incoming(self, obj: Term) -> List[Tuple[Term, Term]]:
+        """List the (subject, predicate) pairs pointing to an object."""
+        return [
+            (subject, predicate)
+            for subject, predicates in self.osp.get(obj, {}).items()
+            for predicate in predicates
+        ]
@@ -0,0 +1,397 @@
+"""Streaming Turtle parser, turning Turtle files into N-Quads lines for chunked uploads."""
+
+from __future__ import annotations
+
+import codecs
+import io
+import re
+import uuid
+from typing import BinaryIO, Iterator, List, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from lib.ntriples import Term, Triple, format_term, unescape
+
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# Size of the blocks read from the Turtle file
+READ_BLOCK_BYTES = 1 << 20
+
+PN_CHARS_BASE = (
+    "A-Za-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u02ff\u0370-\u037d\u037f-\u1fff"
+    "\u200c-\u200d\u2070-\u218f\u2c00-\u2fef\u3001-\ud7ff\uf900-\ufdcf\ufdf0-\ufffd"
+    "\U00010000-\U000effff"
+)
+PN_CHARS_U = PN_CHARS_BASE + "_"
+PN_CHARS = PN_CHARS_U + "\\-0-9\u00b7\u0300-\u036f\u203f-\u2040"
+PLX = r"%[0-9A-Fa-f]{2}|\\[_~.\-!$&'()*+,;=/?#@%]"
+PN_PREFIX = f"[{PN_CHARS_BASE}](?:[{PN_CHARS}.]*[{PN_CHARS}])?"
+PN_LOCAL = (
+    f"(?:[{PN_CHARS_U}:0-9]|{PLX})"
+    f"(?:(?:[{PN_CHARS}.:]|{PLX})*(?:[{PN_CHARS}:]|{PLX}))?"
+)
+
+LONG_STRING_RES = {
+    '"': re.compile(r'"""((?:[^"\\]|\\.|"(?!""))*)"""', re.S),
+    "'": re.compile(r"'''((?:[^'\\]|\\.|'(?!''))*)'''", re.S),
+}
+TOKEN_RES = [
+    ("IRI", re.compile(r"<([^<>\"{}|^`\\\x00-\x20]|\\u[0-9A-Fa-f]{4}|\\U[0-9A-Fa-f]{8})*>")),
+    ("PNAME", re.compile(f"({PN_PREFIX})?:({PN_LOCAL})?")),
+    ("BNODE", re.compile(f"_:((?:[{PN_CHARS_U}0-9])(?:[{PN_CHARS}.]*[{PN_CHARS}])?)")),
+    ("STRING", re.compile(r'"((?:[^"\\\n\r]|\\.)*)"')),
+    ("STRING", re.compile(r"'((?:[^'\\\n\r]|\\.)*)'")),
+    ("AT", re.compile(r"@([A-Za-z]+(?:-[A-Za-z0-9]+)*)")),
+    ("DOUBLE", re.compile(r"[+-]?(?:[0-9]+\.[0-9]*|\.[0-9]+|[0-9]+)[eE][+-]?[0-9]+")),
+    ("DECIMAL", re.compile(r"[+-]?[0-9]*\.[0-9]+")),
+    ("INTEGER", re.compile(r"[+-]?[0-9]+")),
+    ("WORD", re.compile(r"[A-Za-z]+")),
+    ("PUNCT", re.compile(r"\^\^|[\[\]().,;]")),
+]
+# Characters that must follow a token for it to be complete (the longest
+# token extension is a double exponent: "1" then "e+5")
+TOKEN_LOOKAHEAD = 4
+SKIP_RE = re.compile(r"(?:\s+|#[^\n\r]*)*")
+LOCAL_ESCAPE_RE = re.compile(r"\\(.)")
+
+Token = Tuple[str, re.Match]
+
+
+class TurtleSyntaxError(ValueError):
+    """A Turtle document that cannot be parsed."""
+
+
+class _Tokenizer:
+    """Turtle tokens of a file, read a block at a time."""
+
+    def __init__(self, file: BinaryIO, block_bytes: int) -> None:
+        self.file = file
+        self.block_bytes = block_bytes
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.line = 1
+
+    def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        block = self.file.read(self.block_bytes)
+        if not block:
+            self.eof = True
+            self.buffer = self.buffer[self.position :] + self.decoder.decode(b"", final=True)
+        else:
+            self.buffer = self.buffer[self.position :] + self.decoder.decode(block)
+        self.position = 0
+        return True
+
+    def _consume(self, end: int) -> None:
+        self.line += self.buffer.count("\n", self.position, end)
+        self.position = end
+
+    def __iter__(self) -> Iterator[Token]:
+        while True:
+            # Whitespace and comments: a comment may go on in the next block
+            match = SKIP_RE.match(self.buffer, self.position)
+            if match.end() == len(self.buffer):
+                if self._read_more():
+                    continue
+                return
+            self._consume(match.end())
+
+            token = self._match()
+            if token is None:
+                # The token may go on in the next block
+                if self._read_more():
+                    continue
+                raise TurtleSyntaxError(
+                    f"Invalid Turtle at line {self.line}: {self.buffer[self.position:self.position + 40]!r}"
+                )
+            kind, match = token
+            if len(self.buffer) - match.end() < TOKEN_LOOKAHEAD and not self.eof:
+                # Make sure the token is not cut by the end of the block (e.g. "1" of "1.5e3")
+                self._read_more()
+                continue
+            self._consume(match.end())
+            yield kind, match
+
+    def _match(self) -> Tuple[str, re.Match] | None:
+        text = self.buffer
+        start = self.position
+        if text.startswith(('"""', "'''"), start):
+            # An unterminated long string must not be read as an empty string
+            match = LONG_STRING_RES[text[start]].match(text, start)
+            return ("LONG_STRING", match) if match else None
+        for kind, pattern in TOKEN_RES:
+            match = pattern.match(text, start)
+            if match and match.end() > start:
+                return kind, match
+        return None
+
+
+class TurtleParser:
+    """
+    Streaming Turtle parser.
+
+    The file is read a block at a time, and the triples of each statement are
+    produced as soon as the statement ends, so that only one statement is held
+    in memory. Blank nodes get labels unique within the document (`_:b.<label>`
+    for labelled ones, `_:a.<n>` for anonymous ones).
+
+    Args:
+        source (str | bytes | BinaryIO): The Turtle content, or a binary file.
+        base (str | None): The base IRI relative IRIs are resolved against
+            (until a `@base` directive); relative IRIs are kept as they are without one.
+        block_bytes (int): The size of the blocks read from the file.
+    """
+
+    def __init__(
+        self,
+        source: str | bytes | BinaryIO,
+        base: str | None = None,
+        block_bytes: int = READ_BLOCK_BYTES,
+    ) -> None:
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        self.tokenizer = _Tokenizer(source, block_bytes)
+        self.tokens = iter(self.tokenizer)
+        self.base = base
+        self.prefixes: dict[str, str] = {}
+        self.anonymous = 0
+        self.lookahead: Token | None = None
+        self.triples: List[Triple] = []
+
+    # Tokens
+
+    def _peek(self) -> Token | None:
+        if self.lookahead is None:
+            self.lookahead = next(self.tokens, None)
+        return self.lookahead
+
+    def _next(self) -> Token:
+        token = self._peek()
+        if token is None:
+            raise TurtleSyntaxError("Unexpected end of the Turtle document")
+        self.lookahead = None
+        return token
+
+    def _is(self, token: Token | None, kind: str, value: str | None = None) -> bool:
+        if token is None or token[0] != kind:
+            return False
+        return value is None or token[1].group(0) == value
+
+    def _expect(self, kind: str, value: str | None = None) -> Token:
+        token = self._next()
+        if not self._is(token, kind, value):
+            raise TurtleSyntaxError(
+                f"Expected {value or kind} at line {self.tokenizer.line} of the Turtle document, "
+                f"found {token[1].group(0)!r}"
+            )
+        return token
+
+    # Terms
+
+    def _resolve(self, iri: str) -> str:
+        if self.base and not urlsplit(iri).scheme:
+            return urljoin(self.base, iri)
+        return iri
+
+    def _iri(self, token: Token) -> Term:
+        kind, match = token
+        if kind == "IRI":
+            return Term(self._resolve(unescape(match.group(0)[1:-1])), "iri")
+        if kind == "PNAME":
+            prefix = match.group(1) or ""
+            if prefix not in self.prefixes:
+                raise TurtleSyntaxError(f"Undeclared Turtle prefix: {prefix}:")
+            local = LOCAL_ESCAPE_RE.sub(r"\1", match.group(2) or "")
+            return Term(self.prefixes[prefix] + local, "iri")
+        raise TurtleSyntaxError(f"Expected an IRI in Turtle, found {match.group(0)!r}")
+
+    def _new_blank(self) -> Term:
+        self.anonymous += 1
+        return Term(f"_:a.{self.anonymous}", "blank")
+
+    def _subject(self) -> Term:
+        token = self._next()
+        kind = token[0]
+        if kind in ("IRI", "PNAME"):
+            return self._iri(token)
+        if kind == "BNODE":
+            return Term(f"_:b.{token[1].group(1)}", "blank")
+        if self._is(token, "PUNCT", "["):
+            return self._blank_node_property_list()
+        if self._is(token, "PUNCT", "("):
+            return self._collection()
+        raise TurtleSyntaxError(f"Unexpected Turtle subject: {token[1].group(0)!r}")
+
+    def _object(self) -> Term:
+        token = self._peek()
+        kind = token[0] if token else None
+        if kind in ("STRING", "LONG_STRING"):
+            self._next()
+            value = unescape(token[1].group(1))
+            following = self._peek()
+            if self._is(following, "AT"):
+                self._next()
+                return Term(value, "literal", None, following[1].group(1))
+            if self._is(following, "PUNCT", "^^"):
+                self._next()
+                return Term(value, "literal", self._iri(self._next()).value)
+            return Term(value, "literal")
+        if kind in ("INTEGER", "DECIMAL", "DOUBLE"):
+            self._next()
+            return Term(token[1].group(0), "literal", XSD + kind.lower())
+        if kind == "WORD" and token[1].group(0) in ("true", "false"):
+            self._next()
+            return Term(token[1].group(0), "literal", XSD + "boolean")
+        return self._subject()
+
+    def _blank_node_property_list(self) -> Term:
+        # After "[": "[]" is a fresh blank node
+        node = self._new_blank()
+        if self._is(self._peek(), "PUNCT", "]"):
+            self._next()
+            return node
+        self._predicate_object_list(node)
+        self._expect("PUNCT", "]")
+        return node
+
+    def _collection(self) -> Term:
+        # After "(": an RDF list of the objects
+        head = Term(RDF + "nil", "iri")
+        previous = None
+        while not self._is(self._peek(), "PUNCT", ")"):
+            item = self._object()
+            node = self._new_blank()
+            if previous is None:
+                head = node
+            else:
+                self.triples.append((previous, Term(RDF + "rest", "iri"), node))
+            self.triples.append((node, Term(RDF + "first", "iri"), item))
+            previous = node
+        self._next()
+        if previous is not None:
+            self.triples.append((previous, Term(RDF + "rest", "iri"), Term(RDF + "nil", "iri")))
+        return head
+
+    def _predicate_object_list(self, subject: Term) -> None:
+        while True:
+            token = self._next()
+            if self._is(token, "WORD", "a"):
+                predicate = Term(RDF + "type", "iri")
+            else:
+                predicate = self._iri(token)
+            while True:
+                self.triples.append((subject, predicate, self._object()))
+                if not self._is(self._peek(), "PUNCT", ","):
+                    break
+                self._next()
+            # ";" may be repeated, and may end the list
+            if not self._is(self._peek(), "PUNCT", ";"):
+                return
+            while self._is(self._peek(), "PUNCT", ";"):
+                self._next()
+            following = self._peek()
+            if following is None or self._is(following, "PUNCT", ".") or self._is(
+                following, "PUNCT", "]"
+            ):
+                return
+
+    # Statements
+
+    def _directive(self, token: Token) -> bool:
+        # @prefix/@base end with ".", PREFIX/BASE (SPARQL style) do not
+        kind, match = token
+        name = match.group(1) if kind == "AT" else match.group(0)
+        if kind == "WORD":
+            name = name.lower() if name.upper() in ("PREFIX", "BASE") else None
+        if name not in ("prefix", "base"):
+            return False
+        self._next()
+        if name == "prefix":
+            prefix = self._expect("PNAME")[1]
+            if prefix.group(2):
+                raise TurtleSyntaxError(f"Invalid Turtle prefix name: {prefix.group(0)!r}")
+            iri = self._iri(self._expect("IRI")).value
+            self.prefixes[prefix.group(1) or ""] = iri
+        else:
+            self.base = self._iri(self._expect("IRI")).value
+        if kind == "AT":
+            self._expect("PUNCT", ".")
+        return True
+
+    def __iter__(self) -> Iterator[Triple]:
+        while True:
+            token = self._peek()
+            if token is None:
+                return
+            if token[0] in ("AT", "WORD") and self._directive(token):
+                continue
+            subject = self._subject()
+            # "[ ... ] ." is a statement on its own
+            if not (subject.kind == "blank" and self._is(self._peek(), "PUNCT", ".")):
+                self._predicate_object_list(subject)
+            self._expect("PUNCT", ".")
+            yield from self.triples
+            self.triples = []
+
+
+def iter_turtle(
+    source: str | bytes | BinaryIO, base: str | None = None
+) -> Iterator[Triple]:
+    """Parse a Turtle document one statement at a time (see `TurtleParser`)."""
+    return iter(TurtleParser(source, base))
+
+
+def get_skolem_base(graph_iri: str | None, upload_id: str | None = None) -> str:
+    """
+    Build the prefix of the IRIs replacing the blank nodes of one upload.
+
+    Skolem IRIs follow RDF 1.1 (`/.well-known/genid/` under the authority of the
+    target graph), with a random part proper to the upload, so that blank nodes
+    of different uploads stay distinct. An upload resumed later passes its own
+    `upload_id` (32 hex digits), to get the same skolem IRIs again.
+    """
+    parts = urlsplit(graph_iri or "")
+    upload_id = upload_id or uuid.uuid4().hex
+    if parts.scheme in ("http", "https") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}/.well-known/genid/{upload_id}/"
+    return f"urn:uuid:{uuid.UUID(upload_id)}#"
+
+
+def skolemize(term: Term, skolem_base: str) -> Term:
+    """Replace a blank node with its skolem IRI; other terms are returned as they are."""
+    if term.kind != "blank":
+        return term
+    return Term(skolem_base + term.value[2:], "iri")
+
+
+def iter_nquads_lines(
+    triples: Iterator[Triple], graph_iri: str | None, skolem_base: str
+) -> Iterator[bytes]:
+    """
+    Write triples as N-Quads lines of a graph (N-Triples lines for the default graph).
+
+    Blank nodes are skolemized: once a document is split into several requests,
+    a blank node label would otherwise stand for a different node in each of them.
+
+    Args:
+        triples (Iterator[Triple]): The triples, e.g. from `iter_turtle`.
+        graph_iri (str | None): The full IRI of the target graph; None or empty
+            for the default graph.
+        skolem_base (str): The prefix of the skolem IRIs (see `get_skolem_base`).
+
+    Yields:
+        bytes: One line per triple, with its line break.
+    """
+    graph = f" {format_term(Term(graph_iri, 'iri'))}" if graph_iri else ""
+    for subject, predicate, obj in triples:
+        line = (
+            f"{format_term(skolemize(subject, skolem_base))} {format_term(predicate)} "
+            f"{format_term(skolemize(obj, skolem_base))}{graph} .\n"
+        )
+        yield line.encode("utf-8")
@@ -0,0 +1,238 @@
+"""On-disk checkpoints of N-Quads uploads, to resume them after a failure."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from lib.config_paths import get_config_home
+
+
+# Version of the journal format: journals of another version are ignored
+JOURNAL_VERSION = 2
+
+# Size of the blocks read to fingerprint a file
+FINGERPRINT_BLOCK_BYTES = 1 << 20
+
+
+def _get_journal_dir() -> Path | None:
+    if os.getenv("LOGRE_UPLOAD_JOURNAL", "1").strip().lower() in ("0", "false", "no"):
+        return None
+    return get_config_home() / "uploads"
+
+
+def get_file_fingerprint(file: BinaryIO) -> Tuple[str, int]:
+    """
+    Fingerprint a binary file from its current position, a block at a time.
+
+    The file is put back at its position afterwards.
+
+    Returns:
+        Tuple[str, int]: The SHA-256 of the content and its size in bytes.
+    """
+    position = file.tell()
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        block = file.read(FINGERPRINT_BLOCK_BYTES)
+        if not block:
+            break
+        digest.update(block)
+        size += len(block)
+    file.seek(position)
+    return digest.hexdigest(), size
+
+
+class UploadJournal:
+    """
+    Checkpoint of an upload: the offset up to which the endpoint acknowledged the file.
+
+    Chunks may be acknowledged out of order (parallel uploads): the checkpoint is
+    the end of the acknowledged bytes contiguous from the start, so that resuming
+    from it never skips a chunk. Lines before it may be sent again after a
+    resume: the journal keeps the `skolem_id` of the upload, so that their blank
+    nodes get the same skolem IRIs again and their triples are not duplicated.
+
+    The journal is written (atomically) each time the checkpoint moves, and
+    removed once the upload is complete.
+
+    Args:
+        path (Path | None): The journal file; None to keep the checkpoint in memory only.
+        entry (Dict[str, Any]): The upload description: endpoint, file name,
+            fingerprint, size, start and reached offset...
+    """
+
+    def __init__(self, path: Path | None, entry: Dict[str, Any]) -> None:
+        self.path = path
+        self.entry = entry
+        self._lock = threading.Lock()
+        # Acknowledged byte ranges beyond the checkpoint: start -> end
+        self._acknowledged: Dict[int, int] = {}
+
+    @classmethod
+    def open(
+        cls,
+        endpoint: str,
+        technology: str,
+        fingerprint: str,
+        size: int,
+        start: int,
+        name: str | None = None,
+    ) -> "UploadJournal":
+        """
+        Open the journal of an upload, with the checkpoint of a previous attempt if any.
+
+        Args:
+            endpoint (str): The endpoint identity (see `query_cache.get_endpoint_identity`).
+            technology (str): The endpoint technology, shown when listing journals.
+            fingerprint (str): The file fingerprint (see `get_file_fingerprint`).
+            size (int): The file size from `start`.
+            start (int): The offset the upload starts from in a fresh attempt.
+            name (str | None): The file name, shown when listing journals.
+        """
+        directory = _get_journal_dir()
+        path = None
+        if directory is not None:
+            digest = hashlib.sha256(f"{endpoint}\n{fingerprint}".encode("utf-8")).hexdigest()
+            path = directory / f"{digest}.json"
+
+        entry = read_journal(path) if path is not None and path.exists() else None
+        if (
+            entry is None
+            or entry.get("endpoint") != endpoint
+            or entry.get("fingerprint") != fingerprint
+            or entry.get("start") != start
+        ):
+            entry = {
+                "version": JOURNAL_VERSION,
+                "endpoint": endpoint,
+                "technology": technology,
+                "name": name,
+                "fingerprint": fingerprint,
+                "size": size,
+                "start": start,
+                "offset": start,
+                "triples": 0,
+                "skolem_id": uuid.uuid4().hex,
+                "status": "running",
+                "error": None,
+                "updated_at": time.time(),
+            }
+        return cls(path, entry)
+
+    @property
+    def offset(self) -> int:
+        """Return the offset up to which the file was acknowledged."""
+        return self.entry["offset"]
+
+    def begin(self, resume: bool) -> int:
+        """
+        Start an attempt, from the checkpoint if `resume`, else from the start.
+
+        Returns:
+            int: The offset to read the file from.
+        """
+        with self._lock:
+            if not resume:
+                self.entry["offset"] = self.entry["start"]
+                self.entry["triples"] = 0
+                # A fresh upload: its blank nodes are new nodes
+                self.entry["skolem_id"] = uuid.uuid4().hex
+            self.entry["status"] = "running"
+            self.entry["error"] = None
+            self._acknowledged.clear()
+            self._write()
+            return self.entry["offset"]
+
+    def acknowledge(self, start: int, end: int, triples: int) -> None:
+        """Record that the endpoint received the bytes from `start` to `end`."""
+        with self._lock:
+            self.entry["triples"] += triples
+            self._acknowledged[start] = end
+            offset = self.entry["offset"]
+            while offset in self._acknowledged:
+                offset = self._acknowledged.pop(offset)
+            if offset != self.entry["offset"]:
+                self.entry["offset"] = offset
+                self._write()
+
+    def fail(self, error: BaseException) -> None:
+        """Record that the attempt failed, keeping the checkpoint."""
+        with self._lock:
+            self.entry["status"] = "failed"
+            self.entry["error"] = str(error)
+            self._write()
+
+    def finish(self) -> None:
+        """Remove the journal of a complete upload."""
+        if self.path is None:
+            return
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        self.entry["updated_at"] = time.time()
+        temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self.entry, file)
+            os.replace(temp_path, self.path)
+        except OSError as err:
+            print(f"> Unable to write the upload journal {self.path.name}: {err}")
+
+
+def read_journal(path: Path) -> Dict[str, Any] | None:
+    """Read a journal file, None if unreadable or of another version."""
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != JOURNAL_VERSION:
+        return None
+    return entry
+
+
+def list_journals(endpoint: str | None = None) -> List[Dict[str, Any]]:
+    """
+    List the uploads left unfinished, most recent first.
+
+    Args:
+        endpoint (str | None): Only those of this endpoint identity; None for all.
+
+    Returns:
+        List[Dict[str, Any]]: The journal entries, with their `path`.
+    """
+    directory = _get_journal_dir()
+    if directory is None or not directory.exists():
+        return []
+    entries = []
+    for path in directory.glob("*.json"):
+        entry = read_journal(path)
+        if entry is None or (endpoint is not None and entry.get("endpoint") != endpoint):
+            continue
+        entries.append({**entry, "path": path})
+    return sorted(entries, key=lambda entry: entry.get("updated_at", 0), reverse=True)
+
+
+def find_journal(endpoint: str, name: str | None, size: int) -> Dict[str, Any] | None:
+    """
+    Find the unfinished upload of a file (by name and size), without reading the file.
+
+    The file fingerprint is checked when the upload is resumed.
+    """
+    for entry in list_journals(endpoint):
+        if entry.get("name") == name and entry.get("size") == size:
+            return entry
+    return None
+
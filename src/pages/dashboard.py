@@ -1,5 +1,5 @@
-import pandas as pd
-import plotly.graph_objects as go
+from datetime import datetime
+
 import streamlit as st
 from requests.exceptions import HTTPError, ConnectionError, Timeout
 
@@ -9,7 +9,12 @@ from components.menu import menu
 from schema.data_bundle import DataBundle
 from lib import state
 from lib.errors import get_HTTP_ERROR_message
-from lib.stats import summarize_classes, summarize_properties
+from lib.stats import (
+    get_stats,
+    is_refreshing_stats,
+    summarize_classes,
+    summarize_properties,
+)
 
 
 # Initialize application context
@@ -37,13 +42,26 @@ def show_metrics(overview: dict) -> None:
         (col_triples, "Triples", counts["triples"]),
     ]
 
+    # Estimated figures are marked: class and property numbers are the ones seen in the sample
+    estimated = overview["approximate"]
     for col, label, value in metrics_profile:
         with col.container(horizontal=True, horizontal_alignment="center"):
-            st.metric(label, format_short(value), width="content")
+            st.metric(
+                label,
+                f"≥ {format_short(value)}" if estimated else format_short(value),
+                help="At least this many (seen in the sample)" if estimated else None,
+                width="content",
+            )
 
     for col, label, value in metrics_data:
         with col.container(horizontal=True, horizontal_alignment="center"):
-            st.metric(label, format_short(value), width="content")
+            # Totals are None when counting them timed out
+            st.metric(
+                label,
+                format_short(value) if value is not None else "?",
+                help="Counting them timed out" if value is None else None,
+                width="content",
+            )
 
 
 def show_top_classes(overview: dict) -> None:
@@ -52,6 +70,8 @@ def show_top_classes(overview: dict) -> None:
     if not top_classes:
         return
 
+    import pandas as pd
+
     df = pd.DataFrame(top_classes)
     st.dataframe(
         df,
@@ -71,6 +91,8 @@ def show_top_properties(overview: dict) -> None:
     if not top_props:
         return
 
+    import pandas as pd
+
     df = pd.DataFrame(top_props)
     st.dataframe(
         df,
@@ -94,14 +116,14 @@ def show_pie_charts(data_bundle) -> None:
         render_pie_chart(
             values=[row["count"] for row in classes_stats["top"]],
             labels=[row["label"] for row in classes_stats["top"]],
-            title=f"Classes (Top {len(classes_stats['top'])})",
+            title=f"Classes (Top {len(classes_stats['top'])}){' - estimate' if classes_stats['approximate'] else ''}",
         )
 
     with charts[1]:
         render_pie_chart(
             values=[row["count"] for row in prop_stats["top"]],
             labels=[row["label"] for row in prop_stats["top"]],
-            title=f"Propriétés (Top {len(prop_stats['top'])})",
+            title=f"Propriétés (Top {len(prop_stats['top'])}){' - estimate' if prop_stats['approximate'] else ''}",
         )
 
 
@@ -110,6 +132,9 @@ def render_pie_chart(values, labels, title: str) -> None:
     if not values:
         return
 
+    # plotly is only imported once a chart is drawn, not to slow down the first render
+    import plotly.graph_objects as go
+
     chart = go.Pie(
         labels=labels,
         values=values,
@@ -134,132 +159,42 @@ def render_pie_chart(values, labels, title: str) -> None:
     st.plotly_chart(fig, width="stretch")
 
 
-@st.cache_data(ttl=60, hash_funcs={DataBundle: lambda db: db.key}, show_spinner=False)
 def get_dashboard_overview(data_bundle: DataBundle) -> dict:
     """
-    Gather counts and top classes from the active data bundle.
+    Gather counts and top classes and properties from the bundle statistics snapshot.
     """
-    counts = get_counts(data_bundle)
-    top_classes = get_top_classes(data_bundle, counts["entities"])
-    top_properties = get_top_properties(data_bundle, counts["triples"])
+    stats = get_stats(data_bundle)
     warnings = []
     return {
-        "counts": counts,
-        "top_classes": top_classes,
-        "top_properties": top_properties,
+        "counts": stats["counts"],
+        "top_classes": get_top_classes(stats),
+        "top_properties": get_top_properties(stats),
+        "computed_at": stats["computed_at"],
+        "approximate": stats.get("approximate", False),
+        "sample_size": stats.get("sample_size"),
+        "stored": stats.get("stored", True),
         "warnings": warnings,
     }
 
 
-def get_counts(data_bundle: DataBundle) -> dict:
+def get_top_classes(stats: dict, limit: int = 5) -> list[dict]:
     """
-    Retrieve total number of entities, classes and triples in the bundle.
+    Turn the most populated classes of the statistics snapshot into table rows.
     """
-    counts = {"entities": 0, "classes": 0, "properties": 0, "triples": 0}
-
-    query_entities = f"""
-        SELECT 
-            (COUNT(?instance) AS ?entity_count) 
-            (COUNT(DISTINCT ?class) AS ?class_count)
-        WHERE {{ 
-            {data_bundle.data.sparql_begin}
-                ?instance {data_bundle.model.type_property} ?class .
-            {data_bundle.data.sparql_end}
-        }}
-    """
-    response_entities = data_bundle.data.run(query_entities)
-    if response_entities:
-        counts["entities"] = _to_int(response_entities[0].get("entity_count"))
-        counts["classes"] = _to_int(response_entities[0].get("class_count"))
-
-    query_props = f"""
-        SELECT (COUNT(DISTINCT ?property) AS ?prop_count)
-        WHERE {{
-            {data_bundle.data.sparql_begin}
-                ?subject ?property ?object .
-            {data_bundle.data.sparql_end}
-        }}
-    """
-    response_props = data_bundle.data.run(query_props)
-    if response_props:
-        counts["properties"] = _to_int(response_props[0].get("prop_count"))
-
-    query_triples = f"""
-        SELECT (COUNT(*) AS ?triples_count)
-        WHERE {{
-            {data_bundle.data.sparql_begin}
-                ?s ?p ?o .
-            {data_bundle.data.sparql_end}
-        }}
-    """
-    response_triples = data_bundle.data.run(query_triples)
-    if response_triples:
-        counts["triples"] = _to_int(response_triples[0].get("triples_count"))
-
-    return counts
+    return [
+        {"Class": row["label"], "Instances": row["count"], "Share": row["share"]}
+        for row in stats["classes"][:limit]
+    ]
 
 
-def get_top_classes(
-    data_bundle: DataBundle, total_entities: int, limit: int = 5
-) -> list[dict]:
+def get_top_properties(stats: dict, limit: int = 5) -> list[dict]:
     """
-    Retrieve the most populated classes in the bundle.
+    Turn the most used properties of the statistics snapshot into table rows.
     """
-    query = f"""
-        SELECT ?class (COUNT(?instance) AS ?count)
-        WHERE {{
-            {data_bundle.data.sparql_begin}
-                ?instance {data_bundle.model.type_property} ?class .
-            {data_bundle.data.sparql_end}
-        }}
-        GROUP BY ?class
-        ORDER BY DESC(?count)
-        LIMIT {limit}
-    """
-    response = data_bundle.data.run(query)
-    if not response:
-        return []
-
-    rows = []
-    for row in response:
-        cls = data_bundle.model.find_class(row["class"])
-        count = _to_int(row["count"])
-        share = (count / total_entities * 100) if total_entities else 0
-        label = cls.get_text() if cls else data_bundle.prefixes.shorten(row["class"])
-        rows.append({"Class": label, "Instances": count, "Share": share})
-    return rows
-
-
-def get_top_properties(
-    data_bundle: DataBundle, total_triples: int, limit: int = 5
-) -> list[dict]:
-    query = f"""
-        SELECT ?property (COUNT(*) AS ?count)
-        WHERE {{
-            {data_bundle.data.sparql_begin}
-                ?subject ?property ?object .
-            {data_bundle.data.sparql_end}
-        }}
-        GROUP BY ?property
-        ORDER BY DESC(?count)
-        LIMIT {limit}
-    """
-    response = data_bundle.data.run(query)
-    if not response:
-        return []
-
-    rows = []
-    for row in response:
-        props = data_bundle.model.find_properties(row["property"])
-        label = (
-            props[0].label
-            if props and props[0].label
-            else data_bundle.prefixes.shorten(row["property"])
-        )
-        count = _to_int(row["count"])
-        share = (count / total_triples * 100) if total_triples else 0
-        rows.append({"Property": label, "Triples": count, "Share": share})
-    return rows
+    return [
+        {"Property": row["label"], "Triples": row["count"], "Share": row["share"]}
+        for row in stats["properties"][:limit]
+    ]
 
 
 def _to_int(value) -> int:
@@ -329,9 +264,53 @@ def show_configuration_panel() -> None:
         )
 
 
+def show_stats_freshness(overview: dict, data_bundle: DataBundle) -> None:
+    """Tell when the statistics were computed, and allow to compute them again."""
+    computed_at = datetime.fromtimestamp(overview["computed_at"])
+    caption = f"Statistics computed on {computed_at.strftime('%Y-%m-%d %H:%M')}"
+    if overview["approximate"]:
+        # Estimated because the exact counts timed out, or the graph is over the size threshold
+        cause = (
+            "the data graph is too large for exact counts"
+            if overview["approximate"] == "size"
+            else "the exact count timed out"
+        )
+        caption = (
+            f"Distributions estimated from a sample of {overview['sample_size']:,} subjects"
+            f" ({cause}) on {computed_at.strftime('%Y-%m-%d %H:%M')}"
+        )
+        if not overview["sample_size"]:
+            caption = (
+                "Distributions unknown: the exact count and the sample both timed out"
+                f" on {computed_at.strftime('%Y-%m-%d %H:%M')}"
+            )
+        elif overview["counts"]["triples"] is None:
+            caption += " (totals unknown: counts are those of the sample)"
+    elif not overview["stored"]:
+        caption += (
+            " (not stored: the data bundle has no metadata graph of its own,"
+            " so they are computed from the data graph each time)"
+        )
+    if is_refreshing_stats(data_bundle):
+        caption += " (updating in the background)"
+    with st.container(horizontal=True, vertical_alignment="center"):
+        st.caption(caption, width="content")
+        if st.button(
+            "",
+            icon=":material/refresh:",
+            type="tertiary",
+            help="Compute statistics again",
+            key="dashboard-refresh-stats",
+        ):
+            with st.spinner("Computing statistics..."):
+                get_stats(data_bundle, refresh=True)
+            st.rerun()
+
+
 def show_data_insights(overview, data_bundle):
     """Grouped visualisation for metrics, charts and tables."""
     show_metrics(overview)
+    show_stats_freshness(overview, data_bundle)
 
     chart_section = st.container()
     with chart_section:
@@ -81,9 +81,24 @@ try:
 
         st.text("")
 
-        # Fetch the data table
+        # Fetch the data table (by keyset if the previous page was seen, by offset otherwise)
+        view = (limit, sort_col, sort_way, filter_col, filter_value)
+        after = state.data_table_get_after(selected_class.uri, current_page, view)
         df_instances = data_bundle.get_data_table(
-            selected_class, limit, offset, sort_col, sort_way, filter_col, filter_value
+            selected_class,
+            limit,
+            offset,
+            sort_col,
+            sort_way,
+            filter_col,
+            filter_value,
+            after,
+        )
+        state.data_table_set_page(
+            selected_class.uri,
+            current_page,
+            df_instances.attrs.get("last_key"),
+            view,
         )
 
         # Display information if there are some
@@ -127,6 +142,43 @@ try:
         else:
             st.markdown("*No records found*")
 
+        # Pagination: next and previous pages are fetched by keyset, jumps by offset
+        with st.container(
+            horizontal=True, horizontal_alignment="center", vertical_alignment="center"
+        ):
+            # Go one page back
+            if st.button(
+                "<-",
+                type="tertiary",
+                disabled=current_page <= 1,
+                key="data-table-previous",
+            ):
+                state.data_table_set_page(selected_class.uri, current_page - 1)
+                st.rerun()
+
+            # Current page, or jump to any page
+            page_nb = st.number_input(
+                "Page",
+                min_value=1,
+                value=current_page,
+                label_visibility="collapsed",
+                key=f"data-table-page-{current_page}",
+                width=120,
+            )
+            if page_nb != current_page:
+                state.data_table_set_page(selected_class.uri, page_nb)
+                st.rerun()
+
+            # Go one page ahead
+            if st.button(
+                "->",
+                type="tertiary",
+                disabled=len(df_instances) < limit,
+                key="data-table-next",
+            ):
+                state.data_table_set_page(selected_class.uri, current_page + 1)
+                st.rerun()
+
 except HTTPError as err:
     message = get_HTTP_ERROR_message(err)
     st.toast("Unable to load this entity table", icon=":material/error:")
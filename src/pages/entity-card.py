@@ -26,10 +26,13 @@ entity_uri = state.get_entity_uri()
 if not entity_uri:
     st.warning("No Entity URI provided")
 else:
+    # Fetch the entity neighborhood once: the card (and its paginators) read from it
+    snapshot = state.get_entity_snapshot(data_bundle, entity_uri)
+
     # Gather minimal information about the entity
     # i.e. Fill Resource instance
-    entity = data_bundle.get_entity_basics(entity_uri)
-    entity_class = data_bundle.model.find_class(entity.class_uri)
+    entity = data_bundle.get_entity_basics(entity_uri, snapshot)
+    entity_class = data_bundle.model_index.find_class(entity.class_uri)
     endpoint_key = state.get_endpoint_key()
 
     def get_internal_entity_url(uri: str) -> str:
@@ -122,6 +125,7 @@ else:
                 data_bundle.data.delete(
                     ("?s", "?p", entity_uri)
                 )  # Delete all incomings
+                state.invalidate_entity_snapshots([entity_uri])
                 state.set_entity_uri(None)
                 st.rerun()
 
@@ -136,10 +140,42 @@ else:
     # According to the model (thanks to the entity class), get all the properties that the entity can have in its card
     all_properties = data_bundle.get_card_properties_of(entity.class_uri)
 
+    # In case it is not the first "st.run", get the right entities
+    offsets = [state.get_offset(entity.uri, p.get_key()) for p in all_properties]
+    # Pages already reached from their previous page are fetched by keyset
+    afters = [
+        state.get_cursor(entity.uri, p.get_key(), offset)
+        for p, offset in zip(all_properties, offsets)
+    ]
+
+    def is_outgoing(p) -> bool:
+        return bool(p.domain and p.domain.uri == entity_class.uri)
+
+    # Fetch the objects/subjects (with pagination) and the total count of all properties at once
+    card_statements = data_bundle.get_card_statements_of(
+        entity,
+        all_properties,
+        entity_class.uri if entity_class else None,
+        PAGINATION_LENGTH,
+        offsets,
+        snapshot=snapshot,
+        afters=afters,
+    )
+
     # Loop through all of them
-    for p in all_properties:
-        # In case it is not the first "st.run", get the right entities
-        offset = state.get_offset(entity.uri, p.get_key())
+    for index, p in enumerate(all_properties):
+        offset = offsets[index]
+        statements, total_count = card_statements[index]
+
+        # Remember where the next page starts
+        state.set_cursor(
+            entity.uri,
+            p.get_key(),
+            offset + PAGINATION_LENGTH,
+            data_bundle.get_keyset_cursor(
+                [s.object if is_outgoing(p) else s.subject for s in statements]
+            ),
+        )
 
         # Property and object/subjects container
         with st.container(horizontal=True, horizontal_alignment="right", border=True):
@@ -147,17 +183,12 @@ else:
             col_prop, col_entity = st.columns([5, 8])
 
             # If the property is OUTGOING for the entity
-            if p.domain and p.domain.uri == entity_class.uri:
+            if is_outgoing(p):
                 # Property Label
                 col_prop.markdown(f"##### **{get_property_text_with_uri(p)}**")
                 if p.range and p.range.uri:
                     col_prop.markdown(f"*Range:* {get_class_text_with_uri(p.range)}")
 
-                # Fetch all the objects (with paginagion)
-                statements = data_bundle.get_objects_of(
-                    entity, p, PAGINATION_LENGTH, offset
-                )
-
                 # Loop through all retrieved objects
                 for i, s in enumerate(statements):
                     col_value, col_info = col_entity.columns(
@@ -205,9 +236,6 @@ else:
                     with col_entity.container(
                         horizontal=True, vertical_alignment="center"
                     ):
-                        # Total entity number
-                        total_count = data_bundle.get_objects_of_count(entity, p)
-
                         # Go one page back
                         btn_key = f"btn-{entity_uri}-{p.get_key()}-previous"
                         disabled = offset <= 0
@@ -256,11 +284,6 @@ else:
                 if p.domain and p.domain.uri:
                     col_prop.markdown(f"*Domain:* {get_class_text_with_uri(p.domain)}")
 
-                # Fetch all the subjects (with paginagion)
-                statements = data_bundle.get_subjects_of(
-                    entity, p, limit=PAGINATION_LENGTH, offset=offset
-                )
-
                 # Loop through all retrieved subjects
                 for i, s in enumerate(statements):
                     col_value, col_info = col_entity.columns(
@@ -301,9 +324,6 @@ else:
                     with col_entity.container(
                         horizontal=True, vertical_alignment="center"
                     ):
-                        # Total entity number
-                        total_count = data_bundle.get_subjects_of_count(entity, p)
-
                         # Go one page back
                         btn_key = f"btn-{entity_uri}-{p.get_key()}-previous"
                         disabled = offset <= 0
@@ -1,7 +1,6 @@
 from typing import List
 import streamlit as st
 import hashlib, os, shutil
-from pyvis.network import Network
 from requests.exceptions import HTTPError, ConnectionError, Timeout
 from graphly.schema.statement import Statement
 from lib import state
@@ -31,8 +30,10 @@ try:
     else:
         # Gather minimal information about the entity
         # i.e. Fill Resource instance
-        entity = data_bundle.get_entity_basics(entity_uri)
-        entity_class = data_bundle.model.find_class(entity.class_uri)
+        entity = data_bundle.get_entity_basics(
+            entity_uri, state.get_entity_snapshot(data_bundle, entity_uri)
+        )
+        entity_class = data_bundle.model_index.find_class(entity.class_uri)
 
         # Init Entity to fetch
         state.entity_chart_inc_list_init(entity)
@@ -93,13 +94,19 @@ try:
 
         # Fetch all data (for selected entities)
         statements: List[Statement] = []
+        # (each expanded entity neighborhood is fetched once per session)
         for ent in state.entity_chart_inc_get_list():
             statements += data_bundle.get_incoming_statements_of(
-                ent, INCOMING_LIMIT, skip_props=skip_props
+                ent,
+                INCOMING_LIMIT,
+                skip_props=skip_props,
+                snapshot=state.get_entity_snapshot(data_bundle, ent.uri),
             )
         for ent in state.entity_chart_out_get_list():
             statements += data_bundle.get_outgoing_statements_of(
-                ent, skip_props=skip_props
+                ent,
+                skip_props=skip_props,
+                snapshot=state.get_entity_snapshot(data_bundle, ent.uri),
             )
 
         # Construct 2 lists of objects built for the Network X API
@@ -115,14 +122,14 @@ try:
         endpoint_qs = f"&endpoint={endpoint_key}" if endpoint_key else ""
         for statement in statements:
             # Construct Subject label
-            subject_class_text = data_bundle.model.find_class(
+            subject_class_text = data_bundle.model_index.find_class(
                 statement.subject.class_uri
             ).get_text()
             subject_label = f"{statement.subject.get_text()}\n({subject_class_text})"
 
             # Construct Object Label
             if statement.object.resource_type == "iri":
-                object_class_text = data_bundle.model.find_class(
+                object_class_text = data_bundle.model_index.find_class(
                     statement.object.class_uri
                 ).get_text()
                 object_class_text_2 = f"\n({object_class_text})"
@@ -194,7 +201,9 @@ try:
                 }
             )
 
-        # Network object: the one that will be displayed
+        # Network object: the one that will be displayed (pyvis is only imported here)
+        from pyvis.network import Network
+
         network = Network(width="100%", neighborhood_highlight=True)
         network.add_nodes(
             [n["id"] for n in nodes_dict],
@@ -68,7 +68,7 @@ else:
                 if prefer_class_label_on_missing and not raw_label:
                     class_uri = getattr(resource, "class_uri", None)
                     if class_uri:
-                        resource_class = data_bundle.model.find_class(class_uri)
+                        resource_class = data_bundle.model_index.find_class(class_uri)
                         if resource_class:
                             class_label = (resource_class.get_text() or "").strip()
                             if class_label:
@@ -170,7 +170,9 @@ else:
 
         # Header: entity name, additional info and description
         col_title, col_actions = st.columns([20, 10], vertical_alignment="bottom")
-        entity = data_bundle.get_entity_basics(entity_uri)
+        # Fetch the entity neighborhood once: all sections read from it
+        snapshot = state.get_entity_snapshot(data_bundle, entity_uri)
+        entity = data_bundle.get_entity_basics(entity_uri, snapshot)
         entity_label = get_resource_display_label(entity, max_length=120)
         entity_uri_html = get_uri_anchor_html(
             entity.uri,
@@ -212,9 +214,13 @@ else:
         # Type
         if entity.class_uri:
             prop_type = next(
-                iter(data_bundle.model.find_properties(data_bundle.model.type_property))
+                iter(
+                    data_bundle.model_index.find_properties(
+                        data_bundle.model.type_property
+                    )
+                )
             )
-            entity_class = data_bundle.model.find_class(entity.class_uri)
+            entity_class = data_bundle.model_index.find_class(entity.class_uri)
             display_triple(
                 Statement(entity, prop_type, entity_class), object_kind="ontology"
             )
@@ -223,7 +229,9 @@ else:
         if entity.label:
             prop_label = next(
                 iter(
-                    data_bundle.model.find_properties(data_bundle.model.label_property)
+                    data_bundle.model_index.find_properties(
+                        data_bundle.model.label_property
+                    )
                 )
             )
             entity_label = Resource(entity.label, resource_type="literal")
@@ -233,7 +241,7 @@ else:
         if entity.comment:
             comment = next(
                 iter(
-                    data_bundle.model.find_properties(
+                    data_bundle.model_index.find_properties(
                         data_bundle.model.comment_property
                     )
                 )
@@ -254,7 +262,7 @@ else:
         title_container = st.container(horizontal=True, vertical_alignment="bottom")
         title_container.markdown("### Outgoing statements", width="content")
         statements = data_bundle.get_outgoing_statements_of(
-            entity, skip_props=skip_props
+            entity, skip_props=skip_props, snapshot=snapshot
         )
         title_container.markdown(f"*{len(statements)} total outgoing triples*")
 
@@ -269,7 +277,9 @@ else:
         # Second category: Incoming statements
         title_container = st.container(horizontal=True, vertical_alignment="bottom")
         title_container.markdown("### Incoming statements", width="content")
-        total_inc_number = data_bundle.get_incoming_statements_of_count(entity)
+        total_inc_number = data_bundle.get_incoming_statements_of_count(
+            entity, snapshot
+        )
         title_container.markdown(f"*{total_inc_number} total incoming triples*")
 
         # Limit the quantity fetched, to not overload the page
@@ -285,14 +295,17 @@ else:
             )
             if title_container.button("Fetch"):
                 statements = data_bundle.get_incoming_statements_of(
-                    entity, limit=number_to_fetch, skip_props=skip_props
+                    entity,
+                    limit=number_to_fetch,
+                    skip_props=skip_props,
+                    snapshot=snapshot,
                 )
                 fetched = True
 
         # Avoid re-fetching
         if not fetched:
             statements = data_bundle.get_incoming_statements_of(
-                entity, skip_props=skip_props
+                entity, skip_props=skip_props, snapshot=snapshot
             )
 
         # Display triples
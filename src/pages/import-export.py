@@ -4,6 +4,9 @@ from components.init import init
 from components.doc_links import decorate_doc_links
 from components.menu import menu
 from lib import state
+from lib.query_cache import get_endpoint_identity
+from lib.upload_journal import find_journal
+from schema.sparql_technologies import upload_turtle_in_chunks
 from dialogs.confirmation import dialog_confirmation
 
 # Initialize
@@ -42,8 +45,6 @@ with st.expander("Import"):
         accept_multiple_files=False,
     )
     if file:
-        file_content = file.read().decode("utf-8")
-
         st.write("")
         st.write("")
 
@@ -57,23 +58,60 @@ with st.expander("Import"):
 
         # Handle the n-Quad format
         if file_format == "nq":
-            # Upload button: insert triples
+
+            def upload_nquads(nquad_file, resume: bool) -> None:
+                # The file is streamed in chunks, not read (and decoded) at once
+                nquad_file.seek(0)
+                try:
+                    data_bundle.endpoint.upload_nquads(
+                        nquad_file, resume=resume, name=nquad_file.name
+                    )
+                finally:
+                    # Even a failed upload may have inserted some chunks
+                    state.invalidate_caches("import_nquads", data_bundle)
+                data_bundle.load_model()
+                state.set_toast("n-Quad file uploaded", icon=":material/done:")
+                st.rerun()
+
+            # A previous upload of the same file that failed or was interrupted
+            unfinished = find_journal(
+                get_endpoint_identity(
+                    data_bundle.endpoint.url, data_bundle.endpoint.username
+                ),
+                file.name,
+                file.size,
+            )
+            if unfinished:
+                done = unfinished["offset"] - unfinished["start"]
+                percent_done = round(done / unfinished["size"] * 100) if unfinished["size"] else 0
+                reason = f": {unfinished['error']}" if unfinished.get("error") else ""
+                st.warning(
+                    f"A previous upload of this file stopped at {percent_done} % "
+                    f"({unfinished['triples']} triples){reason}",
+                    icon=":material/warning:",
+                )
+
+            # Upload button(s): insert triples, or the remaining ones
             with st.container(horizontal=True, horizontal_alignment="center"):
+                if unfinished and st.button(
+                    "Resume upload", type="primary", icon=":material/play_arrow:"
+                ):
+                    dialog_confirmation(
+                        f"You are about to resume the upload of the file {file.name}.",
+                        callback=upload_nquads,
+                        nquad_file=file,
+                        resume=True,
+                    )
                 if st.button(
-                    "Upload n-Quads", type="primary", icon=":material/upload:"
+                    "Upload n-Quads" if not unfinished else "Restart upload",
+                    type="primary" if not unfinished else "secondary",
+                    icon=":material/upload:",
                 ):
-
-                    def upload_nquads(nquad_content) -> None:
-                        data_bundle.endpoint.upload_nquads(nquad_content)
-                        data_bundle.load_model()
-                        state.set_toast("n-Quad file uploaded", icon=":material/done:")
-                        state.invalidate_caches("import_nquads")
-                        st.rerun()
-
                     dialog_confirmation(
                         f"You are about to upload the file {file.name}.",
                         callback=upload_nquads,
-                        nquad_content=file_content,
+                        nquad_file=file,
+                        resume=False,
                     )
 
         # Otherwise (i.e. Turtle), the destination should be decided (data, model, metadata)
@@ -96,25 +134,31 @@ with st.expander("Import"):
                     icon=":material/upload:",
                 ):
 
-                    def upload_turtle(turtle_content: str) -> None:
+                    def upload_turtle(turtle_file) -> None:
                         if data_type == "Data":
                             graph = data_bundle.data
                         if data_type == "Model":
                             graph = data_bundle.model
                         if data_type == "Metadata":
                             graph = data_bundle.metadata
-                        graph.upload_turtle(turtle_content)
+                        # The file is converted and sent in chunks, not read at once
+                        turtle_file.seek(0)
+                        try:
+                            upload_turtle_in_chunks(graph, turtle_file)
+                        finally:
+                            state.invalidate_caches(
+                                "import_turtle", data_bundle, [graph.uri]
+                            )
                         if data_type == "Model":
                             data_bundle.load_model()
                         state.set_toast("Turtle file uploaded", icon=":material/done:")
-                        state.invalidate_caches("import_turtle")
                         st.rerun()
 
                     confirmation_text = f"You are about to upload the file *{file.name}* into the {data_type} named graph."
                     dialog_confirmation(
                         confirmation_text,
                         callback=upload_turtle,
-                        turtle_content=file_content,
+                        turtle_file=file,
                     )
 
         st.write("")
@@ -227,11 +271,6 @@ with st.expander("Update model"):
         f"Load your SHACL file(s):", type=["ttl"], accept_multiple_files=True
     )
     if len(files):
-        files_content = ""
-        for file in files:
-            file_content = file.read().decode("utf-8")
-            files_content += "\n" + file_content
-
         st.write("")
         st.write("")
 
@@ -254,10 +293,17 @@ with st.expander("Update model"):
                 "Append SHACL profile(s)", type="primary", icon=":material/upload:"
             ):
 
-                def append_model(turtle_content: str) -> None:
-                    data_bundle.model.upload_turtle(turtle_content)
+                def append_model(turtle_files) -> None:
+                    # One upload per file: blank nodes of different files are different nodes
+                    try:
+                        for turtle_file in turtle_files:
+                            turtle_file.seek(0)
+                            upload_turtle_in_chunks(data_bundle.model, turtle_file)
+                    finally:
+                        state.invalidate_caches(
+                            "append_model", data_bundle, [data_bundle.model.uri]
+                        )
                     data_bundle.load_model()
-                    state.invalidate_caches("append_model")
                     state.set_toast("Model updated", icon=":material/done:")
 
                 confirmation_text = (
@@ -266,7 +312,7 @@ with st.expander("Update model"):
                 dialog_confirmation(
                     confirmation_text,
                     callback=append_model,
-                    turtle_content=files_content,
+                    turtle_files=files,
                 )
 
 with st.container(horizontal=True, horizontal_alignment="right"):
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from requests.exceptions import HTTPError, ConnectionError, Timeout
 from code_editor import code_editor
 from components.init import init
@@ -19,31 +18,6 @@ EDITOR_SELECTED_BY_ENDPOINT_KEY = "sparql-editor-selected-query-by-endpoint"
 EDITOR_DRAFTS_BY_ENDPOINT_KEY = "sparql-editor-drafts-by-endpoint"
 
 
-def _normalize_binding_value(value):
-    if value is None or isinstance(value, (str, int, float, bool)):
-        return value
-    if isinstance(value, dict):
-        if "value" in value:
-            return _normalize_binding_value(value["value"])
-        return str(value)
-    return str(value)
-
-
-def _normalize_table_rows(result) -> list[dict]:
-    rows = []
-    for item in result:
-        if isinstance(item, dict):
-            rows.append(
-                {
-                    str(column): _normalize_binding_value(value)
-                    for column, value in item.items()
-                }
-            )
-        else:
-            rows.append({"value": _normalize_binding_value(item)})
-    return rows
-
-
 # Initialize
 init(layout="wide", required_query_params=["endpoint", "db"])
 menu()
@@ -208,19 +182,28 @@ try:
             != state.get_last_executed_sparql_id()
         ):
             # Run the query
-            result = endpoint.run(endpoint_drafts.get(sparql_query_name, ""), prefixes)
+            result = endpoint.run(
+                endpoint_drafts.get(sparql_query_name, ""),
+                prefixes,
+                result_format="tsv",
+            )
             state.set_last_executed_sparql_id(f"{endpoint_key}:{editor['id']}")
 
             # If there is a result
             if result is not None:
-                if isinstance(result, list):
+                import pandas as pd
+
+                if isinstance(result, pd.DataFrame):
                     st.session_state[RESULT_KIND_KEY] = "table"
-                    st.session_state[RESULT_TABLE_KEY] = _normalize_table_rows(result)
+                    st.session_state[RESULT_TABLE_KEY] = result
                     st.session_state[RESULT_TEXT_KEY] = None
                 else:
                     st.session_state[RESULT_KIND_KEY] = "code"
-                    st.session_state[RESULT_TEXT_KEY] = str(result)
-                    st.session_state[RESULT_TABLE_KEY] = []
+                    # ASK queries answer a boolean
+                    st.session_state[RESULT_TEXT_KEY] = (
+                        str(result).lower() if isinstance(result, bool) else str(result)
+                    )
+                    st.session_state[RESULT_TABLE_KEY] = None
 
             # When there is no result: a insert/delete query
             else:
@@ -263,8 +246,11 @@ try:
                 )
 
             if result_kind == "table":
-                rows = st.session_state.get(RESULT_TABLE_KEY, [])
-                df = pd.DataFrame(rows)
+                import pandas as pd
+
+                df = st.session_state.get(RESULT_TABLE_KEY)
+                if df is None:
+                    df = pd.DataFrame()
                 if not df.empty:
                     df = df.where(pd.notna(df), "")
 
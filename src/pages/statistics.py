@@ -1,14 +1,14 @@
+from datetime import datetime
 import streamlit as st
-import pandas as pd
 from requests.exceptions import HTTPError, ConnectionError
 from code_editor import code_editor
 from components.init import init
 from components.menu import menu
 from lib import state
+from lib.stats import get_stats, summarize_classes, summarize_properties
 from dialogs.confirmation import dialog_confirmation
 from dialogs.query_name import dialog_query_name
 from dialogs.confirmation import dialog_confirmation
-import plotly.graph_objects as go
 
 # Initialize
 init(layout='wide')
@@ -18,33 +18,46 @@ menu()
 data_bundle = state.get_data_bundle()
 
 
+# Statistics are read from the metadata graph: tell when they were computed
+stats = get_stats(data_bundle)
+computed_at = datetime.fromtimestamp(stats['computed_at'])
+caption = f"Statistics computed on {computed_at.strftime('%Y-%m-%d %H:%M')}"
+if stats.get('approximate'):
+    caption = f"Estimates (hover the charts for their 95% confidence bounds) from a sample of {stats['sample_size']:,} subjects, computed on {computed_at.strftime('%Y-%m-%d %H:%M')}"
+    if not stats['sample_size']:
+        caption = f"Distributions unknown: the exact count and the sample both timed out on {computed_at.strftime('%Y-%m-%d %H:%M')}"
+    elif stats['counts']['triples'] is None:
+        caption += " (totals unknown: counts are those of the sample)"
+elif not stats.get('stored', True):
+    caption += " (not stored: the data bundle has no metadata graph of its own, so they are computed from the data graph each time)"
+with st.container(horizontal=True, vertical_alignment='center'):
+    st.caption(caption, width='content')
+    if st.button('', icon=':material/refresh:', type='tertiary', help='Compute statistics again'):
+        with st.spinner('Computing statistics'):
+            get_stats(data_bundle, refresh=True)
+        st.rerun()
+
 with st.container(horizontal=True, horizontal_alignment='distribute'):
 # Classes Pie chart
 
     with st.spinner('Counting classes'):
-        query = f"""
-            SELECT ?class (COUNT(?instance) AS ?count)
-            WHERE {{
-                {data_bundle.data.sparql_begin}
-                    ?instance {data_bundle.model.type_property} ?class .
-                {data_bundle.data.sparql_end}
-            }}
-            GROUP BY ?class
-            ORDER BY DESC(?count)
-        """
-        results = data_bundle.run(query)
-        total = sum([result['count'] for result in results])
+        classes_stats = summarize_classes(data_bundle)
+        results = classes_stats['rows']
+        total = classes_stats['total']
 
-    labels = [data_bundle.model.find_class(result["class"]).label for result in results]
-    values = [result["count"] for result in results]
+    labels = [result['label'] for result in results]
+    values = [result['count'] for result in results]
     orange_colors = ['rgb(255, 230, 204)', 'rgb(255, 216, 179)', 'rgb(255, 204, 153)', 'rgb(255, 191, 128)', 'rgb(255, 179, 102)', 'rgb(255, 165, 77)', 'rgb(255, 153, 51)', 'rgb(255, 140, 26)', 'rgb(255, 127, 0)', 'rgb(230, 115, 0)', 'rgb(204, 102, 0)', 'rgb(179, 89, 0)']
 
     if len(results):
+        import plotly.graph_objects as go
+
         chart = go.Pie(
             labels=labels,
             values=values,
             hole=0.5,
-            title=f"Total: {total}",
+            title=("Total: unknown" if total is None else f"Total: ~{total}") if classes_stats['approximate'] else f"Total: {total}",
+            hovertext=[f"{result['low']:,} to {result['high']:,}" for result in results] if classes_stats['approximate'] else None,
             textposition="inside",
             textinfo="percent+label",
             name="",
@@ -62,31 +75,24 @@ with st.container(horizontal=True, horizontal_alignment='distribute'):
     # Properties Pie chart
 
     with st.spinner('Counting properties'):
-        query = f"""
-            SELECT ?property (COUNT(*) AS ?count)
-            WHERE {{
-                {data_bundle.data.sparql_begin}
-                    ?subject ?property ?object .
-                {data_bundle.data.sparql_end}
-            }}
-            GROUP BY ?property
-            ORDER BY DESC(?count)
-        """
-        results = data_bundle.run(query)
-        # Filter out type, label and comment properties
-        results = [result for result in results if result['property'] not in [data_bundle.model.type_property, data_bundle.model.label_property, data_bundle.model.comment_property]]
-        total = sum([result['count'] for result in results])
+        # Type, label and comment properties are filtered out
+        prop_stats = summarize_properties(data_bundle)
+        results = prop_stats['rows']
+        total = prop_stats['total']
 
-    labels = [data_bundle.model.find_properties(result["property"])[0].label for result in results]
-    values = [result["count"] for result in results]
+    labels = [result['label'] for result in results]
+    values = [result['count'] for result in results]
     orange_colors = ['rgb(255, 230, 204)', 'rgb(255, 216, 179)', 'rgb(255, 204, 153)', 'rgb(255, 191, 128)', 'rgb(255, 179, 102)', 'rgb(255, 165, 77)', 'rgb(255, 153, 51)', 'rgb(255, 140, 26)', 'rgb(255, 127, 0)', 'rgb(230, 115, 0)', 'rgb(204, 102, 0)', 'rgb(179, 89, 0)']
 
     if len(results):
+        import plotly.graph_objects as go
+
         chart = go.Pie(
             labels=labels,
             values=values,
             hole=0.5,
-            title=f"Total: {total}",
+            title=("Total: unknown" if total is None else f"Total: ~{total}") if prop_stats['approximate'] else f"Total: {total}",
+            hovertext=[f"{result['low']:,} to {result['high']:,}" for result in results] if prop_stats['approximate'] else None,
             textposition="inside",
             textinfo="percent+label",
             name="",
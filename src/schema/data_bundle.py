@@ -1,5 +1,7 @@
-from typing import List, Tuple, Dict
-import pandas as pd
+from __future__ import annotations
+from numbers import Integral
+import time
+from typing import TYPE_CHECKING, Any, Callable, List, Tuple, Dict
 from requests.exceptions import HTTPError
 from graphly.schema import (
     Sparql,
@@ -13,9 +15,53 @@ from graphly.schema import (
     Prefix,
 )
 from graphly.tools import prepare
+from lib.http_pool import get_endpoint_key
+from lib.model_cache import get_model_cache, get_model_fingerprint
+from lib.model_index import ModelIndex
+from lib.prefix_index import PrefixIndex, get_prefix_index
+from lib.query_cache import get_endpoint_identity
+from lib.ntriples import Term
+from lib.sparql_executor import get_query_executor
+from lib.sparql_results import XSD_INTEGER
+from lib.triple_snapshot import TripleSnapshot
 from lib.utils import normalize_text, to_snake_case, from_snake_case
 from .model_framework import get_model_framework
 
+if TYPE_CHECKING:
+    # pandas is only imported by the methods building tables, not to slow down startup
+    import pandas as pd
+
+
+# Default bounds of DataBundle.load_neighborhood(): triples per direction and
+# hop, and nodes expanded per hop beyond the first
+NEIGHBORHOOD_CAPS = {"outgoing": 500, "incoming": 500, "nodes": 100}
+
+# Any single step, forward or backward (negated property set of a dummy IRI)
+ANY_STEP_PATH = "!(<urn:logre:none>|^<urn:logre:none>)"
+
+# Datatypes whose values are sorted (and compared, for keyset pagination) as numbers
+NUMERIC_DATATYPES = {
+    f"http://www.w3.org/2001/XMLSchema#{name}"
+    for name in (
+        "integer",
+        "decimal",
+        "float",
+        "double",
+        "int",
+        "long",
+        "short",
+        "byte",
+        "nonNegativeInteger",
+        "nonPositiveInteger",
+        "positiveInteger",
+        "negativeInteger",
+        "unsignedLong",
+        "unsignedInt",
+        "unsignedShort",
+        "unsignedByte",
+    )
+}
+
 
 class DataBundle:
     # Attributes
@@ -94,6 +140,30 @@ class DataBundle:
         # Metadata graph
         self.metadata = Graph(self.endpoint, graph_metadata_uri, self.prefixes)
 
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        """
+        Compiled index of the bundle prefixes, for fast URI shortening and expansion.
+
+        Built on first use, and rebuilt if the prefixes have been edited since
+        (see `state.update_prefix`).
+        """
+        return get_prefix_index(self.prefixes)
+
+    @property
+    def model_index(self) -> ModelIndex:
+        """
+        Index of the model classes and properties, for dict lookups instead of scans.
+
+        Built when the model is loaded (see `load_model`), and rebuilt on first use
+        if the model classes or properties have changed since.
+        """
+        index = self.__dict__.get("_model_index")
+        if index is None or not index.is_current(self.model):
+            index = ModelIndex(self.model)
+            self._model_index = index
+        return index
+
     def attach_endpoint(self, endpoint: Sparql) -> None:
         """
         Rebind the bundle to another endpoint (used when editing endpoint settings).
@@ -108,10 +178,22 @@ class DataBundle:
         Load and update the model for the data bundle by fetching it from the model graph.
 
         Updates the current model with information from `graph_model` using the defined prefixes.
+        The parsed classes and properties are shared by all the sessions, and kept on disk
+        across restarts (see `lib.model_cache`): the model graph is only fetched and parsed
+        again when its content changed.
         """
-        # Fetch the Model
+        # Fetch the Model, unless another session (or a previous run) already parsed this content
         try:
-            self.model.update()
+            start = time.perf_counter()
+            fingerprint = get_model_fingerprint(self)
+            (classes, properties), source = get_model_cache().get_or_load(
+                self.model_cache_key, fingerprint, self.__fetch_model
+            )
+            self.model.classes = classes
+            self.model.properties = properties
+            print(
+                f"[model] {self.name}: loaded from {source} in {time.perf_counter() - start:.3f}s"
+            )
         except HTTPError as err:
             status_code = err.response.status_code
             reason = err.response.reason
@@ -121,6 +203,34 @@ class DataBundle:
                 message += f"\n\n{err.response.text}"
             raise Exception(message)
 
+        # Index the fresh model
+        self._model_index = ModelIndex(self.model)
+
+    @property
+    def model_cache_key(self) -> Tuple[str, str, Tuple]:
+        """
+        Key of the bundle model in the shared model cache: the endpoint, the model
+        graph, and what parsing depends on (framework, properties and prefixes).
+        """
+        return (
+            get_endpoint_identity(
+                getattr(self.endpoint, "url", None),
+                getattr(self.endpoint, "username", None),
+            ),
+            self.prefix_index.lengthen(self.model.uri or ""),
+            (
+                type(self.model).__name__,
+                self.model.type_property,
+                self.model.label_property,
+                self.model.comment_property,
+                tuple((prefix.short, prefix.long) for prefix in self.prefixes.prefix_list),
+            ),
+        )
+
+    def __fetch_model(self) -> Tuple[List[Resource], List[Property]]:
+        self.model.update()
+        return self.model.classes, self.model.properties
+
     def has_usable_model(self) -> bool:
         """
         Indicate whether the current bundle has any non-datatype classes or properties loaded.
@@ -149,6 +259,40 @@ class DataBundle:
         """
         return self.endpoint.run(text, self.prefixes)
 
+    def gather(self, *calls: Callable[[], Any]) -> List[Any]:
+        """
+        Run independent calls (usually bound query methods) concurrently.
+
+        At most `LOGRE_SPARQL_MAX_CONCURRENCY` queries are in flight at once on
+        the bundle endpoint, whichever page sends them.
+
+        Args:
+            *calls (Callable[[], Any]): Calls without arguments, e.g. `lambda: self.get_objects_of(...)`.
+
+        Returns:
+            List[Any]: The results, in the order of `calls`.
+
+        Raises:
+            HTTPError: The error of the first failing call, unchanged.
+        """
+        endpoint_key = get_endpoint_key(
+            getattr(self.endpoint, "url", None),
+            getattr(self.endpoint, "username", None),
+        )
+        return get_query_executor().run(endpoint_key, calls)
+
+    def run_many(self, texts: List[str]) -> List[List[Dict] | None]:
+        """
+        Execute several SPARQL queries concurrently against the configured endpoint.
+
+        Args:
+            texts (List[str]): The SPARQL query strings to execute.
+
+        Returns:
+            List[List[Dict] | None]: The result bindings of each query, in the order of `texts`.
+        """
+        return self.gather(*[lambda text=text: self.run(text) for text in texts])
+
     def find_entities(
         self,
         label: str = None,
@@ -177,7 +321,7 @@ class DataBundle:
         filter_clause = (
             f"FILTER(CONTAINS(LCASE(?label_), LCASE('{label}'))) ." if label else ""
         )
-        prepared_class_uri = prepare(class_uri, self.prefixes.shorts())
+        prepared_class_uri = prepare(class_uri, self.prefix_index.shorts())
         query = f"""
             # DataBundle.find_entities()
             SELECT
@@ -227,7 +371,7 @@ class DataBundle:
             List[Property]: A list of properties outgoing from the given entity.
         """
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
         query = f"""
             SELECT DISTINCT 
                 ?uri 
@@ -246,7 +390,7 @@ class DataBundle:
         # Find properties in model (for additional informations, labels, etc)
         domain_class_uri = entity.class_uri if entity.class_uri else None
         properties = [
-            self.model.find_properties(
+            self.model_index.find_properties(
                 prop["uri"],
                 domain_class_uri=domain_class_uri,
                 range_class_uri=prop["range_class_uri"],
@@ -274,7 +418,7 @@ class DataBundle:
             List[Property]: A list of properties incoming to the given entity.
         """
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
         query = f"""
             SELECT DISTINCT 
                 ?uri 
@@ -293,7 +437,7 @@ class DataBundle:
         # Find properties in model (for additional informations, labels, etc)
         range_class_uri = entity.class_uri if entity.class_uri else None
         properties = [
-            self.model.find_properties(
+            self.model_index.find_properties(
                 prop["uri"],
                 domain_class_uri=prop["domain_class_uri"],
                 range_class_uri=range_class_uri,
@@ -319,16 +463,15 @@ class DataBundle:
         Returns:
             List[Property]: A sorted list of card properties for the class.
         """
-        card_properties = [
-            p
-            for p in self.model.properties
-            if p.card_of != None and p.card_of.uri == class_uri
-        ]
-        card_properties.sort(key=lambda p: p.order or 10**18)
-        return card_properties
+        return self.model_index.card_properties_of(class_uri)
 
     def get_objects_of(
-        self, entity: Resource, property: Property, limit: int = 5, offset: int = 0
+        self,
+        entity: Resource,
+        property: Property,
+        limit: int = 5,
+        offset: int = 0,
+        after: str | None = None,
     ) -> List[Statement]:
         """
         Retrieve the objects of a given entity for a specific property from the data graph.
@@ -342,22 +485,43 @@ class DataBundle:
             property (Property): The property whose objects are retrieved.
             limit (int, optional): The maximum number of objects to return. Defaults to 5.
             offset (int, optional): The number of objects to skip for pagination. Defaults to 0.
+            after (str, optional): The keyset cursor of the previous page (see `get_keyset_cursor`):
+                objects are ordered by their string value, and the page starts after it. If given,
+                `offset` is ignored. Defaults to None.
 
         Returns:
             List[Statement]: A list of statements representing the entity-property-object triples.
         """
-        # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
-        property_uri = prepare(property.uri, self.prefixes.shorts())
+        # Execute query
+        response = self.data.run(
+            self.__objects_of_query(entity, property, limit, offset, after=after)
+        )
+
+        # Parse response into Statement instance list
+        return self.__objects_of_statements(entity, property, response)
+
+    def __objects_of_query(
+        self,
+        entity: Resource,
+        property: Property,
+        limit: int,
+        offset: int,
+        card_index: int | None = None,
+        after: str | None = None,
+    ) -> str:
+        """Build the query of `get_objects_of` (tagged with `card_index` in bulk queries)."""
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
+        property_uri = prepare(property.uri, self.prefix_index.shorts())
         object_class_uri = prepare(
-            property.range.uri if property.range else None, self.prefixes.shorts()
+            property.range.uri if property.range else None, self.prefix_index.shorts()
         )
         is_range_datatype = (
             property.range.class_uri == "rdfs:Datatype" if property.range else False
         )
-        query = f"""
+        return f"""
             # DataBundle.get_objects_of()
             SELECT
+                {f"({card_index} as ?card_index)" if card_index is not None else ""}
                 ?object_uri
                 (COALESCE(?object_label_, '') as ?object_label)
                 (COALESCE(?object_comment_, '') as ?object_comment)
@@ -370,17 +534,21 @@ class DataBundle:
                     OPTIONAL {{ ?object_uri {self.model.label_property} ?object_label_ . }}
                     OPTIONAL {{ ?object_uri {self.model.comment_property} ?object_comment_ . }}
                     OPTIONAL {{ ?object_uri {self.model.type_property} ?object_class_uri_ . }}
+                    {self.__keyset_seek("?object_uri", after) if after is not None else ""}
                 {self.data.sparql_end}
             }}
+            {self.__keyset_order("?object_uri")}
             {f"LIMIT {limit}" if limit else ""}
-            {f"OFFSET {offset}" if offset else ""}
+            {f"OFFSET {offset}" if offset and after is None else ""}
         """
 
-        # Execute query
-        response = self.data.run(query)
-
-        # Make it unique based on object URI (can have duplicates because of multiple lables, comments, ...)
-        response = list({d["object_uri"]: d for d in reversed(response)}.values())
+    @staticmethod
+    def __objects_of_statements(
+        entity: Resource, property: Property, response: List[Dict]
+    ) -> List[Statement]:
+        """Turn `get_objects_of` result rows into statements."""
+        # Make it unique based on object URI (can have duplicates because of multiple lables, comments, ...), keeping the order
+        response = list({d["object_uri"]: d for d in reversed(response)}.values())[::-1]
 
         # Parse response into Statement instance list
         statements = [
@@ -415,8 +583,8 @@ class DataBundle:
             int: The number of objects associated with the entity via the property.
         """
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
-        property_uri = prepare(property.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
+        property_uri = prepare(property.uri, self.prefix_index.shorts())
         query = f"""
             # DataBundle.get_objects_of_count()
             SELECT
@@ -434,7 +602,12 @@ class DataBundle:
         return response[0]["count"]
 
     def get_subjects_of(
-        self, entity: Resource, property: Property, limit: int = 5, offset: int = 0
+        self,
+        entity: Resource,
+        property: Property,
+        limit: int = 5,
+        offset: int = 0,
+        after: str | None = None,
     ) -> List[Statement]:
         """
         Retrieve the subjects of a given entity for a specific property from the data graph.
@@ -448,19 +621,40 @@ class DataBundle:
             property (Property): The property whose subjects are retrieved.
             limit (int, optional): The maximum number of subjects to return. Defaults to 5.
             offset (int, optional): The number of subjects to skip for pagination. Defaults to 0.
+            after (str, optional): The keyset cursor of the previous page (see `get_keyset_cursor`):
+                subjects are ordered by their string value, and the page starts after it. If given,
+                `offset` is ignored. Defaults to None.
 
         Returns:
             List[Statement]: A list of statements representing the subject-property-entity triples.
         """
-        # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
-        property_uri = prepare(property.uri, self.prefixes.shorts())
+        # Execute query
+        response = self.data.run(
+            self.__subjects_of_query(entity, property, limit, offset, after=after)
+        )
+
+        # Parse response into Statement instance list
+        return self.__subjects_of_statements(entity, property, response)
+
+    def __subjects_of_query(
+        self,
+        entity: Resource,
+        property: Property,
+        limit: int,
+        offset: int,
+        card_index: int | None = None,
+        after: str | None = None,
+    ) -> str:
+        """Build the query of `get_subjects_of` (tagged with `card_index` in bulk queries)."""
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
+        property_uri = prepare(property.uri, self.prefix_index.shorts())
         subject_class_uri = prepare(
-            property.domain.uri if property.domain else None, self.prefixes.shorts()
+            property.domain.uri if property.domain else None, self.prefix_index.shorts()
         )
-        query = f"""
+        return f"""
             # DataBundle.get_subjects_of()
             SELECT
+                {f"({card_index} as ?card_index)" if card_index is not None else ""}
                 ?subject_uri
                 (COALESCE(?subject_label_, '') as ?subject_label)
                 (COALESCE(?subject_comment_, '') as ?subject_comment)
@@ -473,17 +667,21 @@ class DataBundle:
                     OPTIONAL {{ ?subject_uri {self.model.label_property} ?subject_label_ . }}
                     OPTIONAL {{ ?subject_uri {self.model.comment_property} ?subject_comment_ . }}
                     OPTIONAL {{ ?subject_uri {self.model.type_property} ?subject_class_uri_ . }}
+                    {self.__keyset_seek("?subject_uri", after) if after is not None else ""}
                 {self.data.sparql_end}
             }}
+            {self.__keyset_order("?subject_uri")}
             {f"LIMIT {limit}" if limit else ""}
-            {f"OFFSET {offset}" if offset else ""}
+            {f"OFFSET {offset}" if offset and after is None else ""}
         """
 
-        # Execute query
-        response = self.data.run(query)
-
-        # Make it unique based on subject URI (can have duplicates because of multiple lables, comments, ...)
-        response = list({d["subject_uri"]: d for d in reversed(response)}.values())
+    @staticmethod
+    def __subjects_of_statements(
+        entity: Resource, property: Property, response: List[Dict]
+    ) -> List[Statement]:
+        """Turn `get_subjects_of` result rows into statements."""
+        # Make it unique based on subject URI (can have duplicates because of multiple lables, comments, ...), keeping the order
+        response = list({d["subject_uri"]: d for d in reversed(response)}.values())[::-1]
 
         # Parse response into Statement instance list
         statements = [
@@ -518,8 +716,8 @@ class DataBundle:
             int: The number of subjects associated with the entity via the property.
         """
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
-        property_uri = prepare(property.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
+        property_uri = prepare(property.uri, self.prefix_index.shorts())
         query = f"""
             # DataBundle.get_objects_of_count()
             SELECT
@@ -536,8 +734,224 @@ class DataBundle:
 
         return response[0]["count"]
 
+    def get_card_statements_of(
+        self,
+        entity: Resource,
+        properties: List[Property],
+        class_uri: str | None,
+        limit: int = 5,
+        offsets: List[int] | None = None,
+        snapshot: TripleSnapshot | None = None,
+        afters: List[str | None] | None = None,
+    ) -> List[Tuple[List[Statement], int]]:
+        """
+        Retrieve a page of statements and the total count for all the card properties of an entity.
+
+        Does what `get_objects_of`/`get_subjects_of` and their `_count` counterparts
+        do for each property, in two queries sent together: one page query made of
+        a sub-select per property (so each keeps its own LIMIT and OFFSET), and one
+        count query with the properties in `VALUES`, grouped per property.
+
+        Args:
+            entity (Resource): The entity whose card is displayed.
+            properties (List[Property]): The card properties (see `get_card_properties_of`).
+            class_uri (str | None): The entity class URI: properties whose domain is this
+                class are outgoing (objects are fetched), the others incoming (subjects are fetched).
+            limit (int, optional): The page length. Defaults to 5.
+            offsets (List[int], optional): The page offset of each property. Defaults to 0 for all.
+            snapshot (TripleSnapshot, optional): The entity neighborhood (see `load_neighborhood`);
+                if it holds all the needed triples, no query is sent.
+            afters (List[str | None], optional): The keyset cursor of each property (see
+                `get_keyset_cursor`), used instead of its offset when not None.
+
+        Returns:
+            List[Tuple[List[Statement], int]]: For each property, in order, the statements
+            of the page and the total number of statements.
+        """
+        if not properties:
+            return []
+        offsets = offsets or [0] * len(properties)
+        afters = afters or [None] * len(properties)
+        outgoing = [
+            bool(p.domain and class_uri and p.domain.uri == class_uri)
+            for p in properties
+        ]
+
+        if snapshot is not None and snapshot.covers(
+            entity.uri, outgoing=any(outgoing), incoming=not all(outgoing)
+        ):
+            return [
+                self.__snapshot_card_statements(
+                    snapshot, entity, p, is_outgoing, limit, offset, after
+                )
+                for p, offset, after, is_outgoing in zip(
+                    properties, offsets, afters, outgoing
+                )
+            ]
+
+        # One sub-select per property, each keeping its own pagination
+        subqueries = [
+            (
+                self.__objects_of_query(
+                    entity, p, limit, offset, card_index=index, after=after
+                )
+                if is_outgoing
+                else self.__subjects_of_query(
+                    entity, p, limit, offset, card_index=index, after=after
+                )
+            )
+            for index, (p, offset, after, is_outgoing) in enumerate(
+                zip(properties, offsets, afters, outgoing)
+            )
+        ]
+        page_query = f"""
+            # DataBundle.get_card_statements_of()
+            SELECT *
+            WHERE {{
+                {" UNION ".join(f"{{ {subquery} }}" for subquery in subqueries)}
+            }}
+        """
+
+        # Counts of all the properties, grouped per property
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
+
+        def values_of(is_outgoing: bool) -> str:
+            return " ".join(
+                f"({index} {prepare(p.uri, self.prefix_index.shorts())})"
+                for index, (p, direction) in enumerate(zip(properties, outgoing))
+                if direction == is_outgoing
+            )
+
+        branches = []
+        if any(outgoing):
+            branches.append(
+                f"""{{
+                    VALUES (?card_index ?property) {{ {values_of(True)} }}
+                    {self.data.sparql_begin}
+                        {entity_uri} ?property ?value .
+                    {self.data.sparql_end}
+                }}"""
+            )
+        if not all(outgoing):
+            branches.append(
+                f"""{{
+                    VALUES (?card_index ?property) {{ {values_of(False)} }}
+                    {self.data.sparql_begin}
+                        ?value ?property {entity_uri} .
+                    {self.data.sparql_end}
+                }}"""
+            )
+        count_query = f"""
+            # DataBundle.get_card_statements_of() - counts
+            SELECT ?card_index (COUNT(*) as ?count)
+            WHERE {{
+                {" UNION ".join(branches)}
+            }}
+            GROUP BY ?card_index
+        """
+
+        # Execute queries
+        page_response, count_response = self.gather(
+            lambda: self.data.run(page_query), lambda: self.data.run(count_query)
+        )
+
+        # Dispatch rows to their property
+        rows_of: List[List[Dict]] = [[] for _ in properties]
+        for row in page_response or []:
+            rows_of[int(row["card_index"])].append(row)
+        counts = [0] * len(properties)
+        for row in count_response or []:
+            counts[int(row["card_index"])] = int(row["count"])
+
+        # Parse responses into Statement instance lists
+        return [
+            (
+                (
+                    self.__objects_of_statements(entity, p, rows)
+                    if is_outgoing
+                    else self.__subjects_of_statements(entity, p, rows)
+                ),
+                count,
+            )
+            for p, rows, count, is_outgoing in zip(
+                properties, rows_of, counts, outgoing
+            )
+        ]
+
+    def __snapshot_card_statements(
+        self,
+        snapshot: TripleSnapshot,
+        entity: Resource,
+        property: Property,
+        is_outgoing: bool,
+        limit: int,
+        offset: int,
+        after: str | None = None,
+    ) -> Tuple[List[Statement], int]:
+        """Page and count of `get_card_statements_of` for one property, read from a snapshot."""
+        entity_term = snapshot.iri(entity.uri)
+        property_term = snapshot.iri(property.uri)
+        if is_outgoing:
+            values = snapshot.objects(entity_term, property_term)
+            is_range_datatype = (
+                property.range.class_uri == "rdfs:Datatype" if property.range else False
+            )
+            class_uri = (
+                property.range.uri
+                if property.range and not is_range_datatype
+                else None
+            )
+        else:
+            values = snapshot.subjects(property_term, entity_term)
+            class_uri = property.domain.uri if property.domain else None
+
+        # Counts are not filtered by class (as get_objects_of_count/get_subjects_of_count)
+        count = len(values)
+        if class_uri:
+            class_term = snapshot.iri(class_uri)
+            type_term = snapshot.iri(self.model.type_property)
+            values = [
+                value
+                for value in values
+                if class_term in snapshot.objects(value, type_term)
+            ]
+
+        # Same order and keyset as the queries: by string value, blank nodes first,
+        # then literals by datatype and language
+        def keyset_key(value: Term) -> Tuple[str, str]:
+            if value.kind == "iri":
+                return self.prefix_index.lengthen(value.value), ""
+            if value.kind == "literal":
+                datatype = self.prefix_index.lengthen(value.datatype or "")
+                return value.value, f"{datatype}@{value.lang or ''}"
+            return "", ""
+
+        values = sorted(values, key=keyset_key)
+        if after is not None:
+            values = [
+                value
+                for value in values
+                if keyset_key(value)[0] > after
+                or (keyset_key(value)[0] == after and value.kind == "literal")
+            ]
+            offset = 0
+        page = values[offset : offset + limit] if limit else values[offset:]
+
+        statements = [
+            (
+                Statement(entity, property, self.__snapshot_resource(snapshot, value))
+                if is_outgoing
+                else Statement(self.__snapshot_resource(snapshot, value), property, entity)
+            )
+            for value in page
+        ]
+        return statements, count
+
     def get_outgoing_statements_of(
-        self, entity: Resource, skip_props: List[Property] = []
+        self,
+        entity: Resource,
+        skip_props: List[Property] = [],
+        snapshot: TripleSnapshot | None = None,
     ) -> List[Statement]:
         """
         Retrieve all outgoing statements of a given entity from the data graph, optionally skipping specified properties.
@@ -549,15 +963,40 @@ class DataBundle:
         Args:
             entity (Resource): The subject entity whose outgoing statements are retrieved.
             skip_props (List[Property], optional): A list of properties to exclude from the results.
+            snapshot (TripleSnapshot, optional): The entity neighborhood (see `load_neighborhood`);
+                if it holds all the entity outgoing triples, no query is sent.
 
         Returns:
             List[Statement]: A list of statements representing the outgoing triples.
         """
+        if snapshot is not None and snapshot.covers(entity.uri, outgoing=True):
+            skipped = {snapshot.iri(p.uri) for p in skip_props}
+            return [
+                Statement(
+                    entity,
+                    self.model_index.find_properties(predicate.value)[0],
+                    Resource(
+                        (
+                            self.__snapshot_literal(obj)
+                            if obj.kind == "literal"
+                            else obj.value
+                        ),
+                        self.__snapshot_text(snapshot, obj, self.model.label_property),
+                        class_uri=self.__snapshot_text(
+                            snapshot, obj, self.model.type_property
+                        ),
+                        resource_type="literal" if obj.kind == "literal" else "iri",
+                    ),
+                )
+                for predicate, obj in snapshot.outgoing(snapshot.iri(entity.uri))
+                if predicate not in skipped
+            ]
+
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
         skip_prop_str = (
             ", ".join(
-                list(set([prepare(p.uri, self.prefixes.shorts()) for p in skip_props]))
+                list(set([prepare(p.uri, self.prefix_index.shorts()) for p in skip_props]))
             )
             if len(skip_props) != 0
             else ""
@@ -585,7 +1024,7 @@ class DataBundle:
         to_return = [
             Statement(
                 entity,
-                self.model.find_properties(r["p"])[0],
+                self.model_index.find_properties(r["p"])[0],
                 Resource(
                     r["o"],
                     r["o_label"],
@@ -604,31 +1043,89 @@ class DataBundle:
         limit: int = 5,
         offset: int = 0,
         skip_props: List[Property] = [],
+        snapshot: TripleSnapshot | None = None,
+        after: Tuple[str, str] | None = None,
     ) -> List[Statement]:
         """
         Retrieve incoming statements for a given entity from the data graph, optionally skipping specified properties.
 
         Executes a SPARQL query to fetch all triples where the entity is the object,
         including subject URI, label, and class. Skipped properties are excluded from the results.
+        Statements are ordered by subject then property URI, so that the next page can be
+        fetched by keyset, after the (subject URI, property URI) of the last statement.
 
         Args:
             entity (Resource): The object entity whose incoming statements are retrieved.
             limit (int, optional): The maximum number of statements to return. Defaults to 5.
             offset (int, optional): The number of statements to skip for pagination. Defaults to 0.
             skip_props (List[Property], optional): A list of properties to exclude from the results.
+            snapshot (TripleSnapshot, optional): The entity neighborhood (see `load_neighborhood`);
+                if it holds all the entity incoming triples, no query is sent.
+            after (Tuple[str, str], optional): The subject and property URIs of the last statement
+                of the previous page. If given, `offset` is ignored. Defaults to None.
 
         Returns:
             List[Statement]: A list of statements representing the incoming triples.
         """
+        after_key = (
+            tuple(self.prefix_index.lengthen(uri) for uri in after)
+            if after is not None
+            else None
+        )
+
+        if snapshot is not None and snapshot.covers(entity.uri, incoming=True):
+            skipped = {snapshot.iri(p.uri) for p in skip_props}
+
+            # Same order and keyset as the query (blank nodes first)
+            def keyset_value(subject: Term, predicate: Term) -> Tuple[str, str]:
+                return (
+                    self.prefix_index.lengthen(subject.value)
+                    if subject.kind == "iri"
+                    else "",
+                    self.prefix_index.lengthen(predicate.value),
+                )
+
+            pairs = sorted(
+                (
+                    (subject, predicate)
+                    for subject, predicate in snapshot.incoming(
+                        snapshot.iri(entity.uri)
+                    )
+                    if predicate not in skipped
+                ),
+                key=lambda pair: keyset_value(*pair),
+            )
+            if after_key is not None:
+                pairs = [pair for pair in pairs if keyset_value(*pair) > after_key]
+                offset = 0
+            return [
+                Statement(
+                    Resource(
+                        subject.value,
+                        self.__snapshot_text(snapshot, subject, self.model.label_property),
+                        class_uri=self.__snapshot_text(
+                            snapshot, subject, self.model.type_property
+                        ),
+                    ),
+                    self.model_index.find_properties(predicate.value)[0],
+                    entity,
+                )
+                for subject, predicate in pairs[offset : offset + limit]
+            ]
+
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
         skip_prop_str = (
             ", ".join(
-                list(set([prepare(p.uri, self.prefixes.shorts()) for p in skip_props]))
+                list(set([prepare(p.uri, self.prefix_index.shorts()) for p in skip_props]))
             )
             if len(skip_props) != 0
             else ""
         )
+        seek = ""
+        if after_key is not None:
+            after_s, after_p = (self.__as_sparql_literal(uri) for uri in after_key)
+            seek = f"FILTER(STR(?s) > {after_s} || (STR(?s) = {after_s} && STR(?p) > {after_p}))"
         query = f"""
             # DataBundle.get_all_outgoing_statements()
             SELECT DISTINCT
@@ -641,10 +1138,12 @@ class DataBundle:
                     OPTIONAL {{ ?s {self.model.type_property} ?s_class_uri_ . }}
                     OPTIONAL {{ ?s {self.model.label_property} ?s_label_ . }}
                     {f"FILTER(?p NOT IN ({skip_prop_str}))" if len(skip_props) else ""}
+                    {seek}
                 {self.data.sparql_end}
             }}
+            ORDER BY ASC(STR(?s)) ASC(STR(?p))
             LIMIT {limit}
-            OFFSET {offset}
+            {f"OFFSET {offset}" if offset and after is None else ""}
         """
 
         # Execute query
@@ -654,7 +1153,7 @@ class DataBundle:
         to_return = [
             Statement(
                 Resource(r["s"], r["s_label"], class_uri=r["s_class_uri"]),
-                self.model.find_properties(r["p"])[0],
+                self.model_index.find_properties(r["p"])[0],
                 entity,
             )
             for r in response
@@ -662,7 +1161,9 @@ class DataBundle:
 
         return to_return
 
-    def get_incoming_statements_of_count(self, entity: Resource) -> List[Statement]:
+    def get_incoming_statements_of_count(
+        self, entity: Resource, snapshot: TripleSnapshot | None = None
+    ) -> List[Statement]:
         """
         Count the number of incoming statements for a given entity, excluding type, label, and comment properties.
 
@@ -671,12 +1172,26 @@ class DataBundle:
 
         Args:
             entity (Resource): The object entity whose incoming statements are counted.
+            snapshot (TripleSnapshot, optional): The entity neighborhood (see `load_neighborhood`);
+                if it holds all the entity incoming triples, no query is sent.
 
         Returns:
             int: The number of incoming statements for the entity.
         """
+        if snapshot is not None and snapshot.covers(entity.uri, incoming=True):
+            skipped = {
+                snapshot.iri(self.model.type_property),
+                snapshot.iri(self.model.label_property),
+                snapshot.iri(self.model.comment_property),
+            }
+            return sum(
+                1
+                for _, predicate in snapshot.incoming(snapshot.iri(entity.uri))
+                if predicate not in skipped
+            )
+
         # Prepare the query
-        entity_uri = prepare(entity.uri, self.prefixes.shorts())
+        entity_uri = prepare(entity.uri, self.prefix_index.shorts())
         query = f"""
             # DataBundle.get_all_outgoing_statements()
             SELECT (COUNT(*) as ?count)
@@ -705,7 +1220,8 @@ class DataBundle:
 
         Determines the SPARQL pattern needed to sort by the given property, handling
         outgoing vs. incoming properties and whether the property is a literal or requires
-        fetching a label. Also generates the ORDER BY clause based on the sorting direction.
+        fetching a label. Also generates the expression of the sort key: numeric values
+        are compared as numbers, all others by their string value.
 
         Args:
             sort_col (str): The column label to sort by, or None for no sorting.
@@ -714,7 +1230,7 @@ class DataBundle:
             class_uri (str): The URI of the class for which the data table is built.
 
         Returns:
-            Tuple[str, str]: A tuple containing the SPARQL pattern for sorting and the ORDER BY clause.
+            Tuple[str, str]: A tuple containing the SPARQL pattern for sorting and the sort key expression.
         """
         # Prepare sorting
         if sort_col is not None:
@@ -723,31 +1239,110 @@ class DataBundle:
             sort_prop = next(
                 prop for prop in needed_properties if prop.label == clean_sort_col
             )
+            sort_prop_range = (
+                sort_prop.range if sort_prop.range.class_uri == "rdfs:Datatype" else None
+            )
             if sort_prop.domain.uri == class_uri:  # ie: is outgoing
                 if (
                     sort_prop.range.class_uri == "rdfs:Datatype"
                 ):  # ie: no need to get the label
-                    sort_prop = f"?uri_ {prepare(sort_prop.uri, self.prefixes.shorts())} ?sort_on ."
+                    sort_prop = f"?uri_ {prepare(sort_prop.uri, self.prefix_index.shorts())} ?sort_on ."
                 else:  # ie: need extra path to the label
-                    sort_prop = f"?uri_ {prepare(sort_prop.uri, self.prefixes.shorts())} ?sort_entity . ?sort_entity {self.model.label_property} ?sort_on ."
+                    sort_prop = f"?uri_ {prepare(sort_prop.uri, self.prefix_index.shorts())} ?sort_entity . ?sort_entity {self.model.label_property} ?sort_on ."
             else:  # ie: is incoming
                 if (
                     sort_prop.range.class_uri == "rdfs:Datatype"
                 ):  # ie: no need to get the label
-                    sort_prop = f"?sort_on {prepare(sort_prop.uri, self.prefixes.shorts())} ?uri_ ."
+                    sort_prop = f"?sort_on {prepare(sort_prop.uri, self.prefix_index.shorts())} ?uri_ ."
                 else:  # ie: need extra path to the label
-                    sort_prop = f"?sort_entity {prepare(sort_prop.uri, self.prefixes.shorts())} ?uri_ . ?sort_entity {self.model.label_property} ?sort_on ."
+                    sort_prop = f"?sort_entity {prepare(sort_prop.uri, self.prefix_index.shorts())} ?uri_ . ?sort_entity {self.model.label_property} ?sort_on ."
 
-            # Create the SPARQL appendix for the sorting
-            if sort_way == "ASC":
-                order_by = "ORDER BY ASC(?sort_on)"
+            # Create the sort key expression
+            if self.__is_numeric_range(sort_prop_range):
+                sort_key = "?sort_on"
             else:
-                order_by = "ORDER BY DESC(?sort_on)"
+                sort_key = "STR(?sort_on)"
         else:  # ie: no sorting
             sort_prop = ""
-            order_by = ""
+            sort_key = ""
+
+        return sort_prop, sort_key
 
-        return sort_prop, order_by
+    def __is_numeric_range(self, range: Resource | None) -> bool:
+        """Tell whether a property range is a numeric datatype."""
+        if range is None or not range.uri:
+            return False
+        return self.prefix_index.lengthen(range.uri) in NUMERIC_DATATYPES
+
+    @staticmethod
+    def __as_sparql_literal(value: Any, numeric: bool = False) -> str:
+        """Write a keyset cursor value as a SPARQL literal (as a number if `numeric`)."""
+        if numeric and isinstance(value, Integral):
+            return str(int(value))
+        if numeric:
+            try:
+                return repr(float(value))
+            except (TypeError, ValueError):
+                pass  # Ill-typed number: kept as its lexical form
+        text = (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+        return f'"{text}"'
+
+    @staticmethod
+    def __keyset_order(variable: str) -> str:
+        """
+        ORDER BY clause of pages of objects/subjects: by string value, then by datatype
+        and language (literals may share their string value; IRIs come first).
+        """
+        return (
+            f"ORDER BY ASC(STR({variable})) "
+            f'ASC(IF(isLiteral({variable}), CONCAT(STR(DATATYPE({variable})), "@", LANG({variable})), ""))'
+        )
+
+    def __keyset_seek(self, variable: str, after: str) -> str:
+        """FILTER of the page after a keyset cursor (an IRI, see `get_keyset_cursor`)."""
+        after = self.__as_sparql_literal(after)
+        # Literals with the string value of the cursor IRI are sorted after it
+        return f"FILTER(STR({variable}) > {after} || (STR({variable}) = {after} && isLiteral({variable})))"
+
+    def __keyset_value(self, resource: Resource) -> str:
+        """The string value (as SPARQL STR() gives it) pages of statements are ordered by."""
+        if resource.resource_type == "literal":
+            return str(resource.uri)
+        if resource.resource_type == "blank" or str(resource.uri).startswith("_:"):
+            return ""  # STR() of a blank node is an error: they are sorted first
+        return self.prefix_index.lengthen(resource.uri)
+
+    def get_keyset_cursor(self, resources: List[Resource]) -> str | None:
+        """
+        Get the keyset cursor of a page of objects or subjects, to fetch the next page.
+
+        Pages of `get_objects_of`, `get_subjects_of` and `get_card_statements_of` are
+        ordered by the string value of the objects/subjects: the cursor is the greatest
+        of the page. There is no cursor (the next page is to be fetched by offset) when
+        the page ends on a literal, as other literals may share its string value with
+        another language or datatype, nor when it is made of blank nodes only, as they
+        have no string value.
+
+        Args:
+            resources (List[Resource]): The objects (or subjects) of the page.
+
+        Returns:
+            str | None: The cursor to give as `after`, or None if there is none.
+        """
+        values = [
+            (self.__keyset_value(resource), resource.resource_type == "literal")
+            for resource in resources
+        ]
+        cursor = max((value for value, _ in values), default="")
+        if not cursor or (cursor, True) in values:
+            return None
+        return cursor
 
     def __data_table_prepare_filtering(
         self,
@@ -783,16 +1378,16 @@ class DataBundle:
                 if (
                     filter_prop.range.class_uri == "rdfs:Datatype"
                 ):  # ie: no need to get the label
-                    filter_prop_str1 = f"?uri_ {prepare(filter_prop.uri, self.prefixes.shorts())} ?filter_on ."
+                    filter_prop_str1 = f"?uri_ {prepare(filter_prop.uri, self.prefix_index.shorts())} ?filter_on ."
                 else:  # ie: need extra path to the label
-                    filter_prop_str1 = f"?uri_ {prepare(filter_prop.uri, self.prefixes.shorts())} ?filter_entity . ?filter_entity {self.model.label_property} ?filter_on ."
+                    filter_prop_str1 = f"?uri_ {prepare(filter_prop.uri, self.prefix_index.shorts())} ?filter_entity . ?filter_entity {self.model.label_property} ?filter_on ."
             else:  # ie: is incoming
                 if (
                     filter_prop.range.class_uri == "rdfs:Datatype"
                 ):  # ie: no need to get the label
-                    filter_prop_str1 = f"?filter_on {prepare(filter_prop.uri, self.prefixes.shorts())} ?uri_ ."
+                    filter_prop_str1 = f"?filter_on {prepare(filter_prop.uri, self.prefix_index.shorts())} ?uri_ ."
                 else:  # ie: need extra path to the label
-                    filter_prop_str1 = f"?filter_entity {prepare(filter_prop.uri, self.prefixes.shorts())} ?uri_ . ?filter_entity {self.model.label_property} ?filter_on ."
+                    filter_prop_str1 = f"?filter_entity {prepare(filter_prop.uri, self.prefix_index.shorts())} ?uri_ . ?filter_entity {self.model.label_property} ?filter_on ."
 
             # Create the SPARQL appendix for the sorting
             filter_prop_str2 = f'FILTER(CONTAINS(LCASE(STR(?filter_on)), LCASE("{normalize_text(filter_value)}")))'
@@ -847,7 +1442,7 @@ class DataBundle:
             str: The SPARQL WHERE clause fragment for the property.
         """
         # Get the property URI
-        property_uri = prepare(property.uri, self.prefixes.shorts())
+        property_uri = prepare(property.uri, self.prefix_index.shorts())
         # Use safe internal variable names (independent from RDF labels/content)
         property_label = self.__data_table_get_internal_var_name(index)
         if property.domain and class_uri == property.domain.uri:  # i.e. is outgoing
@@ -936,12 +1531,7 @@ class DataBundle:
         Returns:
             List[str]: A list of column names for the data table.
         """
-        needed_properties = [
-            prop
-            for prop in self.model.properties
-            if prop.card_of and prop.card_of.uri == cls.uri
-        ]
-        needed_properties.sort(key=lambda x: x.order or 10**18)
+        needed_properties = self.model_index.card_properties_of(cls.uri)
         return [
             self.__data_table_get_display_name(prop, cls.uri)
             for prop in needed_properties
@@ -956,14 +1546,20 @@ class DataBundle:
         sort_way: str = None,
         filter_col: str = None,
         filter_value: str = None,
+        after: Tuple[Any, str] | None = None,
     ) -> pd.DataFrame:
         """
         Generate a data table for a given class, optionally supporting pagination, sorting, and filtering.
 
         Builds and executes a SPARQL query to fetch all instances of the class, along with
         their card properties. Supports filtering by a specific column and value, sorting
-        by a column, and paginating results with limit and offset. Also computes counts
-        of incoming and outgoing triples for each instance and returns a formatted DataFrame.
+        by a column, and paginating results. Also computes counts of incoming and
+        outgoing triples for each instance and returns a formatted DataFrame.
+
+        Instances are ordered by the sort key, then by URI, so that pages can be fetched
+        by keyset: given the key of the last row of the previous page (`after`), the
+        endpoint seeks to it instead of skipping `offset` rows, which costs the same at
+        any depth. The key of the last row is returned in the DataFrame `attrs["last_key"]`.
 
         Args:
             cls (Resource): The class whose data table is generated.
@@ -973,25 +1569,25 @@ class DataBundle:
             sort_way (str, optional): Sorting direction, 'ASC' or 'DESC'. Defaults to None.
             filter_col (str, optional): Column label to filter by. Defaults to None.
             filter_value (str, optional): Value to filter the column by. Defaults to None.
+            after (Tuple[Any, str], optional): The (sort key, URI) of the last row of the previous
+                page, with the same sorting and filtering. If given, `offset` is ignored. Defaults to None.
 
         Returns:
             pd.DataFrame: A DataFrame containing the instances, their properties, and counts of incoming and outgoing triples.
         """
+        import pandas as pd
+
         # List all wanted properties for this class (according to ontology)
-        needed_properties = [
-            prop
-            for prop in self.model.properties
-            if prop.card_of and prop.card_of.uri == cls.uri
-        ]
-        needed_properties.sort(key=lambda x: x.order or 10**18)
+        needed_properties = self.model_index.card_properties_of(cls.uri)
 
         class_uri = cls.uri
-        class_uri_prepared = prepare(class_uri, self.prefixes.shorts())
+        class_uri_prepared = prepare(class_uri, self.prefix_index.shorts())
 
         # Prepare Sorting
-        sort_prop_str1, order_by = self.__data_table_prepare_sorting(
+        sort_prop_str1, sort_key = self.__data_table_prepare_sorting(
             sort_col, sort_way, needed_properties, class_uri
         )
+        numeric_sort = sort_key == "?sort_on"
 
         # Prepare filtering
         filter_prop_str1, filter_prop_str2 = self.__data_table_prepare_filtering(
@@ -1013,26 +1609,63 @@ class DataBundle:
             ]
         )
 
-        # Add the pagination
+        # Order by sort key then URI, and seek past the previous page key if known
+        way = "DESC" if sort_key and sort_way == "DESC" else "ASC"
+        seek = ""
+        if after is not None:
+            after_key, after_uri = after
+            after_uri = self.__as_sparql_literal(self.prefix_index.lengthen(after_uri))
+            comparison = "<" if way == "DESC" else ">"
+            if sort_key:
+                after_key = self.__as_sparql_literal(after_key, numeric_sort)
+                seek = f"FILTER(?sort_key {comparison} {after_key} || (?sort_key = {after_key} && STR(?uri_) {comparison} {after_uri}))"
+            else:
+                seek = f"FILTER(STR(?uri_) {comparison} {after_uri})"
+        order_by = f"ORDER BY {way}(?sort_key) {way}(STR(?uri_))" if sort_key else "ORDER BY ASC(STR(?uri_))"
+
+        # Add the pagination (offset only as a fallback, to jump to an arbitrary page)
         limit = f"LIMIT {limit}" if limit else ""
-        offset = f"OFFSET {offset}" if offset else ""
+        offset = f"OFFSET {offset}" if offset and after is None else ""
+
+        # Instances of the page (an instance with several sort values is sorted by the lowest)
+        instances_pattern = f"""
+            ?uri_ {self.model.type_property} {class_uri_prepared} .
+            {filter_prop_str1}
+            {sort_prop_str1}
+            {filter_prop_str2}
+        """
+        if sort_key:
+            page_select = f"""
+                SELECT ?uri_ ?sort_key
+                WHERE {{
+                    {{
+                        SELECT ?uri_ (MIN({sort_key}) as ?sort_key)
+                        WHERE {{ {instances_pattern} }}
+                        GROUP BY ?uri_
+                    }}
+                    {seek}
+                }}
+            """
+        else:
+            page_select = f"""
+                SELECT ?uri_
+                WHERE {{
+                    {instances_pattern}
+                    {seek}
+                }}
+            """
 
         # Build the query
         query = f"""
             # DataBundle.get_data_table()
             SELECT
                 (COALESCE(?uri_, '') as ?uri)
+                {"(SAMPLE(?sort_key) as ?sort_key)" if sort_key else ""}
                 {select_properties}
             WHERE {{
                 {self.data.sparql_begin}
                     {{
-                        SELECT ?uri_ 
-                        WHERE {{ 
-                            ?uri_ {self.model.type_property} {class_uri_prepared} . 
-                            {filter_prop_str1}
-                            {sort_prop_str1}
-                            {filter_prop_str2}
-                        }}
+                        {page_select}
                         {order_by}
                         {offset}
                         {limit}
@@ -1044,16 +1677,34 @@ class DataBundle:
         """
 
         # Execute the query (fetch instances with labels etc)
-        instances = self.data.sparql.run(query, self.prefixes)
+        instances = self.data.sparql.run(query, self.prefixes, as_dataframe=True)
 
         # If there is no row at all, avoid count queries with empty VALUES
-        if not instances:
+        if instances.empty:
             return pd.DataFrame()
 
+        # Grouping does not keep the sub-select order: sort the page rows again
+        def row_key(row: pd.Series) -> Tuple[Any, str]:
+            key = row["sort_key"] if sort_key else ""
+            if sort_key and numeric_sort:
+                try:
+                    key = (0, float(key), "")
+                except (TypeError, ValueError):
+                    # Ill-typed numbers (e.g. "n/a"^^xsd:integer): by lexical form, after the others
+                    key = (1, 0.0, str(key))
+            elif sort_key:
+                key = str(key)
+            return key, self.prefix_index.lengthen(row["uri"])
+
+        keys = [row_key(row) for _, row in instances.iterrows()]
+        order = sorted(range(len(keys)), key=keys.__getitem__, reverse=way == "DESC")
+        instances = instances.iloc[order].reset_index(drop=True)
+        last_row = instances.iloc[-1]
+        last_key = (last_row["sort_key"] if sort_key else None, last_row["uri"])
+
         # For each class instance, count outgoings/incomings triples number
         uris = []
-        for record in instances:
-            raw_uri = record.get("uri")
+        for raw_uri in instances["uri"]:
             prepared_uri = self.__as_sparql_uri_term(raw_uri)
             if prepared_uri:
                 uris.append(prepared_uri)
@@ -1075,8 +1726,8 @@ class DataBundle:
                     }} GROUP BY ?uri
                 """,
                     self.prefixes,
+                    as_dataframe=True,
                 )
-                outgoings = pd.DataFrame(outgoings)
             except HTTPError as err:
                 print(
                     f"[DATA TABLE WARNING] Outgoing count query failed ({err.response.status_code}): {err.response.reason}"
@@ -1096,8 +1747,8 @@ class DataBundle:
                     }} GROUP BY ?uri
                 """,
                     self.prefixes,
+                    as_dataframe=True,
                 )
-                incomings = pd.DataFrame(incomings)
             except HTTPError as err:
                 print(
                     f"[DATA TABLE WARNING] Incoming count query failed ({err.response.status_code}): {err.response.reason}"
@@ -1108,7 +1759,7 @@ class DataBundle:
             incomings = pd.DataFrame()
 
         # Final DataFrame
-        df = pd.DataFrame(data=instances)
+        df = instances
 
         # Append the outgoings counts
         if len(outgoings):
@@ -1138,6 +1789,7 @@ class DataBundle:
             )
             df = df[ordered_columns]
             df.columns = ["URI"] + display_names + ["Outgoing count", "Incoming count"]
+        df.attrs["last_key"] = last_key
 
         return df
 
@@ -1163,10 +1815,7 @@ class DataBundle:
         filter_ = ""
         if filter_col_name and filter_content:
             # List all wanted properties for this class (according to ontology)
-            needed_properties = [
-                prop for prop in self.model.properties if prop.card_of.uri == cls.uri
-            ]
-            needed_properties.sort(key=lambda x: x.order)
+            needed_properties = self.model_index.card_properties_of(cls.uri)
 
             # Find the property to filter on
             target_property = next(
@@ -1176,12 +1825,12 @@ class DataBundle:
             )
 
             if "(inc)" in filter_col_name:  # i.e. property is incoming
-                filter_ = f'?value {prepare(target_property.uri, self.prefixes.shorts())} ?uri . ?value {self.model.label_property} ?label . FILTER(CONTAINS(LCASE(STR(?label)), LCASE("{filter_content}")))'
+                filter_ = f'?value {prepare(target_property.uri, self.prefix_index.shorts())} ?uri . ?value {self.model.label_property} ?label . FILTER(CONTAINS(LCASE(STR(?label)), LCASE("{filter_content}")))'
             else:  # i.e. property is outgoing
-                filter_ = f'?uri {prepare(target_property.uri, self.prefixes.shorts())} ?value . ?value {self.model.label_property} ?label . FILTER(CONTAINS(LCASE(STR(?label)), LCASE("{filter_content}")))'
+                filter_ = f'?uri {prepare(target_property.uri, self.prefix_index.shorts())} ?value . ?value {self.model.label_property} ?label . FILTER(CONTAINS(LCASE(STR(?label)), LCASE("{filter_content}")))'
 
         # Make sure the class URI is correctly formated
-        class_uri = prepare(cls.uri, self.prefixes.shorts())
+        class_uri = prepare(cls.uri, self.prefix_index.shorts())
 
         # Build the query
         query = f"""
@@ -1200,7 +1849,9 @@ class DataBundle:
 
         return int(counts[0]["count"])
 
-    def get_entity_basics(self, uri: str) -> Resource:
+    def get_entity_basics(
+        self, uri: str, snapshot: TripleSnapshot | None = None
+    ) -> Resource:
         """
         Retrieve basic information about an entity, including its label, comment, and class.
 
@@ -1209,12 +1860,23 @@ class DataBundle:
 
         Args:
             uri (str): The URI of the entity to retrieve.
+            snapshot (TripleSnapshot, optional): The entity neighborhood (see `load_neighborhood`);
+                if given and rooted at the entity, no query is sent.
 
         Returns:
             Resource: An object containing the entity's URI, label, comment, and class URI.
         """
+        if snapshot is not None and snapshot.covers(uri):
+            subject = snapshot.iri(uri)
+            return Resource(
+                uri,
+                self.__snapshot_text(snapshot, subject, self.model.label_property),
+                self.__snapshot_text(snapshot, subject, self.model.comment_property),
+                self.__snapshot_text(snapshot, subject, self.model.type_property),
+            )
+
         # Make sure the URI is correctly formated
-        entity_uri = prepare(uri, self.prefixes.shorts())
+        entity_uri = prepare(uri, self.prefix_index.shorts())
 
         # Build the query text
         query = f"""
@@ -1240,6 +1902,138 @@ class DataBundle:
 
         return resource
 
+    def load_neighborhood(
+        self, uri: str, depth: int = 1, caps: Dict[str, int] | None = None
+    ) -> TripleSnapshot:
+        """
+        Fetch the triples around an entity with a single bounded CONSTRUCT query.
+
+        The result holds the entity outgoing and incoming triples, the type, label
+        and comment of the entity and of its neighbors, and, for a `depth` above 1,
+        the triples of the nodes up to `depth - 1` steps away. Pass the snapshot to
+        `get_entity_basics`, `get_card_statements_of`, `get_outgoing_statements_of`
+        and `get_incoming_statements_of(_count)` to read from it instead of querying.
+
+        Args:
+            uri (str): The URI of the entity.
+            depth (int, optional): Number of steps to fetch triples for. Defaults to 1.
+            caps (Dict[str, int], optional): Maximum triples per direction ("outgoing",
+                "incoming") and hop, and nodes per hop ("nodes"). Defaults to `NEIGHBORHOOD_CAPS`.
+
+        Returns:
+            TripleSnapshot: The indexed triples. Directions where the entity has more
+            triples than the cap are marked incomplete (and read from the endpoint).
+
+        Raises:
+            ValueError: If the endpoint does not answer with triples.
+        """
+        caps = {**NEIGHBORHOOD_CAPS, **(caps or {})}
+        entity_uri = prepare(uri, self.prefix_index.shorts())
+
+        def edges(frontier: str) -> List[Tuple[str, str]]:
+            # Capped outgoing and incoming triples of the nodes bound to ?n,
+            # along with the variable holding the node at the other end
+            return [
+                (
+                    f"""{{ SELECT ?s ?p ?o WHERE {{
+                        {frontier}
+                        {self.data.sparql_begin} ?n ?p ?o . {self.data.sparql_end}
+                        BIND(?n AS ?s)
+                    }} LIMIT {caps["outgoing"]} }}""",
+                    "o",
+                ),
+                (
+                    f"""{{ SELECT ?s ?p ?o WHERE {{
+                        {frontier}
+                        {self.data.sparql_begin} ?s ?p ?n . {self.data.sparql_end}
+                        BIND(?n AS ?o)
+                    }} LIMIT {caps["incoming"]} }}""",
+                    "s",
+                ),
+            ]
+
+        blocks = edges(f"VALUES ?n {{ {entity_uri} }}")
+        if depth > 1:
+            path = "/".join([f"({ANY_STEP_PATH})?"] * (depth - 1))
+            blocks += edges(
+                f"""{{ SELECT DISTINCT ?n WHERE {{
+                    {self.data.sparql_begin} {entity_uri} {path} ?n . {self.data.sparql_end}
+                    FILTER(isIRI(?n))
+                }} LIMIT {caps["nodes"]} }}"""
+            )
+
+        # Type, label and comment of the entity and of every node the triples above reach
+        ends = " UNION ".join(
+            [f"{{ VALUES ?n {{ {entity_uri} }} }}"]
+            + [
+                f"{{ SELECT (?{end} AS ?n) WHERE {{ {block} }} }}"
+                for block, end in blocks
+            ]
+        )
+        basics = f"""{{
+            {{ SELECT DISTINCT ?n WHERE {{ {ends} }} }}
+            {self.data.sparql_begin}
+                ?n ?p ?o .
+                FILTER(?p IN ({self.model.type_property}, {self.model.label_property}, {self.model.comment_property}))
+            {self.data.sparql_end}
+            BIND(?n AS ?s)
+        }}"""
+
+        query = f"""
+            # DataBundle.load_neighborhood()
+            CONSTRUCT {{ ?s ?p ?o . }}
+            WHERE {{
+                {" UNION ".join([block for block, _ in blocks] + [basics])}
+            }}
+        """
+
+        # Execute query
+        triples = self.data.sparql.run(query, self.prefixes, result_format="ntriples")
+        if not isinstance(triples, list):
+            # Not N-Triples (e.g. an HTML error page): an empty snapshot would
+            # pass for a complete one
+            raise ValueError(
+                f"The endpoint did not answer the neighborhood of {uri} with triples"
+            )
+
+        return TripleSnapshot.from_triples(
+            uri,
+            triples,
+            self.prefix_index.shorten,
+            self.prefix_index.lengthen,
+            caps,
+        )
+
+    def __snapshot_text(
+        self, snapshot: TripleSnapshot, subject: Term, predicate: str
+    ) -> str:
+        """First value of a subject for a predicate in a snapshot, '' if none."""
+        term = snapshot.value(subject, snapshot.iri(predicate))
+        return term.value if term else ""
+
+    def __snapshot_literal(self, term: Term):
+        """Literal value of a snapshot term, as query results give it."""
+        if term.datatype == self.prefix_index.shorten(XSD_INTEGER):
+            try:
+                return int(term.value)
+            except ValueError:
+                return term.value
+        return term.value
+
+    def __snapshot_resource(self, snapshot: TripleSnapshot, term: Term) -> Resource:
+        """Resource of a snapshot term, as `get_objects_of`/`get_subjects_of` build it."""
+        if term.kind == "literal":
+            return Resource(
+                self.__snapshot_literal(term), "", "", term.datatype, "literal"
+            )
+        return Resource(
+            term.value,
+            self.__snapshot_text(snapshot, term, self.model.label_property),
+            self.__snapshot_text(snapshot, term, self.model.comment_property),
+            self.__snapshot_text(snapshot, term, self.model.type_property),
+            term.kind,
+        )
+
     def dump_nq(self) -> str:
         """
         Export the entire data bundle in N-Quads (NQ) format as a single string.
@@ -1299,6 +2093,8 @@ class DataBundle:
             Dict[str, pd.DataFrame]: A dictionary mapping class and model identifiers to
                                     their corresponding CSV DataFrames.
         """
+        import pandas as pd
+
         # The CSV format dump is different than the two others:
         # Two others extract raw triples, usefull to make saving or to publish, or to import in another SPARQL endpoint
         # But the CSV dump is more for humans:
@@ -1352,10 +2148,7 @@ class DataBundle:
                         outgoing property values.
         """
         # Get the ontology properties of this class (only outgoing)
-        properties_outgoing = [
-            prop for prop in self.model.properties if prop.card_of.uri == cls.uri
-        ]
-        properties_outgoing.sort(key=lambda x: x.order or 10**18)
+        properties_outgoing = self.model_index.card_properties_of(cls.uri)
 
         #  Compute the property name for the query
         def get_property_name(prop: Property) -> str:
@@ -1382,7 +2175,7 @@ class DataBundle:
         triples_outgoings = list(
             set(
                 [
-                    f"OPTIONAL {{ ?instance {prepare(prop.uri, self.prefixes.shorts())} ?{get_property_name(prop)}_ . }}"
+                    f"OPTIONAL {{ ?instance {prepare(prop.uri, self.prefix_index.shorts())} ?{get_property_name(prop)}_ . }}"
                     for prop in properties_outgoing
                 ]
             )
@@ -1390,7 +2183,7 @@ class DataBundle:
         triples_outgoings_str = "\n                    ".join(triples_outgoings)
 
         # Make sure the class URI is correctly formated
-        class_uri = prepare(cls.uri, self.prefixes.shorts())
+        class_uri = prepare(cls.uri, self.prefix_index.shorts())
 
         # Build the query
         query = f"""
@@ -1407,10 +2200,9 @@ class DataBundle:
             }}
         """
 
-        # Execute the query
-        instances = self.data.sparql.run(query, self.prefixes)
-
-        return pd.DataFrame(data=instances)
+        # Execute the query, fetching TSV results (much smaller than JSON) that
+        # are decoded column by column while they are downloaded
+        return self.data.sparql.run(query, self.prefixes, result_format="tsv")
 
     def get_model_as_turtle(self) -> str:
         query = f"""
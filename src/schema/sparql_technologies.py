@@ -1,18 +1,57 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from enum import Enum
 import os
 import re
+import sys
+import time
+import uuid
+from itertools import islice
+from typing import BinaryIO, Dict
+from urllib.parse import urlsplit
 
 import requests
-from graphly.schema import Sparql
+from graphly.schema import Graph, Sparql
 import graphly.schema.sparql as graphly_sparql
 from graphly.schema.prefixes import Prefixes
 from graphly.sparql import Fuseki, Allegrograph, GraphDB, RDF4J
-from requests.exceptions import HTTPError
+from requests.exceptions import HTTPError, Timeout
 from requests.auth import HTTPBasicAuth
 
-from lib.sparql_results import parse_sparql_json_response
+from lib.http_pool import get_session, pooled_requests
+from lib.ntriples import iter_ntriples
+from lib.nquads_upload import (
+    Chunk,
+    ChunkSizeController,
+    LineStream,
+    NQuadsReader,
+    UploadProgress,
+    _get_decision_log_path,
+    as_binary_file,
+)
+from lib.turtle import TurtleSyntaxError, get_skolem_base, iter_nquads_lines, iter_turtle
+from lib.upload_journal import UploadJournal, get_file_fingerprint
+from lib.query_cache import (
+    get_endpoint_identity,
+    get_query_cache,
+    is_select_query,
+    is_update_query,
+    normalize_graph_uri,
+    referenced_graphs,
+)
+from lib.sparql_results import (
+    batch_rows,
+    iter_sparql_json_rows,
+    parse_sparql_json_response,
+    read_sparql_json_dataframe,
+    read_sparql_tsv_dataframe,
+)
 
 
+# Servers that cannot serve TSV (e.g. for CONSTRUCT queries) may still answer in JSON
+TSV_ACCEPT = "text/tab-separated-values, application/sparql-results+json;q=0.9"
+# Older servers serve N-Triples as text/plain
+NTRIPLES_ACCEPT = "application/n-triples, text/plain;q=0.9"
+
 PREFIX_DECLARATION_RE = re.compile(
     r"(?im)^\s*PREFIX\s+([A-Za-z][\w.-]*)\s*:\s*<[^>]+>\s*$"
 )
@@ -22,6 +61,57 @@ def _extract_declared_prefix_shorts(query_text: str) -> set[str]:
     return {match.group(1) for match in PREFIX_DECLARATION_RE.finditer(query_text)}
 
 
+def _get_prefix_map(prefixes: Prefixes | None) -> dict[str, str]:
+    return {
+        prefix.short: prefix.long
+        for prefix in prefixes or []
+        if getattr(prefix, "short", None) and getattr(prefix, "long", None)
+    }
+
+
+def invalidate_graph_results(
+    sparql: Sparql, graph_uri: str | None = None, prefixes: Prefixes | None = None
+) -> None:
+    """
+    Drop the cached query results a write to a graph may have made stale.
+
+    Args:
+        sparql (Sparql): The endpoint that was written to.
+        graph_uri (str | None): The written named graph, None if unknown.
+        prefixes (Prefixes | None): Prefixes used to expand a shortened graph URI.
+    """
+    graphs = None
+    if graph_uri:
+        graphs = [normalize_graph_uri(graph_uri, _get_prefix_map(prefixes))]
+    get_query_cache().invalidate(
+        get_endpoint_identity(
+            getattr(sparql, "url", None), getattr(sparql, "username", None)
+        ),
+        graphs,
+    )
+
+
+def _prepare_query_text(sparql: Sparql, text: str, prefixes: Prefixes) -> str:
+    if os.getenv("GRAPHLY_MODE") == "debug":
+        graphly_sparql.log_query(sparql.url, text, prefixes)
+
+    text = "\n".join([line.strip() for line in text.split("\n") if line.strip()])
+
+    declared_prefixes = _extract_declared_prefix_shorts(text)
+    merged_prefix_lines = []
+    added_shorts = set()
+    for prefix in prefixes:
+        short = getattr(prefix, "short", None)
+        if not short or short in added_shorts or short in declared_prefixes:
+            continue
+        merged_prefix_lines.append(prefix.to_sparql())
+        added_shorts.add(short)
+
+    if merged_prefix_lines:
+        text = "\n".join(merged_prefix_lines) + "\n" + text
+    return text
+
+
 def _patch_graphly_parser() -> None:
     graphly_sparql.parse_sparql_json_response = parse_sparql_json_response
 
@@ -35,6 +125,15 @@ def _get_sparql_timeout_seconds() -> float:
     return parsed if parsed > 0 else 12.0
 
 
+def _get_stream_chunk_bytes() -> int:
+    raw_value = os.getenv("LOGRE_SPARQL_STREAM_CHUNK_BYTES", "65536")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 65536
+    return parsed if parsed > 0 else 65536
+
+
 def _get_nquads_chunk_lines() -> int:
     raw_value = os.getenv("LOGRE_NQUADS_CHUNK_LINES", "10000")
     try:
@@ -44,6 +143,24 @@ def _get_nquads_chunk_lines() -> int:
     return parsed if parsed > 0 else 10000
 
 
+def _get_nquads_chunk_bytes() -> int:
+    raw_value = os.getenv("LOGRE_NQUADS_CHUNK_BYTES", "8388608")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 8388608
+    return parsed if parsed > 0 else 8388608
+
+
+def _get_nquads_upload_workers() -> int:
+    raw_value = os.getenv("LOGRE_NQUADS_UPLOAD_WORKERS", "1")
+    try:
+        parsed = int(raw_value)
+    except (TypeError, ValueError):
+        return 1
+    return parsed if parsed > 0 else 1
+
+
 def _patch_graphly_timeout() -> None:
     if getattr(graphly_sparql.Sparql, "_logre_timeout_patched", False):
         return
@@ -55,111 +172,376 @@ def _patch_graphly_timeout() -> None:
         query_param: str = "query",
         url_appendix: str = "",
         parse_response: bool = True,
+        as_dataframe: bool = False,
+        result_format: str = "json",
     ):
         prefixes = prefixes or Prefixes()
-
-        if os.getenv("GRAPHLY_MODE") == "debug":
-            graphly_sparql.log_query(self.url, text, prefixes)
-
-        text = "\n".join([line.strip() for line in text.split("\n") if line.strip()])
-
-        declared_prefixes = _extract_declared_prefix_shorts(text)
-        merged_prefix_lines = []
-        added_shorts = set()
-        for prefix in prefixes:
-            short = getattr(prefix, "short", None)
-            if not short or short in added_shorts or short in declared_prefixes:
-                continue
-            merged_prefix_lines.append(prefix.to_sparql())
-            added_shorts.add(short)
-
-        if merged_prefix_lines:
-            text = "\n".join(merged_prefix_lines) + "\n" + text
-
+        text = _prepare_query_text(self, text, prefixes)
+        if result_format == "tsv" and not is_select_query(text):
+            # Only SELECT results are tables: ASK, CONSTRUCT... keep the JSON path
+            result_format = "json"
+        # TSV results are only decoded as tables
+        as_dataframe = as_dataframe or result_format == "tsv"
+
+        cache = get_query_cache()
+        endpoint_identity = get_endpoint_identity(self.url, self.username)
+        is_update = query_param != "query" or is_update_query(text)
+        cache_key = (
+            endpoint_identity,
+            url_appendix,
+            query_param,
+            text,
+            as_dataframe,
+            result_format,
+        )
+        if not is_update and parse_response and cache.enabled:
+            hit, cached = cache.get(cache_key)
+            if hit:
+                return cached
+        generation = cache.generation(endpoint_identity)
+
+        stream = (
+            (as_dataframe or result_format == "ntriples")
+            and parse_response
+            and not is_update
+        )
         data = {query_param: text}
+        if stream and result_format == "tsv":
+            accept = TSV_ACCEPT
+        elif stream and result_format == "ntriples":
+            accept = NTRIPLES_ACCEPT
+        else:
+            accept = "application/sparql-results+json"
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/sparql-results+json",
+            "Accept": accept,
         }
         auth = HTTPBasicAuth(self.username, self.password) if self.username else None
 
-        response = requests.post(
-            self.url + url_appendix,
-            data=data,
-            headers=headers,
-            auth=auth,
-            timeout=_get_sparql_timeout_seconds(),
-        )
+        try:
+            response = get_session(self.url, self.username).post(
+                self.url + url_appendix,
+                data=data,
+                headers=headers,
+                auth=auth,
+                timeout=_get_sparql_timeout_seconds(),
+                stream=stream,
+            )
+        finally:
+            if is_update:
+                cache.invalidate(
+                    endpoint_identity,
+                    referenced_graphs(text, _get_prefix_map(prefixes)),
+                )
+
+        if stream:
+            # Decode the bindings column by column while the body is downloaded
+            with response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "")
+                if result_format == "ntriples" and (
+                    "n-triples" in content_type or "text/plain" in content_type
+                ):
+                    # CONSTRUCT/DESCRIBE results, parsed line by line
+                    result = list(iter_ntriples(response.iter_lines()))
+                elif "tab-separated-values" in content_type:
+                    response.raw.decode_content = True
+                    result = read_sparql_tsv_dataframe(response.raw, prefixes)
+                elif "json" in content_type:
+                    result = read_sparql_json_dataframe(
+                        response.iter_content(chunk_size=_get_stream_chunk_bytes()),
+                        prefixes,
+                    )
+                else:
+                    # Not a SELECT result (e.g. CONSTRUCT): return the raw text
+                    return response.text
+            cache.put(
+                cache_key,
+                result,
+                endpoint_identity,
+                referenced_graphs(text, _get_prefix_map(prefixes)),
+                generation,
+            )
+            return result
+
         response.raise_for_status()
 
         if parse_response:
             try:
-                return graphly_sparql.parse_sparql_json_response(
-                    response.json(), prefixes
-                )
+                body = response.json()
+            except ValueError:
+                return response.text
+            if isinstance(body, dict) and isinstance(body.get("boolean"), bool):
+                # ASK results
+                return body["boolean"]
+            try:
+                result = graphly_sparql.parse_sparql_json_response(body, prefixes)
             except Exception:
                 return response.text
+            if not is_update and isinstance(result, list):
+                cache.put(
+                    cache_key,
+                    result,
+                    endpoint_identity,
+                    referenced_graphs(text, _get_prefix_map(prefixes)),
+                    generation,
+                )
+            return result
 
     graphly_sparql.Sparql.run = _run_with_timeout
     graphly_sparql.Sparql._logre_timeout_patched = True
 
 
-def _patch_graphly_nquads_upload() -> None:
-    if getattr(graphly_sparql.Sparql, "_logre_nquads_upload_patched", False):
+def _patch_graphly_streaming() -> None:
+    if getattr(graphly_sparql.Sparql, "_logre_streaming_patched", False):
         return
 
-    def _upload_nquads_with_adaptive_chunking(self, nquad_content: str) -> None:
-        lines = nquad_content.splitlines()
-        lines_number = len(lines)
+    def _stream(
+        self,
+        text: str,
+        prefixes: Prefixes = None,
+        batch_size: int | None = None,
+        limit: int | None = None,
+    ):
+        """
+        Run a SELECT query and parse its JSON results while they are downloaded.
+
+        Rows are yielded one by one, or by lists of `batch_size` rows. Results are
+        not cached. Closing the generator early (or reaching `limit` rows) closes
+        the HTTP response, so the rest of the body is never downloaded.
+
+        Args:
+            text (str): The SPARQL SELECT query.
+            prefixes (Prefixes): Prefixes to declare and to shorten URIs with.
+            batch_size (int | None): If set, yield lists of rows instead of rows.
+            limit (int | None): Stop after this many rows.
+
+        Yields:
+            Dict[str, Any] | List[Dict[str, Any]]: Parsed rows, or batches of rows.
+        """
+        prefixes = prefixes or Prefixes()
+        text = _prepare_query_text(self, text, prefixes)
+        auth = HTTPBasicAuth(self.username, self.password) if self.username else None
 
-        if lines_number == 0:
-            print("> Uploaded a total of 0 triples")
-            return
+        response = get_session(self.url, self.username).post(
+            self.url,
+            data={"query": text},
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Accept": "application/sparql-results+json",
+            },
+            auth=auth,
+            timeout=_get_sparql_timeout_seconds(),
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+            rows = iter_sparql_json_rows(
+                response.iter_content(chunk_size=_get_stream_chunk_bytes()), prefixes
+            )
+            if limit is not None:
+                rows = islice(rows, limit)
+            if batch_size:
+                yield from batch_rows(rows, batch_size)
+            else:
+                yield from rows
+        finally:
+            response.close()
 
-        chunk_lines = min(_get_nquads_chunk_lines(), lines_number)
-        uploaded_count = 0
+    graphly_sparql.Sparql.stream = _stream
+    graphly_sparql.Sparql._logre_streaming_patched = True
 
-        while uploaded_count < lines_number:
-            next_count = min(uploaded_count + chunk_lines, lines_number)
-            chunk = "\n".join(lines[uploaded_count:next_count])
-            chunk_len = next_count - uploaded_count
-            percent_done = round((uploaded_count / lines_number) * 100)
-            print(
-                f"> Uploaded {uploaded_count} triples / {lines_number} ({percent_done} %) - Uploading {chunk_len} more..."
-            )
 
-            try:
-                self.upload_nquads_chunk(chunk)
-                uploaded_count = next_count
-            except HTTPError as err:
-                status_code = getattr(
-                    getattr(err, "response", None), "status_code", None
-                )
-                if status_code != 413:
-                    raise
-
-                if chunk_lines <= 1:
-                    raise HTTPError(
-                        "Upload failed with HTTP 413 even for a single N-Quads line. "
-                        "Increase the endpoint/proxy request body limit or split very large lines.",
-                        response=err.response,
-                        request=err.request,
-                    ) from err
-
-                chunk_lines = max(1, chunk_lines // 2)
+def _patch_graphly_nquads_upload() -> None:
+    if getattr(graphly_sparql.Sparql, "_logre_nquads_upload_patched", False):
+        return
+
+    def _upload_nquads_with_adaptive_chunking(
+        self,
+        nquad_content: str | bytes | BinaryIO,
+        resume: bool = False,
+        name: str | None = None,
+    ) -> None:
+        # The checkpoint of the upload is journaled, so that a failed or
+        # interrupted upload of the same file can resume (with `resume`)
+        file = as_binary_file(nquad_content)
+        if file.seekable():
+            start = file.tell()
+            fingerprint, size = get_file_fingerprint(file)
+            journal = UploadJournal.open(
+                get_endpoint_identity(
+                    getattr(self, "url", None), getattr(self, "username", None)
+                ),
+                type(self).__name__,
+                fingerprint,
+                size,
+                start,
+                name,
+            )
+            offset = journal.begin(resume)
+            if offset > start:
                 print(
-                    f"> GraphDB returned 413. Reducing N-Quads chunk size to {chunk_lines} lines and retrying..."
+                    f"> Resuming the upload after {offset - start} / {size} bytes "
+                    f"({journal.entry['triples']} triples already uploaded)"
                 )
+            file.seek(offset)
+        else:
+            # Generated content (e.g. converted Turtle) cannot be fingerprinted
+            # nor sought: its checkpoint is only kept in memory
+            journal = UploadJournal(
+                None,
+                {"start": 0, "offset": 0, "triples": 0, "skolem_id": uuid.uuid4().hex},
+            )
 
-        print(f"> Uploaded a total of {lines_number} triples")
+        try:
+            _upload_nquads_chunks(self, file, journal)
+        except BaseException as err:
+            journal.fail(err)
+            raise
+        else:
+            journal.finish()
+        finally:
+            # N-Quads can target any graph
+            invalidate_graph_results(self)
+
+    def _upload_nquads_chunks(self, file: BinaryIO, journal: UploadJournal) -> None:
+        # The file is read a block at a time, so that only the chunks
+        # being sent are held in memory, whatever the file size
+        reader = NQuadsReader(file)
+        sizes = ChunkSizeController(
+            _get_nquads_chunk_lines(),
+            technology=type(self).__name__,
+            endpoint=getattr(self, "url", "") or "",
+            log_path=_get_decision_log_path(),
+        )
+        chunk_bytes = _get_nquads_chunk_bytes()
+        workers = _get_nquads_upload_workers()
+        progress = UploadProgress()
+        failure: Exception | None = None
+        # Blank nodes are skolemized, the same way across the retries and resumes of the upload
+        skolem_base = get_skolem_base(None, journal.entry["skolem_id"])
+
+        def send(chunk: Chunk) -> float:
+            start = time.perf_counter()
+            self.upload_nquads_chunk(chunk.skolemized_text(skolem_base))
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="logre-upload"
+        ) as pool:
+            in_flight: Dict[Future, Chunk] = {}
+            while True:
+                # Keep `workers` chunks in flight, until the end of the file or a failure
+                while failure is None and len(in_flight) < workers:
+                    chunk = reader.take(sizes.lines, chunk_bytes)
+                    if chunk is None:
+                        break
+                    percent_done = reader.percent_done
+                    share = f" ({percent_done} % of the file)" if percent_done is not None else ""
+                    print(
+                        f"> Uploaded {progress.triples} triples{share}, {progress.rate} - Uploading {len(chunk.lines)} more..."
+                    )
+                    in_flight[pool.submit(send, chunk)] = chunk
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    err = future.exception()
+                    if err is None:
+                        progress.add(chunk)
+                        journal.acknowledge(chunk.start, chunk.end, len(chunk.lines))
+                        sizes.on_success(chunk, future.result())
+                        continue
+
+                    status_code = getattr(
+                        getattr(err, "response", None), "status_code", None
+                    )
+                    if isinstance(err, Timeout):
+                        reason = "timeout"
+                    elif isinstance(err, HTTPError) and status_code == 413:
+                        reason = "413"
+                    else:
+                        reason = None
+
+                    if failure is not None:
+                        print(f"> Chunk at bytes {chunk.start}-{chunk.end} also failed: {err}")
+                    elif reason is None:
+                        print(
+                            f"> Chunk of {len(chunk.lines)} lines at bytes {chunk.start}-{chunk.end} failed: {err}"
+                        )
+                        failure = err
+                    elif len(chunk.lines) <= 1 and reason == "timeout":
+                        print(f"> A single N-Quads line at bytes {chunk.start}-{chunk.end} timed out")
+                        failure = err
+                    elif len(chunk.lines) <= 1:
+                        failure = HTTPError(
+                            "Upload failed with HTTP 413 even for a single N-Quads line. "
+                            "Increase the endpoint/proxy request body limit or split very large lines.",
+                            response=err.response,
+                            request=err.request,
+                        )
+                        failure.__cause__ = err
+                    else:
+                        # Send the same lines again, in smaller chunks (with blank
+                        # nodes skolemized, a triple the endpoint got anyway is not
+                        # inserted twice)
+                        sizes.on_failure(chunk, reason)
+                        reader.push_back(chunk)
+                        cause = "GraphDB returned 413" if reason == "413" else "Upload timed out"
+                        print(
+                            f"> {cause}. Reducing N-Quads chunk size to {sizes.lines} lines and retrying..."
+                        )
+
+        if failure is not None:
+            # Chunks already in flight were waited for: the count is what the endpoint received
+            print(f"> Upload stopped after {progress.triples} triples ({progress.rate})")
+            raise failure
+        print(f"> Uploaded a total of {progress.triples} triples ({progress.rate})")
 
     graphly_sparql.Sparql.upload_nquads = _upload_nquads_with_adaptive_chunking
     graphly_sparql.Sparql._logre_nquads_upload_patched = True
 
 
+def _patch_graphly_http_pool() -> None:
+    # graphly calls the `requests` module directly (e.g. in upload_nquads_chunk):
+    # point every loaded graphly module to the pooled sessions instead.
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("graphly") or module is None:
+            continue
+        if getattr(module, "requests", None) is requests:
+            module.requests = pooled_requests
+
+
+def _patch_graphly_write_invalidation() -> None:
+    if getattr(Graph, "_logre_write_invalidation_patched", False):
+        return
+
+    def _invalidating(method):
+        def _write(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                invalidate_graph_results(
+                    self.sparql, self.uri, getattr(self, "prefixes", None)
+                )
+
+        _write.__name__ = method.__name__
+        _write.__doc__ = method.__doc__
+        return _write
+
+    for name in ("insert", "delete", "upload_turtle"):
+        setattr(Graph, name, _invalidating(getattr(Graph, name)))
+    Graph._logre_write_invalidation_patched = True
+
+
 _patch_graphly_parser()
 _patch_graphly_timeout()
+_patch_graphly_streaming()
 _patch_graphly_nquads_upload()
+_patch_graphly_write_invalidation()
+_patch_graphly_http_pool()
 
 
 class SPARQLTechnology(str, Enum):
@@ -245,3 +627,46 @@ def get_sparql_technology(sparql_technology_name: str) -> Sparql:
         return GraphDB
     elif technology == SPARQLTechnology.RDF4J:
         return RDF4J
+
+
+def upload_turtle_in_chunks(graph: Graph, turtle_content: str | bytes | BinaryIO) -> None:
+    """
+    Upload a Turtle document into a graph, through the chunked N-Quads upload.
+
+    The document is parsed one statement at a time and turned into N-Quads lines
+    of the graph, which are sent in chunks like N-Quads files (adapted on HTTP 413,
+    timeouts and slowdowns), instead of in a single request. Blank nodes are
+    skolemized, as each chunk is a separate request.
+
+    Relative IRIs are resolved against the graph IRI, unless the document sets
+    its own `@base`. The whole document is parsed once before anything is sent,
+    so that a syntax error (or a relative IRI left unresolved) does not leave a
+    partial upload.
+
+    Args:
+        graph (Graph): The target graph.
+        turtle_content (str | bytes | BinaryIO): The Turtle document, or a binary file.
+
+    Raises:
+        TurtleSyntaxError: If the document is not valid Turtle, or has relative
+            IRIs while targeting the default graph without a `@base`.
+    """
+    graph_iri = normalize_graph_uri(
+        graph.uri, _get_prefix_map(getattr(graph, "prefixes", None))
+    )
+
+    file = as_binary_file(turtle_content)
+    start = file.tell()
+    for triple in iter_turtle(file, base=graph_iri or None):
+        for term in triple:
+            if term.kind == "iri" and not urlsplit(term.value).scheme:
+                raise TurtleSyntaxError(
+                    f"Relative IRI <{term.value}> in Turtle, with no @base "
+                    "nor graph IRI to resolve it against"
+                )
+    file.seek(start)
+
+    lines = iter_nquads_lines(
+        iter_turtle(file, base=graph_iri or None), graph_iri, get_skolem_base(graph_iri)
+    )
+    graph.sparql.upload_nquads(LineStream(lines))
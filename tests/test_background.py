@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.background import RefreshCache  # noqa: E402
+
+
+class _Loader:
+    """Load function returning 1, 2, 3, ... and counting its calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.release.wait(5)
+        self.calls += 1
+        return self.calls
+
+
+class TestRefreshCache(unittest.TestCase):
+    def test_first_load_is_waited_for_then_served(self):
+        cache = RefreshCache("test", 60)
+        loader = _Loader()
+        self.assertEqual(cache.get("k", loader), 1)
+        self.assertEqual(cache.get("k", loader), 1)
+        self.assertEqual(loader.calls, 1)
+
+    def test_concurrent_first_loads_run_once(self):
+        cache = RefreshCache("test", 60)
+        loader = _Loader()
+        loader.release.clear()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get("k", loader)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        loader.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [1, 1, 1, 1])
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(cache._loading, {})
+
+    def test_least_recently_used_values_are_forgotten(self):
+        cache = RefreshCache("test", 60, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a", _Loader()), 1)
+        cache.put("c", 3)
+        self.assertEqual(list(cache._entries), ["a", "c"])
+
+    def test_stale_value_is_served_while_refreshing(self):
+        cache = RefreshCache("test", 10, refresh_ahead=0.5)
+        loader = _Loader()
+        cache.get("k", loader)
+        # Past the refresh point, but not expired
+        cache._entries["k"] = (1, None, time.time() - 6)
+        loader.release.clear()
+        self.assertEqual(cache.get("k", loader), 1)
+        self.assertTrue(cache.is_refreshing("k"))
+        # A refresh under way is not started twice
+        self.assertEqual(cache.get("k", loader), 1)
+        loader.release.set()
+        cache.wait(timeout=5)
+        self.assertFalse(cache.is_refreshing("k"))
+        self.assertEqual(cache.get("k", loader), 2)
+        self.assertEqual(loader.calls, 2)
+
+    def test_version_change_triggers_a_refresh(self):
+        cache = RefreshCache("test", 60)
+        loader = _Loader()
+        cache.get("k", loader, version=1)
+        self.assertEqual(cache.get("k", loader, version=2), 1)
+        cache.wait(timeout=5)
+        self.assertEqual(cache.get("k", loader, version=2), 2)
+        self.assertEqual(loader.calls, 2)
+
+    def test_failed_refresh_keeps_last_good_value(self):
+        cache = RefreshCache("test", 0)
+        cache.put("k", "good")
+
+        def failing():
+            raise RuntimeError("endpoint down")
+
+        self.assertEqual(cache.get("k", failing), "good")
+        cache.wait(timeout=5)
+        self.assertEqual(cache.get("k", failing), "good")
+
+    def test_refresh_started_before_clear_is_dropped(self):
+        cache = RefreshCache("test", 0)
+        loader = _Loader()
+        cache.get("k", loader)
+        loader.release.clear()
+        cache.get("k", loader)
+        cache.clear()
+        loader.release.set()
+        cache.wait(timeout=5)
+        self.assertEqual(cache._entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
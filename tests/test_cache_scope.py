@@ -0,0 +1,80 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.background import RefreshCache  # noqa: E402
+from lib.cache_scope import (  # noqa: E402
+    get_invalidation_counters,
+    invalidate_scope,
+    reset_invalidation_counters,
+)
+from lib.query_cache import get_query_cache  # noqa: E402
+
+
+ENDPOINT = "@http://scope.test/repositories/a"
+OTHER_ENDPOINT = "@http://scope.test/repositories/b"
+
+
+class TestCacheScope(unittest.TestCase):
+    def setUp(self):
+        reset_invalidation_counters()
+        self.cache = RefreshCache("test", 60)
+        for key in (
+            (ENDPOINT, "bundle_a", "data"),
+            (ENDPOINT, "bundle_b", "data"),
+            (ENDPOINT, None, "graph list"),
+            (OTHER_ENDPOINT, "bundle_a", "data"),
+        ):
+            self.cache.put(key, key)
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_only_the_bundle_values_are_dropped(self):
+        dropped = invalidate_scope("append_model", ENDPOINT, "bundle_a")
+        self.assertEqual(dropped, 1)
+        self.assertEqual(
+            sorted(self.cache._entries, key=str),
+            sorted(
+                [
+                    (ENDPOINT, "bundle_b", "data"),
+                    (ENDPOINT, None, "graph list"),
+                    (OTHER_ENDPOINT, "bundle_a", "data"),
+                ],
+                key=str,
+            ),
+        )
+        self.assertEqual(self.cache.invalidate(ENDPOINT), 2)
+
+    def test_session_changes_drop_nothing(self):
+        self.assertEqual(invalidate_scope("data_bundle_change"), 0)
+        invalidate_scope("data_bundle_change")
+        self.assertEqual(len(self.cache._entries), 4)
+        self.assertEqual(
+            get_invalidation_counters(),
+            {"data_bundle_change": {"calls": 2, "dropped": 0}},
+        )
+
+    def test_query_results_are_dropped_per_graph(self):
+        results = get_query_cache()
+        if not results.enabled:
+            self.skipTest("query cache disabled")
+        results.put("q-data", [1], ENDPOINT, ["http://example.org/data"])
+        results.put("q-model", [1], ENDPOINT, ["http://example.org/model"])
+        invalidate_scope(
+            "import_turtle", ENDPOINT, "bundle_a", results=True, graphs=["http://example.org/data"]
+        )
+        self.assertFalse(results.get("q-data")[0])
+        self.assertTrue(results.get("q-model")[0])
+        counters = get_invalidation_counters()["import_turtle"]
+        self.assertEqual(counters, {"calls": 1, "dropped": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from graphly.schema import Prefix, Prefixes, Resource  # noqa: E402
+
+from lib.ntriples import Term  # noqa: E402
+from schema.data_bundle import DataBundle  # noqa: E402
+
+
+EX = "http://example.org/"
+
+
+class _FakeDataGraph:
+    """Data graph answering the page and count queries with canned rows."""
+
+    sparql_begin = f"GRAPH <{EX}data> {{"
+    sparql_end = "}"
+
+    def __init__(self, page_rows, count_rows) -> None:
+        self.page_rows = page_rows
+        self.count_rows = count_rows
+        self.queries = []
+
+    def run(self, text):
+        self.queries.append(text)
+        if "GROUP BY ?card_index" in text:
+            return self.count_rows
+        return self.page_rows
+
+
+def _make_bundle(data_graph) -> DataBundle:
+    bundle = DataBundle.__new__(DataBundle)
+    bundle.prefixes = Prefixes([Prefix("ex", EX)])
+    bundle.endpoint = SimpleNamespace(url="http://localhost:7200/repositories/test")
+    bundle.model = SimpleNamespace(
+        type_property="rdf:type",
+        label_property="rdfs:label",
+        comment_property="rdfs:comment",
+        classes=[],
+        properties=[],
+    )
+    bundle.data = data_graph
+    return bundle
+
+
+def _property(uri, domain=None, range=None):
+    return SimpleNamespace(
+        uri=uri,
+        domain=SimpleNamespace(uri=domain, class_uri=None) if domain else None,
+        range=SimpleNamespace(uri=range, class_uri=None) if range else None,
+    )
+
+
+class TestCardStatements(unittest.TestCase):
+    def setUp(self):
+        self.entity = Resource("ex:person1", "Person 1", class_uri="ex:Person")
+        self.knows = _property("ex:knows", domain="ex:Person", range="ex:Person")
+        self.wrote = _property("ex:wrote", domain="ex:Book")
+        self.likes = _property("ex:likes", domain="ex:Person")
+
+    def test_pages_and_counts_are_dispatched_per_property(self):
+        page_rows = [
+            {
+                "card_index": 0,
+                "object_uri": "ex:person2",
+                "object_label": "Person 2",
+                "object_comment": "",
+                "object_class_uri": "ex:Person",
+                "resource_type": "iri",
+            },
+            {
+                "card_index": 1,
+                "subject_uri": "ex:book1",
+                "subject_label": "Book 1",
+                "subject_comment": "",
+                "subject_class_uri": "ex:Book",
+                "resource_type": "iri",
+            },
+            # Duplicate row (e.g. several labels) of the same object
+            {
+                "card_index": 0,
+                "object_uri": "ex:person2",
+                "object_label": "Person two",
+                "object_comment": "",
+                "object_class_uri": "ex:Person",
+                "resource_type": "iri",
+            },
+        ]
+        count_rows = [{"card_index": 0, "count": 7}, {"card_index": 1, "count": 1}]
+        graph = _FakeDataGraph(page_rows, count_rows)
+        bundle = _make_bundle(graph)
+
+        result = bundle.get_card_statements_of(
+            self.entity, [self.knows, self.wrote, self.likes], "ex:Person", 5, [5, 0, 0]
+        )
+
+        self.assertEqual(len(graph.queries), 2)
+        (knows, knows_count), (wrote, wrote_count), (likes, likes_count) = result
+        self.assertEqual([s.object.uri for s in knows], ["ex:person2"])
+        self.assertIs(knows[0].subject, self.entity)
+        self.assertEqual(knows_count, 7)
+        self.assertEqual([s.subject.uri for s in wrote], ["ex:book1"])
+        self.assertIs(wrote[0].object, self.entity)
+        self.assertEqual(wrote_count, 1)
+        self.assertEqual((likes, likes_count), ([], 0))
+
+    def test_queries_keep_per_property_pagination(self):
+        graph = _FakeDataGraph([], [])
+        bundle = _make_bundle(graph)
+
+        bundle.get_card_statements_of(
+            self.entity, [self.knows, self.wrote], "ex:Person", 5, [10, 0]
+        )
+
+        page_query = next(q for q in graph.queries if "GROUP BY" not in q)
+        count_query = next(q for q in graph.queries if "GROUP BY" in q)
+        self.assertEqual(page_query.count("LIMIT 5"), 2)
+        self.assertEqual(page_query.count("OFFSET 10"), 1)
+        self.assertIn("(0 as ?card_index)", page_query)
+        self.assertIn("(1 as ?card_index)", page_query)
+        self.assertIn("UNION", page_query)
+        self.assertIn("(0 ex:knows)", count_query)
+        self.assertIn("(1 ex:wrote)", count_query)
+
+    def test_no_property_sends_no_query(self):
+        graph = _FakeDataGraph([], [])
+        bundle = _make_bundle(graph)
+        self.assertEqual(bundle.get_card_statements_of(self.entity, [], None), [])
+        self.assertEqual(graph.queries, [])
+
+
+class _FakeSparql:
+    """Endpoint answering CONSTRUCT queries with canned triples."""
+
+    def __init__(self, triples) -> None:
+        self.triples = triples
+        self.queries = []
+
+    def run(self, text, prefixes=None, result_format="json"):
+        self.queries.append((text, result_format))
+        return self.triples
+
+
+def _iri(local):
+    return Term(EX + local, "iri")
+
+
+class TestNeighborhoodSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.knows = _property("ex:knows", domain="ex:Person", range="ex:Person")
+        self.wrote = _property("ex:wrote", domain="ex:Book")
+        rdf_type = Term("http://www.w3.org/1999/02/22-rdf-syntax-ns#type", "iri")
+        label = Term("http://www.w3.org/2000/01/rdf-schema#label", "iri")
+        triples = [
+            (_iri("person1"), rdf_type, _iri("Person")),
+            (_iri("person1"), label, Term("Person 1", "literal")),
+            (_iri("person1"), _iri("knows"), _iri("person2")),
+            (_iri("person1"), _iri("knows"), _iri("book2")),
+            (_iri("person2"), rdf_type, _iri("Person")),
+            (_iri("person2"), label, Term("Person 2", "literal")),
+            (_iri("book2"), rdf_type, _iri("Book")),
+            (_iri("book1"), _iri("wrote"), _iri("person1")),
+            (_iri("book1"), rdf_type, _iri("Book")),
+        ]
+        self.graph = _FakeDataGraph([], [])
+        self.graph.sparql = _FakeSparql(triples)
+        self.bundle = _make_bundle(self.graph)
+        self.bundle.prefixes = Prefixes(
+            [
+                Prefix("ex", EX),
+                Prefix("rdf", "http://www.w3.org/1999/02/22-rdf-syntax-ns#"),
+                Prefix("rdfs", "http://www.w3.org/2000/01/rdf-schema#"),
+            ]
+        )
+
+    def test_construct_query_is_bounded(self):
+        self.bundle.load_neighborhood("ex:person1", caps={"outgoing": 10})
+        ((query, result_format),) = self.graph.sparql.queries
+        self.assertEqual(result_format, "ntriples")
+        self.assertIn("CONSTRUCT", query)
+        self.assertIn("LIMIT 10", query)
+        self.assertIn("LIMIT 500", query)
+
+    def test_entity_views_read_from_snapshot(self):
+        snapshot = self.bundle.load_neighborhood("ex:person1")
+
+        entity = self.bundle.get_entity_basics("ex:person1", snapshot)
+        self.assertEqual((entity.label, entity.class_uri), ("Person 1", "ex:Person"))
+
+        (knows, knows_count), (wrote, wrote_count) = self.bundle.get_card_statements_of(
+            entity, [self.knows, self.wrote], "ex:Person", 5, [0, 0], snapshot=snapshot
+        )
+        # Objects are filtered by the range class, counts are not
+        self.assertEqual([s.object.uri for s in knows], ["ex:person2"])
+        self.assertEqual(knows[0].object.label, "Person 2")
+        self.assertEqual(knows_count, 2)
+        self.assertEqual([s.subject.uri for s in wrote], ["ex:book1"])
+        self.assertEqual(wrote_count, 1)
+
+        # Nothing but the CONSTRUCT was sent
+        self.assertEqual(self.graph.queries, [])
+        self.assertEqual(len(self.graph.sparql.queries), 1)
+
+    def test_incomplete_direction_is_queried(self):
+        snapshot = self.bundle.load_neighborhood(
+            "ex:person1", caps={"outgoing": 4, "incoming": 4}
+        )
+        entity = self.bundle.get_entity_basics("ex:person1", snapshot)
+        self.bundle.get_card_statements_of(
+            entity, [self.knows], "ex:Person", 5, [0], snapshot=snapshot
+        )
+        self.assertEqual(len(self.graph.queries), 2)
+
+    def test_non_triple_answer_is_not_a_snapshot(self):
+        self.graph.sparql.triples = "<html>Service unavailable</html>"
+        with self.assertRaises(ValueError):
+            self.bundle.load_neighborhood("ex:person1")
+
+
+if __name__ == "__main__":
+    unittest.main()
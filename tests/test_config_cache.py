@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib import config_cache  # noqa: E402
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        config_cache.clear_config_cache()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "config.yaml"
+        self.path.write_text("prefixes:\n  - short: ex\n", encoding="utf-8")
+
+    def _touch(self, text):
+        stat = self.path.stat()
+        self.path.write_text(text, encoding="utf-8")
+        # Make sure the stamp changes even on coarse file systems
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_parsed_once_and_copied(self):
+        raw, first = config_cache.read_yaml(self.path)
+        self.assertEqual(raw, "prefixes:\n  - short: ex\n")
+        first["prefixes"].append("changed by a session")
+        second = config_cache.load_yaml(self.path)
+        self.assertEqual(second, {"prefixes": [{"short": "ex"}]})
+
+        calls = []
+        original = config_cache.safe_load
+        config_cache.safe_load = lambda raw: calls.append(raw) or original(raw)
+        self.addCleanup(setattr, config_cache, "safe_load", original)
+        config_cache.load_yaml(self.path)
+        self.assertEqual(calls, [])
+        self._touch("prefixes: []\n")
+        self.assertEqual(config_cache.load_yaml(self.path), {"prefixes": []})
+        self.assertEqual(len(calls), 1)
+
+    def test_steps_run_once_per_file_change(self):
+        runs = []
+
+        def migrate(path):
+            runs.append(path)
+            # The step rewrites the file: its own output is not migrated again
+            self._touch("version: '3'\n")
+            return True
+
+        self.assertTrue(config_cache.run_once_per_change("migrate", self.path, migrate))
+        self.assertIsNone(config_cache.run_once_per_change("migrate", self.path, migrate))
+        self.assertEqual(len(runs), 1)
+        self._touch("version: '4'\n")
+        config_cache.run_once_per_change("migrate", self.path, migrate)
+        self.assertEqual(len(runs), 2)
+
+    def test_failing_step_runs_again(self):
+        def failing(path):
+            raise RuntimeError("network down")
+
+        with self.assertRaises(RuntimeError):
+            config_cache.run_once_per_change("autoconfigure", self.path, failing)
+        with self.assertRaises(RuntimeError):
+            config_cache.run_once_per_change("autoconfigure", self.path, failing)
+
+    def test_incomplete_step_runs_again(self):
+        runs = []
+
+        def autoconfigure(path):
+            runs.append(path)
+            # None while the endpoint does not answer
+            return None if len(runs) == 1 else False
+
+        def done(result):
+            return result is not None
+
+        for _ in range(3):
+            config_cache.run_once_per_change("autoconfigure", self.path, autoconfigure, done)
+        self.assertEqual(len(runs), 2)
+
+    def test_slow_step_does_not_hold_up_other_files(self):
+        other = self.path.with_name("other.yaml")
+        other.write_text("prefixes: []\n", encoding="utf-8")
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(path):
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(
+            target=config_cache.run_once_per_change, args=("autoconfigure", self.path, slow)
+        )
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        self.assertTrue(started.wait(5))
+        # Runs while the slow step is still running on the first file
+        self.assertTrue(config_cache.run_once_per_change("migrate", other, lambda path: True))
+        self.assertFalse(release.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.http_pool import SessionPool, get_endpoint_key  # noqa: E402
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = b'{"head": {"vars": []}, "results": {"bindings": []}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestEndpointKey(unittest.TestCase):
+    def test_same_server_shares_key(self):
+        self.assertEqual(
+            get_endpoint_key("http://Localhost:7200/repositories/a"),
+            get_endpoint_key("http://localhost:7200/repositories/a/statements"),
+        )
+
+    def test_default_ports_and_users(self):
+        self.assertEqual(
+            "https://localhost:443", get_endpoint_key("https://localhost/sparql")
+        )
+        self.assertNotEqual(
+            get_endpoint_key("http://localhost/sparql", "alice"),
+            get_endpoint_key("http://localhost/sparql", "bob"),
+        )
+
+
+class TestSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/sparql"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_connection_across_queries(self):
+        pool = SessionPool(maxsize=2, idle_seconds=60)
+        key = get_endpoint_key(self.url)
+        try:
+            for _ in range(5):
+                response = pool.get(key).post(self.url, data={"query": "ASK {}"})
+                response.raise_for_status()
+            stats = pool.stats()[key]
+            self.assertEqual(5, stats["requests"])
+            self.assertEqual(1, stats["connections"])
+            self.assertEqual(4, stats["reused"])
+        finally:
+            pool.close()
+
+    def test_idle_sessions_are_evicted(self):
+        pool = SessionPool(maxsize=2, idle_seconds=60)
+        key = get_endpoint_key(self.url)
+        try:
+            first = pool.get(key)
+            first.post(self.url, data={"query": "ASK {}"}).raise_for_status()
+            pool.idle_seconds = 0
+            pool.evict_idle()
+            self.assertEqual(0, pool.stats()[key]["open"])
+            self.assertEqual(1, pool.stats()[key]["requests"])
+            pool.idle_seconds = 60
+            self.assertIsNot(first, pool.get(key))
+            self.assertEqual(2, pool.stats()[key]["sessions"])
+        finally:
+            pool.close()
+
+    def test_sessions_in_use_are_not_evicted(self):
+        pool = SessionPool(maxsize=2, idle_seconds=60)
+        key = get_endpoint_key(self.url)
+        try:
+            response = pool.get(key).post(self.url, data={"query": "ASK {}"}, stream=True)
+            pool.idle_seconds = 0
+            pool.evict_idle()
+            # The streamed body is still being read
+            self.assertEqual(1, pool.stats()[key]["open"])
+            response.close()
+            pool.evict_idle()
+            self.assertEqual(0, pool.stats()[key]["open"])
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from graphly.schema import Prefix, Prefixes, Resource  # noqa: E402
+
+from schema.data_bundle import DataBundle  # noqa: E402
+
+
+EX = "http://example.org/"
+
+
+class _FakeSparql:
+    """Endpoint answering the data table queries with canned DataFrames."""
+
+    def __init__(self, instances) -> None:
+        self.instances = instances
+        self.queries = []
+
+    def run(self, text, prefixes=None, as_dataframe=False):
+        self.queries.append(text)
+        if "request 2" in text or "request 3" in text:
+            return pd.DataFrame()
+        return self.instances
+
+
+class _FakeDataGraph:
+    sparql_begin = f"GRAPH <{EX}data> {{"
+    sparql_end = "}"
+
+    def __init__(self, rows=None, instances=None) -> None:
+        self.rows = rows or []
+        self.queries = []
+        self.sparql = _FakeSparql(instances if instances is not None else pd.DataFrame())
+
+    def run(self, text):
+        self.queries.append(text)
+        return self.rows
+
+
+def _make_bundle(data_graph, properties=None) -> DataBundle:
+    bundle = DataBundle.__new__(DataBundle)
+    bundle.prefixes = Prefixes([Prefix("ex", EX)])
+    bundle.endpoint = SimpleNamespace(url="http://localhost:7200/repositories/test")
+    bundle.model = SimpleNamespace(
+        type_property="rdf:type",
+        label_property="rdfs:label",
+        comment_property="rdfs:comment",
+        classes=[],
+        properties=properties or [],
+    )
+    bundle.data = data_graph
+    return bundle
+
+
+def _property(uri, label, domain, range_uri, range_class_uri=None):
+    return SimpleNamespace(
+        uri=uri,
+        label=label,
+        order=1,
+        card_of=SimpleNamespace(uri=domain),
+        domain=SimpleNamespace(uri=domain, class_uri=None),
+        range=SimpleNamespace(uri=range_uri, class_uri=range_class_uri, label=range_uri),
+    )
+
+
+class TestStatementsKeyset(unittest.TestCase):
+    def setUp(self):
+        self.entity = Resource("ex:person1", "Person 1", class_uri="ex:Person")
+        self.knows = _property("ex:knows", "knows", "ex:Person", "ex:Person")
+
+    def test_cursor_is_the_greatest_string_value(self):
+        bundle = _make_bundle(_FakeDataGraph())
+        resources = [
+            Resource("ex:b", resource_type="iri"),
+            Resource("ex:c", resource_type="iri"),
+            Resource("_:b0", resource_type="blank"),
+        ]
+        self.assertEqual(bundle.get_keyset_cursor(resources), EX + "c")
+        # Literals may share their string value: the next page is fetched by offset
+        self.assertIsNone(
+            bundle.get_keyset_cursor([Resource(42, resource_type="literal")])
+        )
+        self.assertIsNone(
+            bundle.get_keyset_cursor(
+                [
+                    Resource("ex:c", resource_type="iri"),
+                    Resource(EX + "c", resource_type="literal"),
+                ]
+            )
+        )
+        self.assertIsNone(
+            bundle.get_keyset_cursor([Resource("_:b0", resource_type="blank")])
+        )
+        self.assertIsNone(bundle.get_keyset_cursor([]))
+
+    def test_pages_seek_after_the_cursor(self):
+        graph = _FakeDataGraph()
+        bundle = _make_bundle(graph)
+
+        bundle.get_objects_of(self.entity, self.knows, 5, 10)
+        bundle.get_objects_of(self.entity, self.knows, 5, 10, after=EX + 'a"b')
+        by_offset, by_keyset = graph.queries
+
+        self.assertIn(
+            "ORDER BY ASC(STR(?object_uri)) ASC(IF(isLiteral(?object_uri), "
+            'CONCAT(STR(DATATYPE(?object_uri)), "@", LANG(?object_uri)), ""))',
+            by_offset,
+        )
+        self.assertIn("OFFSET 10", by_offset)
+        self.assertNotIn("FILTER(STR(", by_offset)
+        self.assertIn(
+            f'FILTER(STR(?object_uri) > "{EX}a\\"b" || '
+            f'(STR(?object_uri) = "{EX}a\\"b" && isLiteral(?object_uri)))',
+            by_keyset,
+        )
+        self.assertNotIn("OFFSET", by_keyset)
+
+    def test_card_statements_use_cursors(self):
+        graph = _FakeDataGraph()
+        graph.run = lambda text: graph.queries.append(text) or []
+        bundle = _make_bundle(graph)
+        wrote = _property("ex:wrote", "wrote", "ex:Book", "ex:Person")
+
+        bundle.get_card_statements_of(
+            self.entity,
+            [self.knows, wrote],
+            "ex:Person",
+            5,
+            [5, 5],
+            afters=[EX + "person9", None],
+        )
+
+        page_query = next(q for q in graph.queries if "GROUP BY" not in q)
+        self.assertIn(f'FILTER(STR(?object_uri) > "{EX}person9" ||', page_query)
+        self.assertEqual(page_query.count("OFFSET 5"), 1)
+
+    def test_incoming_statements_seek_after_subject_and_property(self):
+        graph = _FakeDataGraph()
+        bundle = _make_bundle(graph)
+        bundle.get_incoming_statements_of(self.entity, 5, after=("ex:book1", "ex:wrote"))
+        (query,) = graph.queries
+        self.assertIn("ORDER BY ASC(STR(?s)) ASC(STR(?p))", query)
+        self.assertIn(f'STR(?s) > "{EX}book1"', query)
+        self.assertIn(f'STR(?p) > "{EX}wrote"', query)
+        self.assertNotIn("OFFSET", query)
+
+
+class TestDataTableKeyset(unittest.TestCase):
+    def setUp(self):
+        self.cls = Resource("ex:Person", "Person")
+        self.age = _property(
+            "ex:age", "age", "ex:Person", "xsd:integer", range_class_uri="rdfs:Datatype"
+        )
+
+    def _bundle(self, instances):
+        graph = _FakeDataGraph(instances=instances)
+        bundle = _make_bundle(graph, [self.age])
+        bundle.prefixes = Prefixes(
+            [Prefix("ex", EX), Prefix("xsd", "http://www.w3.org/2001/XMLSchema#")]
+        )
+        return bundle, graph.sparql
+
+    def test_unsorted_pages_seek_on_uri(self):
+        instances = pd.DataFrame(
+            [{"uri": "ex:p2", "col_0": "30"}, {"uri": "ex:p1", "col_0": "20"}]
+        )
+        bundle, sparql = self._bundle(instances)
+
+        df = bundle.get_data_table(self.cls, 2, 40, after=(None, "ex:p0"))
+
+        query = sparql.queries[0]
+        self.assertIn(f'FILTER(STR(?uri_) > "{EX}p0")', query)
+        self.assertIn("ORDER BY ASC(STR(?uri_))", query)
+        self.assertNotIn("OFFSET", query)
+        # Rows are put back in key order, and the last key is returned
+        self.assertEqual(list(df["URI"]), ["ex:p1", "ex:p2"])
+        self.assertEqual(df.attrs["last_key"], (None, "ex:p2"))
+
+    def test_sorted_pages_seek_on_sort_key_then_uri(self):
+        instances = pd.DataFrame(
+            [
+                {"uri": "ex:p1", "sort_key": 9, "col_0": "9"},
+                {"uri": "ex:p2", "sort_key": 30, "col_0": "30"},
+            ]
+        )
+        bundle, sparql = self._bundle(instances)
+
+        df = bundle.get_data_table(
+            self.cls, 2, sort_col="age (xsd:integer)", sort_way="DESC", after=(40, "ex:p3")
+        )
+
+        query = sparql.queries[0]
+        self.assertIn("(MIN(?sort_on) as ?sort_key)", query)
+        self.assertIn("ORDER BY DESC(?sort_key) DESC(STR(?uri_))", query)
+        self.assertIn(
+            f'FILTER(?sort_key < 40 || (?sort_key = 40 && STR(?uri_) < "{EX}p3"))',
+            query,
+        )
+        self.assertEqual(list(df["URI"]), ["ex:p2", "ex:p1"])
+        self.assertEqual(df.attrs["last_key"], (9, "ex:p1"))
+
+    def test_ill_typed_sort_values_do_not_fail(self):
+        instances = pd.DataFrame(
+            [
+                {"uri": "ex:p1", "sort_key": "n/a", "col_0": "n/a"},
+                {"uri": "ex:p2", "sort_key": 30, "col_0": "30"},
+            ]
+        )
+        bundle, sparql = self._bundle(instances)
+
+        df = bundle.get_data_table(self.cls, 2, sort_col="age (xsd:integer)")
+
+        self.assertEqual(list(df["URI"]), ["ex:p2", "ex:p1"])
+        self.assertEqual(df.attrs["last_key"], ("n/a", "ex:p1"))
+
+    def test_offset_is_the_fallback(self):
+        bundle, sparql = self._bundle(pd.DataFrame())
+        self.assertTrue(bundle.get_data_table(self.cls, 10, 30).empty)
+        self.assertIn("OFFSET 30", sparql.queries[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
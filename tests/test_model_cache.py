@@ -0,0 +1,165 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from graphly.schema import Prefix, Prefixes  # noqa: E402
+
+from lib.model_cache import ModelCache, get_model_cache, get_model_fingerprint_query  # noqa: E402
+from schema.data_bundle import DataBundle  # noqa: E402
+
+
+EX = "http://example.org/"
+
+
+class _FakeModel:
+    """Model counting its (expensive) fetches."""
+
+    sparql_begin = f"GRAPH <{EX}model> {{"
+    sparql_end = "}"
+
+    def __init__(self, fetches) -> None:
+        self.uri = "ex:model"
+        self.type_property = "rdf:type"
+        self.label_property = "rdfs:label"
+        self.comment_property = "rdfs:comment"
+        self.classes = []
+        self.properties = []
+        self.fetches = fetches
+
+    def update(self) -> None:
+        self.fetches.append(1)
+        self.classes = [SimpleNamespace(uri="ex:Person", class_uri=None)]
+        self.properties = []
+
+
+class _FakeEndpoint:
+    url = "http://models.test/repositories/x"
+    username = None
+
+    def __init__(self) -> None:
+        self.fingerprint = {"count": 10, "checksum": 72104}
+
+    def run(self, text, prefixes=None):
+        return [self.fingerprint]
+
+
+def _make_bundle(endpoint, fetches) -> DataBundle:
+    bundle = DataBundle.__new__(DataBundle)
+    bundle.name = "Test"
+    bundle.key = "test"
+    bundle.prefixes = Prefixes([Prefix("ex", EX)])
+    bundle.endpoint = endpoint
+    bundle.model = _FakeModel(fetches)
+    return bundle
+
+
+class TestSharedModels(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        cache = get_model_cache()
+        previous_directory = cache.directory
+        cache.directory = Path(self.directory.name)
+        self.addCleanup(setattr, cache, "directory", previous_directory)
+        cache.clear()
+        self.endpoint = _FakeEndpoint()
+        self.fetches = []
+
+    def test_sessions_share_the_parsed_model(self):
+        first = _make_bundle(self.endpoint, self.fetches)
+        second = _make_bundle(self.endpoint, self.fetches)
+        first.load_model()
+        second.load_model()
+        self.assertEqual(len(self.fetches), 1)
+        self.assertIsNot(first.model, second.model)
+        self.assertIs(first.model.classes, second.model.classes)
+        self.assertIs(second.model_index.find_class("ex:Person"), first.model.classes[0])
+
+    def test_changed_content_is_parsed_again(self):
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        self.endpoint.fingerprint = {"count": 11, "checksum": 80451}
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_invalidation_drops_the_model_graph_only(self):
+        bundle = _make_bundle(self.endpoint, self.fetches)
+        bundle.load_model()
+        endpoint, graph, _ = bundle.model_cache_key
+        self.assertEqual(graph, EX + "model")
+        self.assertEqual(get_model_cache().invalidate(endpoint, [EX + "data"]), 0)
+        self.assertEqual(get_model_cache().invalidate(endpoint, [graph]), 1)
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_restart_reads_the_model_from_disk(self):
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        # A restart empties the memory, not the disk
+        get_model_cache().clear()
+        bundle = _make_bundle(self.endpoint, self.fetches)
+        bundle.load_model()
+        self.assertEqual(len(self.fetches), 1)
+        self.assertEqual([cls.uri for cls in bundle.model.classes], ["ex:Person"])
+
+        # The file is not used once the model graph changed
+        get_model_cache().clear()
+        self.endpoint.fingerprint = {"count": 12, "checksum": 91327}
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_same_length_edit_is_parsed_again(self):
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        # e.g. a label renamed to another of the same length
+        self.endpoint.fingerprint = {"count": 10, "checksum": 72391}
+        _make_bundle(self.endpoint, self.fetches).load_model()
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_fingerprint_hashes_the_terms_but_not_blank_node_labels(self):
+        query = get_model_fingerprint_query(_make_bundle(self.endpoint, self.fetches))
+        self.assertIn("MD5(", query)
+        self.assertIn('IF(isBlank(?s), "", STR(?s))', query)
+        self.assertIn('IF(isBlank(?o), "", STR(?o))', query)
+        self.assertIn("LANG(?o)", query)
+        self.assertNotIn("STRLEN(CONCAT(", query)
+
+    def test_unreadable_file_is_ignored(self):
+        bundle = _make_bundle(self.endpoint, self.fetches)
+        path = get_model_cache().disk_path(bundle.model_cache_key)
+        path.write_bytes(b"not a pickle")
+        bundle.load_model()
+        self.assertEqual(len(self.fetches), 1)
+
+
+class TestModelCache(unittest.TestCase):
+    def test_concurrent_loads_parse_once(self):
+        cache = ModelCache()
+        calls = []
+        started = threading.Event()
+
+        def load():
+            calls.append(1)
+            started.wait(1)
+            return ([], [])
+
+        threads = [
+            threading.Thread(target=cache.get_or_load, args=(("e", "g", ()), "f", load))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        started.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
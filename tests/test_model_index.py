@@ -0,0 +1,93 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.model_index import ModelIndex  # noqa: E402
+
+
+def _class(uri):
+    return SimpleNamespace(uri=uri)
+
+
+def _property(uri, card_of=None, order=None):
+    return SimpleNamespace(
+        uri=uri,
+        card_of=_class(card_of) if card_of else None,
+        order=order,
+    )
+
+
+class _FakeModel:
+    """Model scanning its lists, as graphly does, and counting the scans."""
+
+    def __init__(self, classes, properties) -> None:
+        self.classes = classes
+        self.properties = properties
+        self.scans = 0
+
+    def find_class(self, uri):
+        self.scans += 1
+        return next((c for c in self.classes if c.uri == uri), None)
+
+    def find_properties(self, uri, domain_class_uri=None, range_class_uri=None):
+        self.scans += 1
+        return [p for p in self.properties if p.uri == uri]
+
+
+class TestModelIndex(unittest.TestCase):
+    def setUp(self):
+        self.model = _FakeModel(
+            [_class("ex:Person"), _class("ex:Book")],
+            [
+                _property("ex:name", "ex:Person", 2),
+                _property("ex:knows", "ex:Person", 1),
+                _property("ex:note", "ex:Person"),
+                _property("ex:title", "ex:Book", 1),
+                _property("ex:other"),
+            ],
+        )
+        self.index = ModelIndex(self.model)
+
+    def test_classes_are_found_by_uri(self):
+        self.assertIs(self.index.find_class("ex:Book"), self.model.classes[1])
+        self.assertEqual(self.model.scans, 0)
+        # Unknown URIs are answered by the model, once
+        self.assertIsNone(self.index.find_class("ex:Unknown"))
+        self.assertIsNone(self.index.find_class("ex:Unknown"))
+        self.assertEqual(self.model.scans, 1)
+
+    def test_property_lookups_are_remembered(self):
+        for _ in range(3):
+            found = self.index.find_properties("ex:knows", "ex:Person", "ex:Person")
+            self.assertEqual([p.uri for p in found], ["ex:knows"])
+        self.index.find_properties("ex:knows")
+        self.assertEqual(self.model.scans, 2)
+        # Returned lists can be changed by callers
+        found.clear()
+        self.assertEqual(len(self.index.find_properties("ex:knows")), 1)
+
+    def test_card_properties_are_grouped_and_sorted(self):
+        self.assertEqual(
+            [p.uri for p in self.index.card_properties_of("ex:Person")],
+            ["ex:knows", "ex:name", "ex:note"],
+        )
+        self.assertEqual(self.index.card_properties_of("ex:Unknown"), [])
+        self.assertEqual(self.index.card_properties_of(None), [])
+
+    def test_index_knows_when_the_model_changed(self):
+        self.assertTrue(self.index.is_current(self.model))
+        self.model.properties.append(_property("ex:new"))
+        self.assertFalse(self.index.is_current(self.model))
+        self.model.classes = list(self.model.classes)
+        self.assertFalse(ModelIndex(_FakeModel([], [])).is_current(self.model))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.nquads_upload import (  # noqa: E402
+    Chunk,
+    ChunkSizeController,
+    NQuadsReader,
+    _get_decision_log_path,
+    skolemize_nquads_line,
+)
+
+
+def _quads(count: int) -> bytes:
+    return "".join(f"<s{i:03d}> <p> \"é{i:03d}\" <g> .\n" for i in range(count)).encode("utf-8")
+
+
+class _CountingFile(io.BytesIO):
+    """Binary file recording the size of each read."""
+
+    def __init__(self, content: bytes) -> None:
+        super().__init__(content)
+        self.reads: list[int] = []
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return super().read(size)
+
+
+class TestNQuadsReader(unittest.TestCase):
+    def _take_all(self, reader: NQuadsReader, max_lines: int, max_bytes: int) -> list:
+        chunks = []
+        while (chunk := reader.take(max_lines, max_bytes)) is not None:
+            chunks.append(chunk)
+        return chunks
+
+    def test_reads_by_blocks_across_line_boundaries(self) -> None:
+        content = _quads(50)
+        file = _CountingFile(content)
+        reader = NQuadsReader(file, block_bytes=7)
+
+        chunks = self._take_all(reader, 8, 1 << 20)
+
+        self.assertTrue(all(size == 7 for size in file.reads))
+        self.assertEqual([8] * 6 + [2], [len(chunk.lines) for chunk in chunks])
+        self.assertEqual(
+            content.decode("utf-8").splitlines(),
+            [line for chunk in chunks for line in chunk.text.split("\n")],
+        )
+
+    def test_chunks_are_cut_by_bytes(self) -> None:
+        content = _quads(20)
+        line_bytes = len(content) // 20
+        reader = NQuadsReader(content)
+
+        chunks = self._take_all(reader, 1000, line_bytes * 3)
+
+        self.assertEqual([3] * 6 + [2], [len(chunk.lines) for chunk in chunks])
+
+    def test_offsets_follow_the_file(self) -> None:
+        content = b"<a> <p> <o> <g> .\r\n\n<b> <p> <o> <g> .\n<c> <p> <o> <g> ."
+        reader = NQuadsReader(content, block_bytes=4)
+
+        chunks = self._take_all(reader, 2, 1 << 20)
+
+        self.assertEqual([b"<a> <p> <o> <g> .", b"<b> <p> <o> <g> ."], chunks[0].lines)
+        self.assertEqual((0, content.index(b"<c>")), (chunks[0].start, chunks[0].end))
+        self.assertEqual((content.index(b"<c>"), len(content)), (chunks[1].start, chunks[1].end))
+        self.assertEqual(100, reader.percent_done)
+
+    def test_pushed_back_chunk_is_split_to_the_new_limit(self) -> None:
+        reader = NQuadsReader(_quads(10))
+
+        chunk = reader.take(8, 1 << 20)
+        reader.push_back(chunk)
+        head = reader.take(3, 1 << 20)
+        rest = self._take_all(reader, 3, 1 << 20)
+
+        self.assertEqual(chunk.lines[:3], head.lines)
+        self.assertEqual(head.end, rest[0].start)
+        self.assertEqual([3, 2, 2], [len(c.lines) for c in rest])
+
+
+class TestSkolemization(unittest.TestCase):
+    def test_blank_nodes_become_skolem_iris(self) -> None:
+        line = b'_:b1 <http://x/p> _:b-2.x <http://x/g> .'
+        self.assertEqual(
+            b'<urn:uuid:1#b1> <http://x/p> <urn:uuid:1#b-2.x> <http://x/g> .',
+            skolemize_nquads_line(line, "urn:uuid:1#"),
+        )
+
+    def test_literals_and_iris_are_kept(self) -> None:
+        line = b'<http://x/_:a> <http://x/p> "say \\"_:b\\" _:c"@en _:d.'
+        self.assertEqual(
+            b'<http://x/_:a> <http://x/p> "say \\"_:b\\" _:c"@en <s:d>.',
+            skolemize_nquads_line(line, "s:"),
+        )
+
+
+def _chunk(lines: int, line_bytes: int = 100) -> Chunk:
+    return Chunk([b"x"] * lines, 0, [line_bytes * (i + 1) for i in range(lines)])
+
+
+class TestChunkSizeController(unittest.TestCase):
+    def test_grows_while_throughput_does_not_drop(self) -> None:
+        sizes = ChunkSizeController(16)
+
+        sizes.on_success(_chunk(16), 1.0)
+        sizes.on_success(_chunk(18), 1.0)
+
+        self.assertEqual(20, sizes.lines)
+
+    def test_growth_is_capped(self) -> None:
+        sizes = ChunkSizeController(2, max_lines=3)
+
+        sizes.on_success(_chunk(2), 1.0)
+        sizes.on_success(_chunk(3), 1.0)
+
+        self.assertEqual(3, sizes.lines)
+
+    def test_holds_when_chunks_are_cut_by_bytes(self) -> None:
+        sizes = ChunkSizeController(16)
+
+        sizes.on_success(_chunk(5), 1.0)
+
+        self.assertEqual(16, sizes.lines)
+
+    def test_shrinks_on_slowdown_and_failures(self) -> None:
+        sizes = ChunkSizeController(16)
+
+        sizes.on_success(_chunk(16), 1.0)
+        sizes.on_success(_chunk(18), 10.0)
+        self.assertEqual(9, sizes.lines)
+
+        sizes.on_failure(_chunk(9), "413")
+        self.assertEqual(4, sizes.lines)
+
+    def test_decision_log_is_opt_in(self) -> None:
+        with mock.patch.dict(
+            os.environ, {"LOGRE_UPLOAD_DECISION_LOG": "", "LOGRE_CONFIG_HOME": "/tmp/logre"}
+        ):
+            self.assertIsNone(_get_decision_log_path())
+            os.environ["LOGRE_UPLOAD_DECISION_LOG"] = "1"
+            self.assertEqual(
+                Path("/tmp/logre/logs/upload-decisions.jsonl"), _get_decision_log_path()
+            )
+            os.environ["LOGRE_UPLOAD_DECISION_LOG"] = "/var/log/decisions.jsonl"
+            self.assertEqual(Path("/var/log/decisions.jsonl"), _get_decision_log_path())
+
+    def test_logs_decisions(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = Path(directory) / "logs" / "decisions.jsonl"
+            sizes = ChunkSizeController(8, technology="GraphDB", log_path=log_path)
+
+            sizes.on_success(_chunk(8), 0.5)
+            sizes.on_failure(_chunk(9), "timeout")
+
+            entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+
+        self.assertEqual(["grow", "shrink"], [entry["decision"] for entry in entries])
+        self.assertEqual(["throughput", "timeout"], [entry["reason"] for entry in entries])
+        self.assertEqual((8, 9), (entries[0]["lines_before"], entries[0]["lines_after"]))
+        self.assertEqual("GraphDB", entries[1]["technology"])
+        self.assertEqual(1600.0, entries[0]["bytes_per_second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import io
 import os
 import sys
+import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 
@@ -14,6 +18,8 @@ if str(SRC_DIR) not in sys.path:
 
 import graphly.schema.sparql as graphly_sparql  # noqa: E402
 import schema.sparql_technologies  # noqa: F401, E402
+from lib.turtle import TurtleSyntaxError  # noqa: E402
+from schema.sparql_technologies import upload_turtle_in_chunks  # noqa: E402
 
 
 class _FakeUploader:
@@ -35,7 +41,36 @@ class _FakeUploader:
             )
 
 
+class _SlowUploader:
+    """Uploader recording the lines it received and how many calls overlapped."""
+
+    def __init__(self, failing_line: str | None = None) -> None:
+        self.failing_line = failing_line
+        self.lines: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def upload_nquads_chunk(self, nquad_content: str) -> None:
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.02)
+            if self.failing_line and self.failing_line in nquad_content.splitlines():
+                raise HTTPError("500 Server Error")
+            with self._lock:
+                self.lines.extend(nquad_content.splitlines())
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
 class TestNQuadsAdaptiveUpload(unittest.TestCase):
+    def setUp(self):
+        # Do not write the decision log and journals of the test uploads in the config home
+        self._set_env(LOGRE_UPLOAD_DECISION_LOG="0", LOGRE_UPLOAD_JOURNAL="0")
+
     def test_reduces_chunk_size_on_http_413(self):
         previous = os.environ.get("LOGRE_NQUADS_CHUNK_LINES")
         os.environ["LOGRE_NQUADS_CHUNK_LINES"] = "8"
@@ -68,6 +103,214 @@ class TestNQuadsAdaptiveUpload(unittest.TestCase):
             else:
                 os.environ["LOGRE_NQUADS_CHUNK_LINES"] = previous
 
+    def test_streams_a_binary_file_in_chunks_bounded_by_bytes(self):
+        previous = os.environ.get("LOGRE_NQUADS_CHUNK_BYTES")
+        os.environ["LOGRE_NQUADS_CHUNK_BYTES"] = "100"
+        try:
+            uploader = _FakeUploader(max_lines=100)
+            line = "<s> <p> <o> <g> .\n"  # 19 bytes
+            file = io.BytesIO((line * 20).encode("utf-8"))
+
+            graphly_sparql.Sparql.upload_nquads(uploader, file)
+
+            self.assertEqual([6, 6, 6, 2], uploader.chunk_sizes)
+        finally:
+            if previous is None:
+                os.environ.pop("LOGRE_NQUADS_CHUNK_BYTES", None)
+            else:
+                os.environ["LOGRE_NQUADS_CHUNK_BYTES"] = previous
+
+    def _set_env(self, **values: str) -> None:
+        for name, value in values.items():
+            previous = os.environ.get(name)
+            os.environ[name] = value
+            if previous is None:
+                self.addCleanup(os.environ.pop, name, None)
+            else:
+                self.addCleanup(os.environ.__setitem__, name, previous)
+
+    def test_uploads_chunks_concurrently(self):
+        self._set_env(LOGRE_NQUADS_CHUNK_LINES="2", LOGRE_NQUADS_UPLOAD_WORKERS="4")
+        uploader = _SlowUploader()
+        lines = [f"<s{i}> <p> <o> <g> ." for i in range(20)]
+
+        graphly_sparql.Sparql.upload_nquads(uploader, "\n".join(lines))
+
+        self.assertEqual(sorted(lines), sorted(uploader.lines))
+        self.assertGreater(uploader.max_active, 1)
+        self.assertLessEqual(uploader.max_active, 4)
+
+    def test_reports_the_failing_chunk_error(self):
+        self._set_env(LOGRE_NQUADS_CHUNK_LINES="2", LOGRE_NQUADS_UPLOAD_WORKERS="3")
+        lines = [f"<s{i}> <p> <o> <g> ." for i in range(20)]
+        uploader = _SlowUploader(failing_line=lines[7])
+
+        with self.assertRaisesRegex(HTTPError, "500 Server Error"):
+            graphly_sparql.Sparql.upload_nquads(uploader, "\n".join(lines))
+
+        # Nothing is sent after the failure, and chunks in flight were waited for
+        self.assertEqual(0, uploader.active)
+        self.assertNotIn(lines[7], uploader.lines)
+        self.assertLess(len(uploader.lines), len(lines) - 2)
+
+    def test_shrinks_and_retries_on_timeout(self):
+        self._set_env(LOGRE_NQUADS_CHUNK_LINES="8")
+        sizes = []
+        received = []
+
+        class _TimingOutUploader:
+            def upload_nquads_chunk(self, nquad_content: str) -> None:
+                chunk = nquad_content.splitlines()
+                sizes.append(len(chunk))
+                if len(chunk) > 4:
+                    raise requests.exceptions.ReadTimeout("Read timed out")
+                received.extend(chunk)
+
+        lines = [f"<s{i}> <p> <o> <g> ." for i in range(12)]
+        graphly_sparql.Sparql.upload_nquads(_TimingOutUploader(), "\n".join(lines))
+
+        self.assertEqual([8, 4], sizes[:2])
+        self.assertEqual(sorted(lines), sorted(received))
+
+    def test_resumes_from_the_last_acknowledged_chunk(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self._set_env(
+            LOGRE_CONFIG_HOME=directory.name,
+            LOGRE_UPLOAD_JOURNAL="1",
+            LOGRE_NQUADS_CHUNK_LINES="2",
+        )
+        lines = [f"<s{i}> <p> <o> <g> ." for i in range(10)]
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+        uploader = _SlowUploader(failing_line=lines[6])
+
+        with self.assertRaisesRegex(HTTPError, "500 Server Error"):
+            graphly_sparql.Sparql.upload_nquads(uploader, io.BytesIO(content), name="x.nq")
+        sent = uploader.lines
+        self.assertEqual(lines[: len(sent)], sent)
+        self.assertLess(len(sent), 7)
+
+        uploader.failing_line = None
+        uploader.lines = []
+        graphly_sparql.Sparql.upload_nquads(
+            uploader, io.BytesIO(content), resume=True, name="x.nq"
+        )
+
+        self.assertEqual(lines[len(sent) :], uploader.lines)
+        # The journal of a complete upload is removed
+        self.assertEqual([], list(Path(directory.name, "uploads").glob("*.json")))
+
+    def test_retried_blank_nodes_are_the_same_nodes(self):
+        self._set_env(LOGRE_NQUADS_CHUNK_LINES="4")
+        uploader = _FakeUploader(max_lines=2)
+        received = []
+        send = uploader.upload_nquads_chunk
+        uploader.upload_nquads_chunk = lambda text: send(text) or received.extend(text.splitlines())
+        lines = [f"_:b{i // 2} <p> _:o{i} <g> ." for i in range(6)]
+
+        graphly_sparql.Sparql.upload_nquads(uploader, "\n".join(lines))
+
+        self.assertEqual(6, len(received))
+        self.assertFalse(any("_:" in line for line in received))
+        # A label shared by two chunks stays one node
+        subjects = [line.split(" ")[0] for line in received]
+        self.assertEqual(3, len(set(subjects)))
+
+    def test_resumed_blank_nodes_keep_their_skolem_iris(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self._set_env(
+            LOGRE_CONFIG_HOME=directory.name,
+            LOGRE_UPLOAD_JOURNAL="1",
+            LOGRE_NQUADS_CHUNK_LINES="2",
+        )
+        lines = [f"_:b{i} <p> <o> <g> ." for i in range(10)]
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+        received = []
+        failing = []
+
+        class _Uploader:
+            def upload_nquads_chunk(self, nquad_content: str) -> None:
+                if any(f"b{i}> " in nquad_content for i in failing):
+                    raise HTTPError("500 Server Error")
+                received.extend(nquad_content.splitlines())
+
+        graphly_sparql.Sparql.upload_nquads(_Uploader(), io.BytesIO(content), name="x.nq")
+        fresh = list(received)
+        received.clear()
+        graphly_sparql.Sparql.upload_nquads(_Uploader(), io.BytesIO(content), name="x.nq")
+        # A fresh upload of the same file gets new nodes
+        self.assertTrue(set(fresh).isdisjoint(received))
+
+        failing.append(6)
+        received.clear()
+        with self.assertRaises(HTTPError):
+            graphly_sparql.Sparql.upload_nquads(_Uploader(), io.BytesIO(content), name="x.nq")
+        first = list(received)
+        failing.clear()
+        received.clear()
+        graphly_sparql.Sparql.upload_nquads(
+            _Uploader(), io.BytesIO(content), resume=True, name="x.nq"
+        )
+        skolem_base = first[0].split("b0>")[0]
+        self.assertIn(skolem_base + "b9> <p> <o> <g> .", received)
+        self.assertTrue(all(line.startswith(skolem_base) for line in received))
+
+    def test_uploads_turtle_in_chunks_of_the_graph(self):
+        self._set_env(LOGRE_NQUADS_CHUNK_LINES="2")
+        uploader = _SlowUploader()
+        uploader.upload_nquads = graphly_sparql.Sparql.upload_nquads.__get__(uploader)
+        graph = type("_Graph", (), {"sparql": uploader, "uri": "http://example.org/g"})()
+        turtle = (
+            "@prefix ex: <http://example.org/> .\n"
+            "ex:a ex:p _:x , [ ex:q 1 ] .\n"
+            "ex:b ex:p ex:c .\n"
+            "_:x ex:r ex:d .\n"
+        )
+
+        upload_turtle_in_chunks(graph, turtle)
+
+        self.assertEqual(5, len(uploader.lines))
+        self.assertTrue(all(line.endswith(" <http://example.org/g> .") for line in uploader.lines))
+        # The labelled blank node is the same (skolem) IRI in both chunks
+        skolem = uploader.lines[0].split(" ")[2]
+        self.assertIn("/.well-known/genid/", skolem)
+        self.assertTrue(uploader.lines[-1].startswith(skolem + " "))
+
+    def test_relative_iris_are_resolved_against_the_graph(self):
+        uploader = _SlowUploader()
+        uploader.upload_nquads = graphly_sparql.Sparql.upload_nquads.__get__(uploader)
+        graph = type("_Graph", (), {"sparql": uploader, "uri": "http://example.org/g"})()
+
+        upload_turtle_in_chunks(graph, "<a> <p> <#b> .\n@base <http://other.org/> .\n<c> <p> <d> .\n")
+
+        self.assertEqual(
+            [
+                "<http://example.org/a> <http://example.org/p> <http://example.org/g#b> <http://example.org/g> .",
+                "<http://other.org/c> <http://other.org/p> <http://other.org/d> <http://example.org/g> .",
+            ],
+            uploader.lines,
+        )
+
+    def test_unresolvable_relative_iris_upload_nothing(self):
+        uploader = _SlowUploader()
+        uploader.upload_nquads = graphly_sparql.Sparql.upload_nquads.__get__(uploader)
+        graph = type("_Graph", (), {"sparql": uploader, "uri": ""})()
+
+        with self.assertRaisesRegex(TurtleSyntaxError, "Relative IRI <a>"):
+            upload_turtle_in_chunks(graph, "<http://example.org/s> <http://example.org/p> <a> .\n")
+        self.assertEqual([], uploader.lines)
+
+    def test_invalid_turtle_uploads_nothing(self):
+        uploader = _SlowUploader()
+        uploader.upload_nquads = graphly_sparql.Sparql.upload_nquads.__get__(uploader)
+        graph = type("_Graph", (), {"sparql": uploader, "uri": "http://example.org/g"})()
+        turtle = "@prefix ex: <http://example.org/> .\nex:a ex:p ex:b .\nex:c ex:p\n"
+
+        with self.assertRaises(TurtleSyntaxError):
+            upload_turtle_in_chunks(graph, turtle)
+        self.assertEqual([], uploader.lines)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,133 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.prefix_index import (  # noqa: E402
+    PrefixIndex,
+    get_map_index,
+    get_prefix_index,
+    invalidate_prefix_index,
+)
+
+
+class _Prefix:
+    def __init__(self, short: str, long: str) -> None:
+        self.short = short
+        self.long = long
+
+
+class _LinearPrefixes:
+    """Reference implementation: scan prefixes in order, first match wins."""
+
+    def __init__(self, prefixes, longest: bool = False, safe_only: bool = False):
+        self.prefix_list = prefixes
+        self.longest = longest
+        self.safe_only = safe_only
+        self.calls = 0
+
+    def __iter__(self):
+        return iter(self.prefix_list)
+
+    def shorten(self, uri: str) -> str:
+        self.calls += 1
+        candidates = [p for p in self.prefix_list if uri.startswith(p.long)]
+        if self.longest:
+            candidates.sort(key=lambda p: -len(p.long))
+        for prefix in candidates:
+            local = uri[len(prefix.long) :]
+            if self.safe_only and ("/" in local or "#" in local):
+                continue
+            return f"{prefix.short}:{local}"
+        return uri
+
+    def lengthen(self, uri: str) -> str:
+        for prefix in self.prefix_list:
+            if uri.startswith(prefix.short + ":"):
+                return prefix.long + uri[len(prefix.short) + 1 :]
+        return uri
+
+    def shorts(self):
+        return [p.short for p in self.prefix_list]
+
+
+NAMESPACES = [
+    ("ex", "http://example.org/"),
+    ("exr", "http://example.org/resource/"),
+    ("exo", "http://example.org/ontology/"),
+    ("dup", "http://example.org/resource/"),
+    ("rdf", "http://www.w3.org/1999/02/22-rdf-syntax-ns#"),
+    ("rdfs", "http://www.w3.org/2000/01/rdf-schema#"),
+    ("w3", "http://www.w3.org/"),
+    ("a", "http://a.org/b"),
+    ("ab", "http://a.org/bc/"),
+]
+
+
+def _random_uris(count: int):
+    rng = random.Random(4)
+    bases = [long for _, long in NAMESPACES] + ["http://zz.org/", "urn:x:", "http://a.org/"]
+    locals_ = ["", "x", "Thing_1", "a/b", "c#d", "resource", "ontology/E5", "c/"]
+    return [rng.choice(bases) + rng.choice(locals_) for _ in range(count)]
+
+
+class TestPrefixIndex(unittest.TestCase):
+    def _check_identical(self, **options):
+        reference = _LinearPrefixes(
+            [_Prefix(short, long) for short, long in NAMESPACES], **options
+        )
+        index = PrefixIndex.from_prefixes(reference)
+        for uri in _random_uris(2000) + ["<http://example.org/x>", "rdf:type"]:
+            self.assertEqual(reference.shorten(uri), index.shorten(uri), uri)
+        for short, _ in NAMESPACES:
+            uri = f"{short}:thing"
+            self.assertEqual(reference.lengthen(uri), index.lengthen(uri))
+
+    def test_identical_to_first_match(self):
+        self._check_identical()
+
+    def test_identical_to_longest_match(self):
+        self._check_identical(longest=True)
+
+    def test_identical_when_reference_rejects_some_local_names(self):
+        self._check_identical(safe_only=True)
+
+    def test_does_not_delegate_common_uris(self):
+        reference = _LinearPrefixes(
+            [_Prefix(short, long) for short, long in NAMESPACES]
+        )
+        index = PrefixIndex.from_prefixes(reference)
+        reference.calls = 0
+        for i in range(100):
+            index.shorten(f"http://example.org/resource/i{i}")
+            index.shorten(f"http://zz.org/i{i}")
+        self.assertEqual(0, reference.calls)
+
+    def test_map_index_first_declared_wins(self):
+        index = get_map_index(
+            {"ex": "http://example.org/", "exr": "http://example.org/resource/"}
+        )
+        self.assertEqual("ex:resource/a", index.shorten("http://example.org/resource/a"))
+        self.assertEqual("http://zz.org/a", index.shorten("http://zz.org/a"))
+        self.assertEqual("ex:", index.shorten("http://example.org/"))
+
+    def test_rebuilt_when_invalidated(self):
+        prefixes = _LinearPrefixes([_Prefix("ex", "http://example.org/")])
+        first = get_prefix_index(prefixes)
+        self.assertIs(first, get_prefix_index(prefixes))
+
+        prefixes.prefix_list[0].short = "new"
+        invalidate_prefix_index(prefixes)
+        second = get_prefix_index(prefixes)
+        self.assertIsNot(first, second)
+        self.assertEqual("new:a", second.shorten("http://example.org/a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.query_cache import (  # noqa: E402
+    QueryResultCache,
+    is_select_query,
+    is_update_query,
+    referenced_graphs,
+)
+
+
+PREFIX_MAP = {"base": "http://example.org/"}
+
+
+class TestQueryAnalysis(unittest.TestCase):
+    def test_detects_updates_after_prologue(self):
+        self.assertTrue(
+            is_update_query("PREFIX ex: <http://ex/>\n# comment\nINSERT DATA { }")
+        )
+        self.assertTrue(is_update_query("delete where { ?s ?p ?o }"))
+        self.assertFalse(is_update_query("PREFIX ex: <http://ex/>\nSELECT * { }"))
+
+    def test_detects_select_queries(self):
+        self.assertTrue(is_select_query("PREFIX ex: <http://ex/>\nselect * { }"))
+        self.assertFalse(is_select_query("ASK { ?s ?p ?o }"))
+        self.assertFalse(is_select_query("CONSTRUCT WHERE { ?s ?p ?o }"))
+
+    def test_referenced_graphs(self):
+        text = "SELECT * { GRAPH <http://example.org/data> { ?s ?p ?o } GRAPH base:meta { ?s ?p ?o } }"
+        self.assertEqual(
+            frozenset({"http://example.org/data", "http://example.org/meta"}),
+            referenced_graphs(text, PREFIX_MAP),
+        )
+        self.assertIsNone(referenced_graphs("SELECT ?g { GRAPH ?g { ?s ?p ?o } }"))
+        self.assertIsNone(referenced_graphs("SELECT * { ?s ?p ?o }"))
+
+    def test_default_graph_patterns_may_touch_any_graph(self):
+        # On union default graph stores, patterns outside GRAPH read every graph
+        mixed = "SELECT * { GRAPH <http://g/data> { ?s ?p ?o } ?o a ?class }"
+        self.assertIsNone(referenced_graphs(mixed))
+        self.assertIsNone(
+            referenced_graphs("SELECT * { GRAPH <http://g/data> { ?s ?p ?o } OPTIONAL { ?o ex:p [] } }")
+        )
+        self.assertIsNone(
+            referenced_graphs("INSERT { ?s ?p ?o } WHERE { GRAPH <http://g/data> { ?s ?p ?o } }")
+        )
+        # Not patterns: projections, filters, values, construct templates
+        data = frozenset({"http://g/data"})
+        for text in (
+            'PREFIX ex: <http://ex/>\nSELECT ?s (COUNT(?o) AS ?n) WHERE {\n'
+            '  VALUES ?s { <http://ex/a> ex:b }\n'
+            '  GRAPH <http://g/data> { ?s ?p ?o . { SELECT ?o WHERE { ?o ?q ?r } } }\n'
+            '  FILTER(?o != "a } b" && isIRI(?s)) BIND(ex:f(?s) AS ?x)\n'
+            "} GROUP BY ?s ORDER BY DESC(?n) LIMIT 10",
+            "CONSTRUCT { ?s ?p ?o } WHERE { GRAPH <http://g/data> { ?s ?p ?o } }",
+            "SELECT * FROM <http://g/data> WHERE { ?s ?p ?o }",
+            "WITH <http://g/data> DELETE { ?s ?p ?o } WHERE { ?s ?p ?o }",
+            "INSERT DATA { GRAPH <http://g/data> { <http://ex/a> a <http://ex/B> } }",
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(data, referenced_graphs(text))
+
+
+class TestQueryResultCache(unittest.TestCase):
+    def test_returns_copies(self):
+        cache = QueryResultCache(max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("q", [{"s": "base:a"}], "ep", {"g"})
+        _, first = cache.get("q")
+        first[0]["s"] = "changed"
+        hit, second = cache.get("q")
+        self.assertTrue(hit)
+        self.assertEqual([{"s": "base:a"}], second)
+
+    def test_invalidates_only_touched_graphs(self):
+        cache = QueryResultCache(max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("data", [], "ep", {"http://g/data"})
+        cache.put("meta", [], "ep", {"http://g/meta"})
+        cache.put("any", [], "ep", None)
+        cache.put("other", [], "other-ep", {"http://g/data"})
+
+        self.assertEqual(2, cache.invalidate("ep", ["http://g/data"]))
+        self.assertFalse(cache.get("data")[0])
+        self.assertFalse(cache.get("any")[0])
+        self.assertTrue(cache.get("meta")[0])
+        self.assertTrue(cache.get("other")[0])
+
+    def test_skips_results_read_before_a_write(self):
+        cache = QueryResultCache(max_bytes=1024 * 1024, ttl_seconds=60)
+        generation = cache.generation("ep")
+        cache.invalidate("ep", ["http://g/data"])
+        cache.put("q", [], "ep", {"http://g/data"}, generation)
+        self.assertFalse(cache.get("q")[0])
+
+    def test_expires_entries(self):
+        cache = QueryResultCache(max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("q", [], "ep")
+        cache.ttl_seconds = 0.000001
+        self.assertFalse(cache.get("q")[0])
+
+    def test_evicts_least_recently_used_over_budget(self):
+        row = [{"s": "x" * 100}]
+        cache = QueryResultCache(max_bytes=4000, ttl_seconds=60)
+        cache.put("a", row, "ep")
+        cache.put("b", row, "ep")
+        cache.get("a")
+        for index in range(20):
+            cache.put(f"c{index}", row, "ep")
+        self.assertLessEqual(cache.stats()["bytes"], 4000)
+        self.assertFalse(cache.get("b")[0])
+        self.assertGreater(cache.stats()["evictions"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
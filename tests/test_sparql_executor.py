@@ -0,0 +1,118 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from requests import Response
+from requests.exceptions import HTTPError
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.errors import get_HTTP_ERROR_message  # noqa: E402
+from lib.sparql_executor import QueryExecutor  # noqa: E402
+
+
+class _InFlight:
+    """Slow call recording how many calls run at the same time."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def call(self, value, delay=0.05):
+        def run():
+            with self.lock:
+                self.current += 1
+                self.peak = max(self.peak, self.current)
+            time.sleep(delay)
+            with self.lock:
+                self.current -= 1
+            return value
+
+        return run
+
+
+class TestQueryExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = QueryExecutor(max_concurrency=3)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_results_keep_call_order(self):
+        tracker = _InFlight()
+        calls = [tracker.call(i, delay=0.05 - i * 0.01) for i in range(5)]
+        self.assertEqual(self.executor.run("http://a:80", calls), [0, 1, 2, 3, 4])
+
+    def test_calls_run_concurrently_up_to_the_cap(self):
+        tracker = _InFlight()
+        start = time.perf_counter()
+        self.executor.run("http://a:80", [tracker.call(i) for i in range(9)])
+        elapsed = time.perf_counter() - start
+        self.assertEqual(tracker.peak, 3)
+        self.assertLess(elapsed, 9 * 0.05)
+
+    def test_cap_is_shared_by_batches_of_one_endpoint(self):
+        tracker = _InFlight()
+        threads = [
+            threading.Thread(
+                target=self.executor.run,
+                args=("http://a:80", [tracker.call(i) for i in range(4)]),
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(tracker.peak, 3)
+
+    def test_http_error_is_raised_unchanged(self):
+        response = Response()
+        response.status_code = 400
+        response.reason = "Bad Request"
+        response._content = b"MALFORMED QUERY"
+        error = HTTPError("400 Client Error", response=response)
+
+        def failing():
+            raise error
+
+        tracker = _InFlight()
+        with self.assertRaises(HTTPError) as context:
+            self.executor.run("http://a:80", [tracker.call(0), failing, tracker.call(2)])
+        self.assertIs(context.exception, error)
+        message = get_HTTP_ERROR_message(context.exception)
+        self.assertIn("400", message)
+        self.assertIn("MALFORMED QUERY", message)
+
+    def test_first_failing_call_wins(self):
+        def fail(message, delay):
+            def run():
+                time.sleep(delay)
+                raise ValueError(message)
+
+            return run
+
+        with self.assertRaises(ValueError) as context:
+            self.executor.run("http://a:80", [fail("first", 0.05), fail("second", 0)])
+        self.assertEqual(str(context.exception), "first")
+
+    def test_nested_batches_run_inline(self):
+        executor = QueryExecutor(max_concurrency=1, max_workers=1)
+        try:
+            inner = lambda: executor.run("http://a:80", [lambda: 1, lambda: 2])
+            self.assertEqual(
+                executor.run("http://a:80", [inner, inner]), [[1, 2], [1, 2]]
+            )
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
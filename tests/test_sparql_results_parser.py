@@ -1,3 +1,4 @@
+import json
 import sys
 import unittest
 from pathlib import Path
@@ -11,7 +12,14 @@ SRC_DIR = ROOT_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from lib.sparql_results import parse_sparql_json_response  # noqa: E402
+from lib.sparql_results import (  # noqa: E402
+    batch_rows,
+    iter_sparql_json_rows,
+    parse_sparql_json_dataframe,
+    parse_sparql_json_response,
+    read_sparql_json_dataframe,
+    read_sparql_tsv_dataframe,
+)
 
 
 class TestSparqlResultsParser(unittest.TestCase):
@@ -120,5 +128,176 @@ class TestSparqlResultsParser(unittest.TestCase):
         self.assertNotIn("valeur_num", rows[1])
 
 
+class TestSparqlResultsStreamingParser(unittest.TestCase):
+    response_json = {
+        "head": {"vars": ["s", "label", "n"]},
+        "results": {
+            "bindings": [
+                {
+                    "s": {"type": "uri", "value": f"http://example.org/resource/{i}"},
+                    "label": {"type": "literal", "value": f"é{i} \\ \"q\""},
+                    "n": {
+                        "type": "literal",
+                        "datatype": "http://www.w3.org/2001/XMLSchema#integer",
+                        "value": str(i),
+                    },
+                }
+                for i in range(50)
+            ]
+        },
+    }
+    prefixes = Prefixes([Prefix("ex", "http://example.org/resource/")])
+
+    @staticmethod
+    def _chunks(body: bytes, size: int):
+        return (body[i : i + size] for i in range(0, len(body), size))
+
+    def test_matches_full_parser_whatever_the_chunk_size(self):
+        body = json.dumps(self.response_json, indent=1, ensure_ascii=False).encode()
+        expected = parse_sparql_json_response(self.response_json, self.prefixes)
+
+        for size in (1, 7, 64, len(body)):
+            rows = list(iter_sparql_json_rows(self._chunks(body, size), self.prefixes))
+            self.assertEqual(expected, rows)
+            self.assertEqual(["s", "label", "n"], list(rows[0].keys()))
+
+    def test_stops_reading_when_caller_stops(self):
+        body = json.dumps(self.response_json).encode()
+        pulled = []
+
+        def chunks():
+            for chunk in self._chunks(body, 16):
+                pulled.append(chunk)
+                yield chunk
+
+        rows = iter_sparql_json_rows(chunks(), self.prefixes)
+        first = next(rows)
+        rows.close()
+
+        self.assertEqual("ex:0", first["s"])
+        self.assertLess(sum(len(chunk) for chunk in pulled), len(body) // 4)
+
+    def test_results_before_head_and_empty_bindings(self):
+        body = b'{"results": {"bindings": []}, "head": {"vars": ["a"]}}'
+        self.assertEqual([], list(iter_sparql_json_rows([body], Prefixes())))
+
+    def test_batches(self):
+        rows = [{"i": i} for i in range(5)]
+        self.assertEqual([2, 2, 1], [len(batch) for batch in batch_rows(rows, 2)])
+
+
+class TestSparqlResultsColumnarParser(unittest.TestCase):
+    prefixes = Prefixes([Prefix("ex", "http://example.org/resource/")])
+
+    @staticmethod
+    def _integer(value: str) -> dict:
+        return {
+            "type": "literal",
+            "datatype": "http://www.w3.org/2001/XMLSchema#integer",
+            "value": value,
+        }
+
+    def test_matches_row_mode(self):
+        response_json = {
+            "head": {"vars": ["s", "label", "n"]},
+            "results": {
+                "bindings": [
+                    {
+                        "s": {"type": "uri", "value": "http://example.org/resource/a"},
+                        "n": self._integer("1"),
+                    },
+                    {
+                        "label": {"type": "literal", "value": "b"},
+                        "s": {"type": "uri", "value": "http://other.org/b"},
+                        "n": self._integer("x"),
+                    },
+                ]
+            },
+        }
+
+        df = parse_sparql_json_dataframe(response_json, self.prefixes)
+        rows = parse_sparql_json_response(response_json, self.prefixes)
+
+        self.assertEqual(["s", "label", "n"], list(df.columns))
+        self.assertEqual(["ex:a", "http://other.org/b"], df["s"].tolist())
+        self.assertEqual([1, "x"], df["n"].tolist())
+        expected = pd.DataFrame(rows)
+        self.assertEqual(expected["label"].isna().tolist(), df["label"].isna().tolist())
+        self.assertEqual("b", df["label"][1])
+
+    def test_fully_bound_integers_are_vectorized(self):
+        response_json = {
+            "head": {"vars": ["n", "m"]},
+            "results": {
+                "bindings": [
+                    {"n": self._integer(str(i))}
+                    if i % 2
+                    else {"n": self._integer(str(i)), "m": self._integer(str(i))}
+                    for i in range(10)
+                ]
+            },
+        }
+
+        df = parse_sparql_json_dataframe(response_json, self.prefixes)
+
+        self.assertEqual("i", df["n"].dtype.kind)
+        self.assertEqual(list(range(10)), df["n"].tolist())
+        self.assertEqual([0, None, 2], df["m"].tolist()[:3])
+
+    def test_streamed_and_empty_results(self):
+        body = json.dumps(
+            {
+                "head": {"vars": ["a", "b"]},
+                "results": {"bindings": [{"b": {"type": "literal", "value": "y"}}]},
+            }
+        ).encode()
+        df = read_sparql_json_dataframe([body[:10], body[10:]], Prefixes())
+        self.assertEqual(["a", "b"], list(df.columns))
+        self.assertEqual(["y"], df["b"].tolist())
+
+        empty = parse_sparql_json_dataframe(
+            {"head": {"vars": ["a"]}, "results": {"bindings": []}}, Prefixes()
+        )
+        self.assertTrue(empty.empty)
+        self.assertEqual(["a"], list(empty.columns))
+
+
+class TestSparqlResultsTsvParser(unittest.TestCase):
+    prefixes = Prefixes([Prefix("ex", "http://example.org/resource/")])
+
+    def test_decodes_terms_like_json(self):
+        body = (
+            "?s\t?label\t?n\t?b\n"
+            '<http://example.org/resource/a>\t"a\\tb \\"q\\" \\u00e9"@en\t'
+            '"3"^^<http://www.w3.org/2001/XMLSchema#integer>\t_:b0\n'
+            '<http://other.org/b>\t"x"^^<http://www.w3.org/2001/XMLSchema#string>\t42\t1.5\n'
+            "<http://other.org/c>\t\t\ttrue\n"
+        ).encode()
+
+        df = read_sparql_tsv_dataframe(body, self.prefixes)
+
+        self.assertEqual(["s", "label", "n", "b"], list(df.columns))
+        self.assertEqual(
+            ["ex:a", "http://other.org/b", "http://other.org/c"], df["s"].tolist()
+        )
+        self.assertEqual('a\tb "q" é', df["label"][0])
+        self.assertEqual("x", df["label"][1])
+        self.assertTrue(pd.isna(df["label"][2]))
+        self.assertEqual([3, 42, None], df["n"].tolist())
+        self.assertEqual(["b0", "1.5", "true"], df["b"].tolist())
+
+    def test_integer_columns_and_empty_results(self):
+        df = read_sparql_tsv_dataframe(b"?count\n1\n2\n", Prefixes())
+        self.assertEqual("i", df["count"].dtype.kind)
+
+        empty = read_sparql_tsv_dataframe(b"?a\t?b\n", Prefixes())
+        self.assertTrue(empty.empty)
+        self.assertEqual(["a", "b"], list(empty.columns))
+
+    def test_keeps_fully_unbound_rows(self):
+        df = read_sparql_tsv_dataframe(b"?a\n1\n\n2\n", Prefixes())
+        self.assertEqual([1, None, 2], df["a"].tolist())
+
+
 if __name__ == "__main__":
     unittest.main()
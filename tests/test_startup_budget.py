@@ -0,0 +1,113 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import List, Tuple
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+
+# Modules every page imports (directly or not) before its first render
+CORE_MODULES = ["schema.data_bundle", "lib.sparql_results", "lib.stats"]
+# Heavy modules only needed once a table or a chart is shown
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "pyvis"]
+
+
+def _get_budget_ms(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _parse_import_times(stderr: str) -> List[Tuple[int, str]]:
+    """Return the (depth, module) of each `-X importtime` line, in print order."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.rstrip().endswith("imported package"):
+            continue
+        name = line.split("|", 2)[2]
+        # One space, then two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((depth, name.strip()))
+    return imports
+
+
+def _get_import_chain(imports: List[Tuple[int, str]], index: int) -> List[str]:
+    """Return the modules from a top-level import down to the one at `index`."""
+    # Modules are printed once imported, so after those they import
+    depth, name = imports[index]
+    chain = [name]
+    for parent_depth, parent in imports[index + 1 :]:
+        if parent_depth < depth:
+            chain.insert(0, parent)
+            depth = parent_depth
+    return chain
+
+
+class TestStartupBudget(unittest.TestCase):
+    def _import_in_subprocess(self) -> dict:
+        script = (
+            "import json, sys, time\n"
+            f"sys.path.insert(0, {str(SRC_DIR)!r})\n"
+            "start = time.perf_counter()\n"
+            f"for name in {CORE_MODULES!r}:\n"
+            "    __import__(name)\n"
+            "elapsed = (time.perf_counter() - start) * 1000\n"
+            "print(json.dumps({'elapsed_ms': elapsed}))\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            cwd=str(ROOT_DIR),
+            env=os.environ.copy(),
+            timeout=120,
+        )
+        if completed.returncode != 0:
+            errors = [
+                line for line in completed.stderr.splitlines() if not line.startswith("import time:")
+            ]
+            self.fail("core modules failed to import: " + "\n".join(errors)[-500:])
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        imports = _parse_import_times(completed.stderr)
+        result["heavy"] = {}
+        for index, (_, name) in enumerate(imports):
+            package = name.split(".")[0]
+            if package in HEAVY_MODULES and package not in result["heavy"]:
+                result["heavy"][package] = " -> ".join(_get_import_chain(imports, index))
+        return result
+
+    def test_core_modules_do_not_import_heavy_modules(self) -> None:
+        result = self._import_in_subprocess()
+        self.assertEqual(
+            result["heavy"],
+            {},
+            "heavy modules imported at startup:\n" + "\n".join(result["heavy"].values()),
+        )
+
+    def test_core_modules_import_within_budget(self) -> None:
+        budget = _get_budget_ms("LOGRE_STARTUP_IMPORT_BUDGET_MS", 3000)
+        result = self._import_in_subprocess()
+        self.assertLess(result["elapsed_ms"], budget)
+
+    def test_first_render_within_budget(self) -> None:
+        try:
+            from streamlit.testing.v1 import AppTest
+        except ImportError:
+            self.skipTest("streamlit is not installed")
+
+        budget = _get_budget_ms("LOGRE_STARTUP_RENDER_BUDGET_MS", 10000)
+        start = time.perf_counter()
+        app = AppTest.from_file(str(SRC_DIR / "server.py"), default_timeout=budget / 1000)
+        app.run()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.assertLess(elapsed, budget)
+
+
+if __name__ == "__main__":
+    unittest.main()
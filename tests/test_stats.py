@@ -0,0 +1,282 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from requests.exceptions import ReadTimeout  # noqa: E402
+
+from lib import stats  # noqa: E402
+from lib.query_cache import get_endpoint_identity, get_query_cache  # noqa: E402
+
+
+class _FakeBundle:
+    """Bundle answering the distribution queries with canned rows."""
+
+    def __init__(self) -> None:
+        self.key = "test_bundle"
+        self.endpoint = SimpleNamespace(url="http://stats.test/repositories/x", username=None)
+        self.data = SimpleNamespace(uri="base:data", sparql_begin="", sparql_end="")
+        self.model = SimpleNamespace(
+            type_property="rdf:type",
+            label_property="rdfs:label",
+            comment_property="rdfs:comment",
+        )
+        self.model_index = SimpleNamespace(
+            find_class=lambda uri: SimpleNamespace(get_text=lambda: f"Class {uri}")
+            if uri == "ex:Person"
+            else None,
+            find_properties=lambda uri: [SimpleNamespace(label="knows")]
+            if uri == "ex:knows"
+            else [],
+        )
+        self.prefix_index = SimpleNamespace(
+            shorten=lambda uri: uri,
+            lengthen=lambda uri: uri.replace("ex:", "http://example.org/").replace(
+                "base:", "http://example.org/base/"
+            ),
+        )
+        self.base_uri = "http://example.org/base/"
+        self.metadata = SimpleNamespace(
+            uri="base:metadata",
+            sparql_begin="GRAPH <http://example.org/base/metadata> {",
+            sparql_end="}",
+        )
+        self.void_rows = []
+        self.batches = []
+        self.reads = []
+        self.updates = []
+
+    def run(self, text):
+        if "VoID statistics update" in text:
+            self.updates.append(text)
+            return None
+        self.reads.append(text)
+        return self.void_rows
+
+    def gather(self, *calls):
+        return [call() for call in calls]
+
+    def run_many(self, texts):
+        self.batches.append(texts)
+        return [
+            [{"class": "ex:Book", "count": 1}, {"class": "ex:Person", "count": 3}],
+            [
+                {"property": "rdf:type", "count": 4},
+                {"property": "ex:knows", "count": 5},
+                {"property": "ex:title", "count": 1},
+            ],
+        ]
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        stats.clear_stats()
+        self.bundle = _FakeBundle()
+
+    def test_snapshot_is_derived_from_two_queries(self):
+        snapshot = stats.get_stats(self.bundle)
+        self.assertEqual(len(self.bundle.batches), 1)
+        self.assertEqual(len(self.bundle.batches[0]), 2)
+        self.assertEqual(
+            snapshot["counts"],
+            {"entities": 4, "classes": 2, "properties": 3, "triples": 10},
+        )
+        self.assertEqual(
+            [(r["label"], r["count"], r["share"]) for r in snapshot["classes"]],
+            [("Class ex:Person", 3, 75.0), ("ex:Book", 1, 25.0)],
+        )
+        self.assertEqual(snapshot["properties"][0]["label"], "knows")
+
+    def test_widgets_share_the_snapshot(self):
+        classes = stats.summarize_classes(self.bundle, limit=1)
+        properties = stats.summarize_properties(self.bundle)
+        self.assertEqual(len(self.bundle.batches), 1)
+        self.assertEqual((classes["total"], len(classes["top"])), (4, 1))
+        # Type, label and comment are left out of the property distribution
+        self.assertEqual(properties["total"], 6)
+        self.assertEqual([r["uri"] for r in properties["rows"]], ["ex:knows", "ex:title"])
+
+    def test_snapshot_is_computed_again_after_a_write(self):
+        first = stats.get_stats(self.bundle)
+        get_query_cache().invalidate(
+            get_endpoint_identity(self.bundle.endpoint.url), ["base:data"]
+        )
+        # The last snapshot is served while the new one is computed in the background
+        self.assertIs(stats.get_stats(self.bundle), first)
+        stats.wait_stats_refresh(timeout=5)
+        self.assertIsNot(stats.get_stats(self.bundle), first)
+        self.assertEqual(len(self.bundle.batches), 2)
+        stats.get_stats(self.bundle, refresh=True)
+        self.assertEqual(len(self.bundle.batches), 3)
+
+    def test_statistics_are_materialized_as_void(self):
+        snapshot = stats.get_stats(self.bundle)
+        dataset = "http://example.org/base/data"
+        # The previous description is replaced in a single update request
+        (update,) = self.bundle.updates
+        operations = update.split("} ;\n")
+        self.assertEqual(len(operations), 4)
+        self.assertIn(
+            f"<{dataset}> <http://rdfs.org/ns/void#classPartition>|"
+            "<http://rdfs.org/ns/void#propertyPartition> ?partition",
+            operations[0],
+        )
+        # Only the VoID triples of the data graph IRI are deleted
+        self.assertIn('STRSTARTS(STR(?p), "http://rdfs.org/ns/void#")', operations[2])
+        # The new description is inserted once, whatever the previous one
+        self.assertIn("INSERT DATA {", operations[3])
+        self.assertNotIn("OPTIONAL", update)
+        turtle = operations[3]
+        self.assertIn(f"<{dataset}> a <http://rdfs.org/ns/void#Dataset>", turtle)
+        self.assertIn(
+            '<http://rdfs.org/ns/void#triples> "10"^^<http://www.w3.org/2001/XMLSchema#integer>',
+            turtle,
+        )
+        self.assertEqual(turtle.count("void#classPartition>"), 2)
+        self.assertEqual(turtle.count("void#propertyPartition>"), 3)
+        self.assertIn("<http://example.org/Person>", turtle)
+        self.assertGreater(snapshot["computed_at"], 0)
+
+    def test_materialized_statistics_are_read_instead_of_scanning(self):
+        modified = "2026-01-02T03:04:05+00:00"
+        self.bundle.void_rows = [
+            {"modified": modified, "kind": "class", "item": "ex:Person", "count": 7},
+            {"modified": modified, "kind": "property", "item": "ex:knows", "count": 2},
+        ]
+        snapshot = stats.get_stats(self.bundle)
+        self.assertEqual(self.bundle.batches, [])
+        self.assertEqual(
+            snapshot["counts"],
+            {"entities": 7, "classes": 1, "properties": 1, "triples": 2},
+        )
+        self.assertEqual(snapshot["computed_at"], 1767323045.0)
+        # Several descriptions yield the latest date and one count per item
+        self.assertIn("MAX(?modified_)", self.bundle.reads[0])
+        self.assertIn("GROUP BY ?kind ?item", self.bundle.reads[0])
+        # A refresh scans the data graph and writes the statistics again
+        stats.get_stats(self.bundle, refresh=True)
+        self.assertEqual(len(self.bundle.batches), 1)
+        self.assertEqual(len(self.bundle.updates), 1)
+
+    def test_statistics_are_not_stored_without_a_metadata_graph(self):
+        for metadata_uri in (None, "base:data"):
+            stats.clear_stats()
+            self.bundle.metadata.uri = metadata_uri
+            snapshot = stats.get_stats(self.bundle)
+            self.assertFalse(snapshot["stored"])
+            self.assertEqual(self.bundle.reads, [])
+            self.assertEqual(self.bundle.updates, [])
+
+
+class _HugeBundle(_FakeBundle):
+    """Bundle whose grouped distribution queries time out."""
+
+    totals_time_out = False
+    sample_times_out = False
+
+    def run(self, text):
+        if "subject sample" in text:
+            self.reads.append(text)
+            if self.sample_times_out:
+                raise ReadTimeout("timed out")
+            return [{"iri": f"http://example.org/s{i}"} for i in range(100)]
+        return super().run(text)
+
+    def run_many(self, texts):
+        self.batches.append(texts)
+        if "sampled class distribution" in texts[0]:
+            subjects = [f"http://example.org/s{i}" for i in range(100)]
+            return [
+                [
+                    {"instance": iri, "class": "ex:Person" if i < 75 else "ex:Book", "count": 1}
+                    for i, iri in enumerate(subjects)
+                ],
+                [{"subject": iri, "property": "rdf:type", "count": 1} for iri in subjects]
+                + [{"subject": iri, "property": "ex:knows", "count": 3} for iri in subjects],
+            ]
+        if "typing total" in texts[0] and not self.totals_time_out:
+            return [[{"count": 10000}], [{"count": 80000}]]
+        raise ReadTimeout("timed out")
+
+
+class TestApproximateStats(unittest.TestCase):
+    def setUp(self):
+        stats.clear_stats()
+        self.bundle = _HugeBundle()
+
+    def test_timeout_switches_to_sampled_estimates(self):
+        snapshot = stats.get_stats(self.bundle)
+        self.assertEqual(snapshot["approximate"], "timeout")
+        self.assertEqual(snapshot["sample_size"], 100)
+        self.assertEqual(snapshot["counts"]["entities"], 10000)
+        self.assertEqual(snapshot["counts"]["triples"], 80000)
+        person = snapshot["classes"][0]
+        self.assertEqual((person["uri"], person["count"]), ("ex:Person", 7500))
+        self.assertLess(person["low"], person["count"])
+        self.assertGreater(person["high"], person["count"])
+        # The sampled queries only read the sampled subjects
+        self.assertIn("<http://example.org/s99>", self.bundle.batches[-1][0])
+        # Estimates are not written to the metadata graph
+        self.assertEqual(self.bundle.updates, [])
+        self.assertTrue(stats.summarize_classes(self.bundle)["approximate"])
+
+    def test_size_threshold_skips_the_exact_queries(self):
+        with mock.patch.dict(os.environ, {"LOGRE_STATS_APPROX_TRIPLES": "50000"}):
+            snapshot = stats.compute_stats(self.bundle)
+        self.assertEqual(snapshot["approximate"], "size")
+        self.assertEqual(
+            [batch[0].split("\n")[1].strip() for batch in self.bundle.batches],
+            ["# lib.stats: typing total", "# lib.stats: sampled class distribution"],
+        )
+
+    def test_sample_is_drawn_without_sorting_the_graph(self):
+        query = stats.get_sample_query(self.bundle, 10, entities=1000)
+        self.assertIn("RAND() < 0.015", query)
+        self.assertIn("LIMIT 10", query)
+        self.assertNotIn("DISTINCT", query)
+        self.assertNotIn("ORDER BY", query)
+        # Unknown or small totals: every subject is kept until the limit
+        self.assertNotIn("RAND()", stats.get_sample_query(self.bundle, 10))
+        self.assertNotIn("RAND()", stats.get_sample_query(self.bundle, 10, entities=12))
+
+    def test_sample_timeout_leaves_the_distributions_unknown(self):
+        self.bundle.sample_times_out = True
+        snapshot = stats.get_stats(self.bundle)
+        self.assertEqual(snapshot["sample_size"], 0)
+        self.assertEqual((snapshot["classes"], snapshot["properties"]), ([], []))
+        self.assertEqual(snapshot["counts"]["triples"], 80000)
+
+    def test_totals_timeout_leaves_them_unknown(self):
+        self.bundle.totals_time_out = True
+        with mock.patch.dict(os.environ, {"LOGRE_STATS_APPROX_TRIPLES": "50000"}):
+            snapshot = stats.compute_stats(self.bundle)
+        self.assertIsNone(snapshot["counts"]["triples"])
+        # Counts are those of the sample
+        person = snapshot["classes"][0]
+        self.assertEqual((person["uri"], person["count"]), ("ex:Person", 75))
+        self.assertEqual(snapshot["properties"][0]["count"], 300)
+
+    def test_bounds_are_computed_on_the_sampled_subjects(self):
+        # Same triple share (1/2), but spread evenly over the subjects or held by a few
+        even_low, even_high = stats.ratio_bounds([1] * 100, [2] * 100)
+        lumpy_low, lumpy_high = stats.ratio_bounds([10] * 10 + [0] * 90, [2] * 100)
+        self.assertAlmostEqual(even_low, 0.5)
+        self.assertAlmostEqual(even_high, 0.5)
+        self.assertLess(lumpy_low, 0.5)
+        self.assertGreater(lumpy_high, 0.5)
+        # Bounds narrow as more subjects are sampled
+        low_small, high_small = stats.ratio_bounds([1, 0] * 50, [1] * 100)
+        low_big, high_big = stats.ratio_bounds([1, 0] * 5000, [1] * 10000)
+        self.assertLess(high_big - low_big, high_small - low_small)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.ntriples import Term, iter_ntriples, parse_ntriples_line  # noqa: E402
+from lib.triple_snapshot import TripleSnapshot  # noqa: E402
+
+
+EX = "http://example.org/"
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+
+def shorten(uri: str) -> str:
+    for short, long in (("ex", EX), ("rdfs", "http://www.w3.org/2000/01/rdf-schema#")):
+        if uri.startswith(long):
+            return f"{short}:{uri[len(long):]}"
+    return uri
+
+
+def lengthen(uri: str) -> str:
+    for short, long in (("ex", EX), ("rdfs", "http://www.w3.org/2000/01/rdf-schema#")):
+        if uri.startswith(f"{short}:"):
+            return long + uri[len(short) + 1 :]
+    return uri
+
+
+class TestNTriples(unittest.TestCase):
+    def test_parses_terms(self):
+        lines = [
+            f"<{EX}a> <{RDFS_LABEL}> \"Caf\\u00E9 \\\"noir\\\"\"@fr .",
+            f"<{EX}a> <{EX}age> \"42\"^^<{XSD_INTEGER}> .",
+            f"_:b0 <{EX}knows> <{EX}a> .",
+            "# comment",
+            "",
+        ]
+        triples = list(iter_ntriples(line.encode() for line in lines))
+        self.assertEqual(len(triples), 3)
+        self.assertEqual(triples[0][2], Term('Café "noir"', "literal", None, "fr"))
+        self.assertEqual(triples[1][2], Term("42", "literal", XSD_INTEGER))
+        self.assertEqual(triples[2][0], Term("_:b0", "blank"))
+
+    def test_rejects_invalid_lines(self):
+        with self.assertRaises(ValueError):
+            parse_ntriples_line(f"<{EX}a> <{EX}b> .")
+
+
+class TestTripleSnapshot(unittest.TestCase):
+    def _snapshot(self, triples, caps=None):
+        return TripleSnapshot.from_triples(
+            "ex:a", triples, shorten, lengthen, caps
+        )
+
+    def test_indexes_shortened_terms(self):
+        a, b, knows = Term(EX + "a", "iri"), Term(EX + "b", "iri"), Term(EX + "knows", "iri")
+        label = Term(RDFS_LABEL, "iri")
+        snapshot = self._snapshot(
+            [
+                (a, knows, b),
+                (a, knows, b),  # Duplicates are ignored
+                (b, label, Term("B", "literal")),
+                (b, knows, a),
+            ]
+        )
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(
+            snapshot.objects(snapshot.iri("ex:a"), snapshot.iri("ex:knows")),
+            [Term("ex:b", "iri")],
+        )
+        self.assertEqual(
+            snapshot.subjects(snapshot.iri(EX + "knows"), snapshot.iri("<http://example.org/a>")),
+            [Term("ex:b", "iri")],
+        )
+        self.assertEqual(
+            snapshot.value(snapshot.iri("ex:b"), snapshot.iri("rdfs:label")).value, "B"
+        )
+        self.assertEqual(
+            snapshot.value(snapshot.iri("ex:b"), snapshot.iri("rdfs:label")).datatype,
+            "http://www.w3.org/2001/XMLSchema#string",
+        )
+        self.assertEqual(
+            snapshot.incoming(snapshot.iri("ex:a")),
+            [(Term("ex:b", "iri"), Term("ex:knows", "iri"))],
+        )
+        self.assertTrue(snapshot.mentions(EX + "b"))
+        self.assertFalse(snapshot.mentions("ex:c"))
+
+    def test_caps_mark_directions_incomplete(self):
+        a, knows = Term(EX + "a", "iri"), Term(EX + "knows", "iri")
+        triples = [(a, knows, Term(f"{EX}o{i}", "iri")) for i in range(3)]
+        triples.append((Term(EX + "s", "iri"), knows, a))
+
+        snapshot = self._snapshot(triples, {"outgoing": 3, "incoming": 3})
+        self.assertTrue(snapshot.covers("ex:a"))
+        self.assertFalse(snapshot.covers("ex:a", outgoing=True))
+        self.assertTrue(snapshot.covers(EX + "a", incoming=True))
+        self.assertFalse(snapshot.covers("ex:s"))
+
+        snapshot = self._snapshot(triples, {"outgoing": 4, "incoming": 3})
+        self.assertTrue(snapshot.covers("ex:a", outgoing=True, incoming=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
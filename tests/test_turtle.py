@@ -0,0 +1,143 @@
+import io
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.ntriples import Term, format_term, parse_ntriples_line  # noqa: E402
+from lib.turtle import (  # noqa: E402
+    RDF,
+    XSD,
+    TurtleParser,
+    TurtleSyntaxError,
+    get_skolem_base,
+    iter_nquads_lines,
+    iter_turtle,
+)
+
+
+EX = "http://example.org/"
+SH = "http://www.w3.org/ns/shacl#"
+
+DOCUMENT = """\
+@prefix ex: <http://example.org/> .
+PREFIX sh: <http://www.w3.org/ns/shacl#>
+@base <http://example.org/base/> .
+# A comment with "quotes" and <iri>
+ex:Person a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] , [ sh:path ex:age ; sh:maxCount 1.5e0 ] ;
+    ex:label "Personne"@fr, 'single', \"\"\"long "quoted"
+text\"\"\", "typed"^^ex:type, true ;
+    ex:list ( 1 2.5 ex:three ) ;
+    ex:rel <relative> ;
+    ex:local ex:with\\.dot ;
+    ex:ref _:shared ; .
+_:shared ex:p "a\\tb\\u00e9" .
+[ ex:anon ex:x ] .
+"""
+
+
+def _iri(value: str) -> Term:
+    return Term(value, "iri")
+
+
+class TestTurtleParser(unittest.TestCase):
+    def test_parses_statements_and_directives(self) -> None:
+        triples = set(iter_turtle(DOCUMENT))
+        person = _iri(EX + "Person")
+
+        self.assertIn((person, _iri(RDF + "type"), _iri(SH + "NodeShape")), triples)
+        self.assertIn((person, _iri(EX + "label"), Term("Personne", "literal", None, "fr")), triples)
+        self.assertIn((person, _iri(EX + "label"), Term("single", "literal")), triples)
+        self.assertIn((person, _iri(EX + "label"), Term('long "quoted"\ntext', "literal")), triples)
+        self.assertIn((person, _iri(EX + "label"), Term("typed", "literal", EX + "type")), triples)
+        self.assertIn((person, _iri(EX + "label"), Term("true", "literal", XSD + "boolean")), triples)
+        self.assertIn((person, _iri(EX + "rel"), _iri(EX + "base/relative")), triples)
+        self.assertIn((person, _iri(EX + "local"), _iri(EX + "with.dot")), triples)
+        self.assertEqual(24, len(triples))
+
+    def test_blank_nodes_and_collections(self) -> None:
+        triples = list(iter_turtle(DOCUMENT))
+        objects = lambda subject, predicate: [  # noqa: E731
+            o for s, p, o in triples if s == subject and p == _iri(predicate)
+        ]
+        person = _iri(EX + "Person")
+
+        shapes = objects(person, SH + "property")
+        self.assertEqual(2, len(set(shapes)))
+        self.assertEqual([Term("1", "literal", XSD + "integer")], objects(shapes[0], SH + "minCount"))
+        self.assertEqual([Term("1.5e0", "literal", XSD + "double")], objects(shapes[1], SH + "maxCount"))
+
+        node = objects(person, EX + "list")[0]
+        items = []
+        while node != _iri(RDF + "nil"):
+            items += objects(node, RDF + "first")
+            node = objects(node, RDF + "rest")[0]
+        self.assertEqual(
+            [
+                Term("1", "literal", XSD + "integer"),
+                Term("2.5", "literal", XSD + "decimal"),
+                _iri(EX + "three"),
+            ],
+            items,
+        )
+
+        # A labelled blank node is the same node in every statement
+        shared = objects(person, EX + "ref")[0]
+        self.assertEqual([Term("a\tbé", "literal")], objects(shared, EX + "p"))
+
+    def test_tokens_cut_by_blocks_are_read_whole(self) -> None:
+        expected = list(iter_turtle(DOCUMENT))
+        content = DOCUMENT.encode("utf-8")
+
+        for block_bytes in (1, 2, 3, 7):
+            with self.subTest(block_bytes=block_bytes):
+                parser = TurtleParser(io.BytesIO(content), block_bytes=block_bytes)
+                self.assertEqual(expected, list(parser))
+
+    def test_reports_syntax_errors(self) -> None:
+        with self.assertRaisesRegex(TurtleSyntaxError, "Undeclared Turtle prefix"):
+            list(iter_turtle("ex:a ex:b ex:c ."))
+        with self.assertRaisesRegex(TurtleSyntaxError, "line 2"):
+            list(iter_turtle("@prefix ex: <http://example.org/> .\nex:a ex:b ex:c ex:d ."))
+
+
+class TestTurtleToNQuads(unittest.TestCase):
+    def test_lines_are_bound_to_the_graph_and_skolemized(self) -> None:
+        base = get_skolem_base("http://example.org/graphs/data")
+        lines = list(
+            iter_nquads_lines(iter_turtle(DOCUMENT), "http://example.org/graphs/data", base)
+        )
+
+        self.assertTrue(base.startswith("http://example.org/.well-known/genid/"))
+        self.assertEqual(24, len(lines))
+        for line in lines:
+            text = line.decode("utf-8")
+            self.assertTrue(text.endswith(" <http://example.org/graphs/data> .\n"))
+            self.assertNotIn("_:", text.split('"')[0])
+            # Without the graph, each line is a valid N-Triples line
+            parse_ntriples_line(text.replace(" <http://example.org/graphs/data> .", " ."))
+
+    def test_skolem_bases_differ_between_uploads(self) -> None:
+        self.assertNotEqual(get_skolem_base(None), get_skolem_base(None))
+        self.assertTrue(get_skolem_base(None).startswith("urn:uuid:"))
+
+    def test_format_term_round_trips(self) -> None:
+        for term in (
+            _iri(EX + "a"),
+            Term('quote " and \\ and\nline', "literal", None, "en"),
+            Term("5", "literal", XSD + "integer"),
+            Term("_:b1", "blank"),
+        ):
+            with self.subTest(term=term):
+                line = f"<{EX}s> <{EX}p> {format_term(term)} ."
+                self.assertEqual(term, parse_ntriples_line(line)[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from lib.upload_journal import (  # noqa: E402
+    UploadJournal,
+    find_journal,
+    get_file_fingerprint,
+    list_journals,
+)
+
+
+class TestUploadJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch.dict(
+            os.environ, {"LOGRE_CONFIG_HOME": directory.name, "LOGRE_UPLOAD_JOURNAL": "1"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _open(self, fingerprint: str = "abc") -> UploadJournal:
+        return UploadJournal.open("user@http://x", "GraphDB", fingerprint, 100, 0, "x.nq")
+
+    def test_fingerprint_keeps_the_file_position(self) -> None:
+        file = io.BytesIO(b"0123456789")
+        file.seek(4)
+
+        fingerprint, size = get_file_fingerprint(file)
+
+        self.assertEqual(6, size)
+        self.assertEqual(4, file.tell())
+        self.assertEqual(get_file_fingerprint(io.BytesIO(b"456789"))[0], fingerprint)
+
+    def test_checkpoint_only_covers_contiguous_chunks(self) -> None:
+        journal = self._open()
+        journal.begin(resume=False)
+
+        journal.acknowledge(20, 40, 2)
+        self.assertEqual(0, journal.offset)
+        journal.acknowledge(0, 20, 2)
+        self.assertEqual(40, journal.offset)
+        journal.acknowledge(60, 80, 2)
+        self.assertEqual(40, journal.offset)
+
+    def test_failed_upload_is_resumed_from_its_checkpoint(self) -> None:
+        journal = self._open()
+        journal.begin(resume=False)
+        journal.acknowledge(0, 30, 3)
+        journal.fail(RuntimeError("endpoint down"))
+
+        entry = find_journal("user@http://x", "x.nq", 100)
+        self.assertEqual(("failed", "endpoint down", 30), (entry["status"], entry["error"], entry["offset"]))
+
+        self.assertEqual(30, self._open().begin(resume=True))
+        self.assertEqual(0, self._open().begin(resume=False))
+        # Another file (fingerprint) starts from the beginning
+        self.assertEqual(0, self._open("def").begin(resume=True))
+
+    def test_finished_upload_is_forgotten(self) -> None:
+        journal = self._open()
+        journal.begin(resume=False)
+        journal.finish()
+
+        self.assertEqual([], list_journals())
+
+
+if __name__ == "__main__":
+    unittest.main()